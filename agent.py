@@ -1,12 +1,16 @@
 from google.adk.agents import Agent
 from google.genai import types
 import google.adk.planners
+from . import companyindex
 from . import sec10ktool
 from . import zoominfotool
 from . import nubelatool
-import markdown
+from . import httpclient
+import asyncio
+import functools
+import inspect
+import threading
 from typing import Optional
-import requests
 import json  # Import the json module
 import logging
 import dotenv
@@ -17,14 +21,57 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 dotenv.load_dotenv()
-print(f"\n--- All environment variables after loading dotenv  ---")
-for key, value in os.environ.items():
-    print(f"{key}={value}")
-print("---------------------------------------------------")
+if os.environ.get("LOG_ENVIRONMENT", "false").lower() == "true":
+    print(f"\n--- All environment variables after loading dotenv  ---")
+    for key, value in os.environ.items():
+        print(f"{key}={value}")
+    print("---------------------------------------------------")
 
-sec_10k_tool = sec10ktool.SEC10KTool()
-zoominfo_tool = zoominfotool.ZoomInfoTool()
-nubela_tool = nubelatool.NubelaTool()
+# The tools read their settings and set up database access when they are built, so
+# they are built on the first call of one of their methods rather than at import.
+_tools = {}
+_tools_lock = threading.Lock()
+
+
+def _get_tool(tool_class):
+    """
+    Returns the shared instance of a tool class, building it on first use.
+    """
+    if tool_class not in _tools:
+        with _tools_lock:
+            if tool_class not in _tools:
+                _tools[tool_class] = tool_class()
+    return _tools[tool_class]
+
+
+def _lazy_tool(tool_class, method_name: str):
+    """
+    Wraps a tool method as a plain function that builds the tool on its first call.
+
+    The wrapper has the method's name, docstring and signature (without self), which
+    is what the agent uses to describe the tool to the model. If the tool also has a
+    `<method_name>_async` coroutine, the wrapper is a coroutine that awaits it, so the
+    agent does not block its event loop on the database.
+    """
+    method = getattr(tool_class, method_name)
+    async_method_name = f"{method_name}_async"
+
+    if inspect.iscoroutinefunction(getattr(tool_class, async_method_name, None)):
+        @functools.wraps(method)
+        async def call_tool(*args, **kwargs):
+            # The first call imports the tool's dependencies; keep that off the loop too.
+            tool = await asyncio.to_thread(_get_tool, tool_class)
+            return await getattr(tool, async_method_name)(*args, **kwargs)
+    else:
+        @functools.wraps(method)
+        def call_tool(*args, **kwargs):
+            return getattr(_get_tool(tool_class), method_name)(*args, **kwargs)
+
+    signature = inspect.signature(method)
+    call_tool.__signature__ = signature.replace(
+        parameters=list(signature.parameters.values())[1:]
+    )
+    return call_tool
 
 def render_markdown(text: str) -> str:
     """Renders markdown text to HTML.
@@ -35,6 +82,8 @@ def render_markdown(text: str) -> str:
     Returns:
       The rendered HTML.
     """
+    import markdown
+
     return markdown.markdown(text, extensions=['extra', 'codehilite'])
 
 
@@ -52,11 +101,11 @@ def get_company_logo(company_name: str, company_domain: str) -> Optional[str]:
     # Try Clearbit first
     clearbit_url = f"https://logo.clearbit.com/{company_domain}"
     try:
-        response = requests.get(clearbit_url)
+        response = httpclient.get(clearbit_url)
         if response.status_code == 200:
             logger.info(f"Logo retrieved successfully from Clearbit for {company_name}.")
             return clearbit_url
-    except requests.exceptions.RequestException:
+    except httpclient.RequestException:
         logger.warning(f"Could not retrieve logo from Clearbit for {company_name}.")
         pass
 
@@ -86,6 +135,7 @@ Constraints & Notes:
 * **Logo Retrieval/Display:**
     * Always use the `get_company_logo` tool to retrieve the logo. If the `get_company_logo` tool fails, omit the logo from the final report. If the logo is not found, log a message indicating that the logo could not be retrieved. If the logo is found, log a message indicating that the logo was retrieved successfully.
 * Adhere strictly to the execution flow and reporting format outlined below.
+* If the user asks what changed since the previous year's 10-K, use the `get_10k_changes` tool with the ticker symbol and the Item (or "all") instead of reading both filings.
 * If any of the steps in the execution flow result in error code "MALFORMED_FUNCTION_CALL" or "Malformed function call", try again at least 2 times.
 
 Execution Flow & Instructions:
@@ -101,7 +151,8 @@ Execution Flow & Instructions:
   * Display the steps in the plan as a numbered list.
   * Initialize Status Tracker: Prepare to display status updates for each major step. Use a checkmark (✅) upon completion of a step.
 4. Ticker Identification (Conditional):
-  * If the user provided only the company name, use a search tool to find the official stock ticker symbol associated with that company. Verify the match.
+  * If the user provided only the company name, use the `resolve_company` tool with the name to find the official stock ticker symbol. If it returns a match with a score of 0.9 or more, use it; if several share classes match (e.g. GOOGL and GOOG), use the first.
+  * Only if `resolve_company` finds no such match, use a search tool to find the official stock ticker symbol associated with that company. Verify the match.
   * Status Update: Display "Identifying Stock Ticker... ✅"
 5. Retrieve 10-K Report Link:
   * Use a search tool (e.g., targeting SEC EDGAR database) to find the web link (URL) to the most recent annual 10-K filing for the company using its ticker symbol.
@@ -110,12 +161,16 @@ Execution Flow & Instructions:
   * WIP Indicator: Show a visual work-in-progress indicator (e.g., ⏳) while searching.
   * If you are unable to get the information, explain the reason.
 6. Access & Parse 10-K Content:
-  * Use a tool to access the content of the 10-K report from the retrieved link. This might involve downloading a file or parsing HTML content directly.
+  * Use the `list_10k_sections` tool with the retrieved link and the ticker symbol. It downloads the 10-K if needed and lists the Items that can be read from it.
+  * Only if `list_10k_sections` fails, use the `download_sec_filing` tool to get the full text of the 10-K instead.
   * Status Update: Display "Accessing 10-K Content... ✅"
   * WIP Indicator: Show WIP indicator (e.g., ⏳) during access/download.
   * If you are unable to get the information, explain the reason.
 7. Extract Information from 10-K:
   * Parse the 10-K document and extract the following information. Reference the typical 10-K sections (e.g., Item 1, 1A, 7, 8, Notes to Financial Statements) where this information is usually found.
+  * To look up a single fact (e.g., Number of Employees, Stock Exchange, Year Founded, Top Competitors) use the `search_10k` tool with the ticker symbol, a few keywords and k=5 before reading a whole section.
+  * For the synthesized items (Company Mission/Vision, SWOT Analysis, Top Company Challenges, Strategic Initiatives) use the `retrieve_10k_passages` tool with the ticker symbol, a natural-language question (e.g., "what are our main competitive advantages", "what is our mission") and k=8 to collect the supporting passages.
+  * Read the 10-K one section at a time with the `get_10k_section` tool (e.g., item "1", "1A", "7", "7A", "8", "10" or "Signatures") instead of the full text. Fetch each section once and reuse it for every item below that refers to it.
     * Company Snapshot:
       * Corporate Headquarters: (Cover page or Item 1)
       * Primary Geography of Operations: (Summarized from Item 1 / Item 8 Segment Info)
@@ -124,7 +179,7 @@ Execution Flow & Instructions:
       * Stock Ticker: (Cover page)
       * Stock Exchange: (Cover page)
       * Company Mission/Vision: (Synthesize or extract if explicitly stated in Item 1; often not present verbatim)
-      * Latest Fiscal Year Revenue: (Item 8 - Consolidated Statements of Operations)
+      * Latest Fiscal Year Revenue: (`get_financials` tool, else Item 8 - Consolidated Statements of Operations)
       * Number of Employees: (Often on Cover Page or Item 1, specify if full-time/part-time)
       * Company Type: (Infer: e.g., Mature, Growth - based on history, market position described in Item 1/7)
       * Recent Acquisitions Mentioned: (Summarize major acquisitions discussed in Item 1, Item 7, or Notes)
@@ -142,14 +197,15 @@ Execution Flow & Instructions:
     * Strategic Initiatives: (Summarize key strategies discussed in Item 1 and Item 7)
     * Top Revenue Streams / Segments: (Extract segment reporting data/descriptions - Item 1, Item 8 Notes)
     * Top Products and Services: (List major offerings described in Item 1)
-    * Financial Performance Highlights: (Extract key figures like Revenue, Net Income, Total Assets, Total Liabilities for the last 1-2 fiscal years - Item 7, Item 8) Format as a small table if appropriate.
+    * Financial Performance Highlights: (Key figures like Revenue, Net Income, Total Assets, Total Liabilities for the last 1-2 fiscal years) Use the `get_financials` tool with the ticker symbol; only if it returns nothing, extract them from Item 7 and Item 8. Format as a small table if appropriate.
     * Top Competitors: (List competitors mentioned in Item 1 or Item 1A)
     * Key Executives: (Extract CEO and CFO names - Signatures page, Item 10. Note if CIO/CTO are mentioned, but they often aren't.)
   * Status Update: Display "Extracting Data from 10-K... ✅"
   * WIP Indicator: Show WIP indicator (e.g., ⏳) during extraction.
 8. Identify and Verify Company Domain Name:
   * Identify the primary company domain name (website URL). It's often on the 10-K cover page or in Item 1.
-  * Cross-verify the domain using an internet search to ensure it represents the correct company.
+  * If `resolve_company` returned a domain for the company's ticker, use it as the verified domain.
+  * Otherwise, cross-verify the domain using an internet search to ensure it represents the correct company.
   * Status Update: Display "Verifying Company Domain... ✅"
    * WIP Indicator: Show WIP indicator (e.g., ⏳) during search.
 9. Enrich with LinkedIn data with Nubela:
@@ -209,10 +265,17 @@ Execution Flow & Instructions:
 17. If the user responds back with another company ticker, go back to step 1.
 """,
     tools=[
-        sec_10k_tool.get_10k_report_link,
-        sec_10k_tool.download_sec_filing,
-        zoominfo_tool.enrich_company,
-        nubela_tool.enrich_linkedin_company,
+        companyindex.resolve_company,
+        _lazy_tool(sec10ktool.SEC10KTool, "get_10k_report_link"),
+        _lazy_tool(sec10ktool.SEC10KTool, "download_sec_filing"),
+        _lazy_tool(sec10ktool.SEC10KTool, "list_10k_sections"),
+        _lazy_tool(sec10ktool.SEC10KTool, "get_10k_section"),
+        _lazy_tool(sec10ktool.SEC10KTool, "get_10k_changes"),
+        _lazy_tool(sec10ktool.SEC10KTool, "search_10k"),
+        _lazy_tool(sec10ktool.SEC10KTool, "retrieve_10k_passages"),
+        _lazy_tool(sec10ktool.SEC10KTool, "get_financials"),
+        _lazy_tool(zoominfotool.ZoomInfoTool, "enrich_company"),
+        _lazy_tool(nubelatool.NubelaTool, "enrich_linkedin_company"),
         render_markdown,
         get_company_logo,
     ],
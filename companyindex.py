@@ -0,0 +1,256 @@
+"""In-process lookup of companies by name, ticker or domain in the local company list.
+
+resolve_company() lets the agent turn "alphabet inc" into its ticker and domain
+without a search round trip. Names and aliases are normalized (case, punctuation
+and legal suffixes such as Inc. or Corp. are dropped) and looked up exactly first.
+Otherwise the names that share the most of the query's rarer trigrams are ranked
+by edit distance, computed with the bit-parallel algorithm of Myers, which also
+gives the distance to every leading part of a name, so that "berkshire" matches
+"Berkshire Hathaway Inc". Only a bounded number of posting entries and candidates
+is looked at, so a fuzzy lookup costs a fraction of a millisecond however common
+the words in the query are. The index is built from COMPANY_LIST_FILE (see
+companylist.py) on first use.
+"""
+
+import itertools
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from .companylist import Company
+
+logger = logging.getLogger(__name__)
+
+# Words dropped from the end of a name, with an "and" before them (e.g. "& Co."),
+# and "the" from its start.
+LEGAL_SUFFIXES = frozenset({
+    "ag", "co", "company", "corp", "corporation", "inc", "incorporated", "limited",
+    "llc", "lp", "ltd", "nv", "plc", "sa", "se",
+})
+
+# Posting entries counted per query. The postings of the query's trigrams are
+# counted from the shortest (rarest trigram) on until this many have been counted.
+POSTINGS_BUDGET = 1000
+
+# Names that share the most counted trigrams with the query, ranked by edit distance.
+CANDIDATES = 10
+
+# A match on the leading words of a name scores this much of a match on the whole name.
+PREFIX_WEIGHT = 0.9
+
+# State of incorporation in SEC titles, e.g. "ORACLE CORP /DE/" or "VERTEX PHARMACEUTICALS INC / MA".
+_STATE_SUFFIX = re.compile(r"\s*[/\\]\s*[a-z]{2}\s*[/\\]?\s*$")
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+_lock = threading.Lock()
+_index: Optional["CompanyIndex"] = None
+
+
+class Match(NamedTuple):
+    company: "Company"
+    score: float  # 1.0 for an exact match
+    matched: str  # the normalized name, alias, ticker or domain that matched
+
+
+def normalize_name(name: str) -> str:
+    """
+    Returns a company name in lower case without punctuation and legal suffixes,
+    e.g. "Alphabet Inc." -> "alphabet" and "AT&T INC." -> "at and t".
+    """
+    name = _STATE_SUFFIX.sub("", name.lower().replace("&", " and "))
+    words = _NON_ALPHANUMERIC.sub(" ", name).split()
+    start, end = 0, len(words)
+    if end > 1 and words[0] == "the":
+        start = 1
+    while end - start > 1 and (words[end - 1] in LEGAL_SUFFIXES or words[end - 1] == "and"):
+        end -= 1
+    return " ".join(words[start:end])
+
+
+def normalize_domain(domain: str) -> str:
+    domain = domain.strip().lower()
+    for prefix in ("https://", "http://", "www."):
+        if domain.startswith(prefix):
+            domain = domain[len(prefix):]
+    return domain.rstrip("/")
+
+
+def trigrams(text: str) -> frozenset:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def edit_distances(pattern: str, text: str) -> List[int]:
+    """
+    Returns the Levenshtein distance between `pattern` and every prefix of `text`:
+    element j is the distance to text[:j + 1]. Uses Myers' bit-parallel algorithm
+    (Hyyrö's formulation), one pass of integer operations per character of `text`.
+    """
+    m = len(pattern)
+    if m == 0:
+        return list(range(1, len(text) + 1))
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    distances = []
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh = mh << 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+        distances.append(score)
+    return distances
+
+
+def similarity(query: str, name: str, min_score: float = 0.0) -> float:
+    """
+    Returns 1 - edit distance / length for the whole name, or PREFIX_WEIGHT times
+    that for its best-matching beginning (e.g. "berkshire" of "berkshire hathaway"),
+    whichever is higher.
+
+    A name or beginning longer than len(query) / min_score scores less than
+    min_score whatever its characters, so only that much of the name is compared.
+    """
+    if not name or not query:
+        return 0.0
+    limit = int(len(query) / min_score) if min_score > 0 else len(name)
+    distances = edit_distances(query, name[:limit])
+    best = 0.0
+    if len(name) <= limit:
+        best = 1.0 - distances[-1] / max(len(query), len(name))
+    for length, distance in enumerate(distances[:-1], 1):
+        best = max(best, PREFIX_WEIGHT * (1.0 - distance / max(len(query), length)))
+    return best
+
+
+class CompanyIndex:
+    """
+    Exact and fuzzy lookup over a list of companies.
+    """
+
+    def __init__(self, companies: List["Company"]):
+        self.companies = companies
+        self._exact: Dict[str, List[int]] = {}
+        self._names: List[str] = []
+        self._name_companies: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        for company_id, company in enumerate(companies):
+            names = {normalize_name(name) for name in (company.name, *company.aliases)}
+            names.discard("")
+            keys = names | {company.ticker.lower()}
+            if company.domain:
+                keys.add(normalize_domain(company.domain))
+            for key in keys:
+                self._exact.setdefault(key, []).append(company_id)
+            for name in sorted(names):
+                name_id = len(self._names)
+                self._names.append(name)
+                self._name_companies.append(company_id)
+                for gram in trigrams(name):
+                    self._postings.setdefault(gram, []).append(name_id)
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.6) -> List[Match]:
+        """
+        Returns up to `limit` companies matching a name, ticker or domain, best first.
+        Exact matches score 1.0 and are returned without fuzzy matches.
+        """
+        exact = []
+        for key in (query.strip().lower(), normalize_domain(query), normalize_name(query)):
+            for company_id in self._exact.get(key, ()):
+                if all(match.company is not self.companies[company_id] for match in exact):
+                    exact.append(Match(self.companies[company_id], 1.0, key))
+        if exact:
+            return exact[:limit]
+
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        postings = sorted(
+            (self._postings[gram] for gram in trigrams(normalized) if gram in self._postings), key=len
+        )
+        counted, total = [], 0
+        for posting in postings:
+            if counted and total + len(posting) > POSTINGS_BUDGET:
+                break
+            counted.append(posting)
+            total += len(posting)
+        candidates = Counter(itertools.chain.from_iterable(counted)).most_common(CANDIDATES)
+
+        best: Dict[int, Match] = {}
+        for name_id, _ in candidates:
+            name = self._names[name_id]
+            score = similarity(normalized, name, min_score)
+            company_id = self._name_companies[name_id]
+            if score >= min_score and (company_id not in best or score > best[company_id].score):
+                best[company_id] = Match(self.companies[company_id], round(score, 3), name)
+        return sorted(best.values(), key=lambda match: -match.score)[:limit]
+
+
+def get_index() -> CompanyIndex:
+    """
+    Returns the index of the companies in COMPANY_LIST_FILE, rebuilding it when
+    the company list changes.
+    """
+    global _index
+    from . import companylist
+
+    companies = companylist.get_companies()
+    index = _index
+    if index is None or index.companies is not companies:
+        with _lock:
+            if _index is None or _index.companies is not companies:
+                started = time.perf_counter()
+                _index = CompanyIndex(companies)
+                logger.info(
+                    f"Indexed {len(companies)} companies in {time.perf_counter() - started:.2f}s."
+                )
+            index = _index
+    return index
+
+
+def resolve_company(company: str) -> str:
+    """Looks up a company by name, ticker or domain in the local company list.
+
+    Args:
+        company: The company name (e.g. "alphabet inc"), ticker symbol or domain name. Misspelled names are matched too.
+
+    Returns:
+        The best matching companies in JSON format, best first, each with its ticker, name, SEC CIK, domain (if known) and a score from 0 to 1 (1 is an exact match), or a message if there is no match.
+    """
+    from . import companylist
+
+    if not companylist.get_companies():
+        return "No company list is configured; search for the company instead."
+    started = time.perf_counter()
+    matches = get_index().search(company)
+    elapsed = time.perf_counter() - started
+    logger.info(f"resolve_company('{company}'): {len(matches)} match(es) in {elapsed * 1e6:.0f}us.")
+    if not matches:
+        return f"No company in the company list matches '{company}'; search for the company instead."
+    return json.dumps([
+        {
+            "ticker": match.company.ticker,
+            "name": match.company.name,
+            "cik": match.company.cik,
+            "domain": match.company.domain or None,
+            "score": match.score,
+        }
+        for match in matches
+    ])
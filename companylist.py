@@ -0,0 +1,121 @@
+"""Local list of public companies, used to reject unknown tickers and malformed
+domains before a paid API is called.
+
+The list is read from the file named by COMPANY_LIST_FILE. Two formats are accepted:
+
+* SEC's company_tickers.json (https://www.sec.gov/files/company_tickers.json).
+* A CSV file with a header row that has a ticker column, and optionally name, cik,
+  domain and aliases columns. Aliases are other names of the company separated by
+  semicolons, e.g. "Google;Google LLC".
+
+Without COMPANY_LIST_FILE only the syntax of a ticker is checked.
+"""
+
+import bisect
+import csv
+import json
+import os
+import re
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+
+# One to six letters or digits starting with a letter, with an optional share class
+# suffix such as BRK.B or BRK-B.
+_TICKER = re.compile(r"^[A-Z][A-Z0-9]{0,5}(?:[.\-/][A-Z0-9]{1,3})?$")
+_DOMAIN = re.compile(r"^(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}$")
+
+_lock = threading.Lock()
+_loaded_path = None
+_companies: List["Company"] = []
+_tickers: List[str] = []
+
+
+class Company(NamedTuple):
+    ticker: str
+    name: str = ""
+    cik: str = ""
+    domain: str = ""
+    aliases: Tuple[str, ...] = ()
+
+
+def load_companies(path: str) -> List[Company]:
+    """
+    Reads a company list file.
+
+    Args:
+        path: A company_tickers.json file from SEC, or a CSV file with a ticker column.
+
+    Returns:
+        One Company per entry, with the ticker upper-cased.
+    """
+    with open(path, encoding="utf-8", newline="") as companies_file:
+        if path.lower().endswith(".json"):
+            entries = json.load(companies_file)
+            if isinstance(entries, dict):
+                entries = entries.values()
+            return [
+                Company(
+                    ticker=str(entry["ticker"]).strip().upper(),
+                    name=str(entry.get("title", "")).strip(),
+                    cik=str(entry.get("cik_str", "")).strip(),
+                )
+                for entry in entries
+                if entry.get("ticker")
+            ]
+        rows = csv.DictReader(companies_file)
+        companies = []
+        for row in rows:
+            row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+            if row.get("ticker"):
+                companies.append(Company(
+                    ticker=row["ticker"].upper(),
+                    name=row.get("name", ""),
+                    cik=row.get("cik", ""),
+                    domain=row.get("domain", "").lower(),
+                    aliases=tuple(
+                        alias.strip() for alias in row.get("aliases", "").split(";") if alias.strip()
+                    ),
+                ))
+        return companies
+
+
+def get_companies() -> List[Company]:
+    """
+    Returns the companies in COMPANY_LIST_FILE, loading the file on first use.
+    Returns an empty list if no list is configured.
+    """
+    global _loaded_path, _companies, _tickers
+    path = os.environ.get("COMPANY_LIST_FILE", "")
+    if path != _loaded_path:
+        with _lock:
+            if path != _loaded_path:
+                companies = load_companies(path) if path else []
+                _companies = companies
+                _tickers = sorted({company.ticker for company in companies})
+                _loaded_path = path
+    return _companies
+
+
+def is_known_ticker(ticker: Optional[str]) -> bool:
+    """
+    Returns False for input that cannot be a ticker, or that is missing from the
+    company list when one is configured.
+    """
+    ticker = (ticker or "").strip().upper()
+    if not _TICKER.match(ticker):
+        return False
+    get_companies()
+    if not _tickers:
+        return True
+    index = bisect.bisect_left(_tickers, ticker)
+    return index < len(_tickers) and _tickers[index] == ticker
+
+
+def is_plausible_domain(domain: Optional[str]) -> bool:
+    """
+    Returns True if the input looks like a domain name such as google.com.
+    """
+    domain = (domain or "").strip().lower()
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return bool(_DOMAIN.match(domain))
@@ -0,0 +1,165 @@
+"""Database engine shared by every tool.
+
+One SQLAlchemy engine is created per process, on top of one long-lived Cloud SQL
+Python Connector. The connector refreshes its certificates in the background, so
+new pool connections only pay for the TCP/TLS connection itself.
+
+SQLAlchemy itself is only imported when the engine is built or the first query is
+prepared, so importing the tools stays cheap.
+
+The pool is sized by DB_POOL_SIZE and DB_MAX_OVERFLOW, waits up to DB_POOL_TIMEOUT
+seconds for a free connection, and recycles connections after DB_POOL_RECYCLE
+seconds.
+
+get_async_engine() returns the asyncpg counterpart for code running on an event
+loop, with the same pool settings.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import sqlalchemy
+    import sqlalchemy.ext.asyncio
+
+logger = logging.getLogger(__name__)
+
+_engine = None
+_connector = None
+_lock = threading.Lock()
+_async_engines = weakref.WeakKeyDictionary()  # event loop -> AsyncEngine
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "2")),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "1800")),
+    }
+
+
+def get_engine() -> "sqlalchemy.engine.Engine":
+    """
+    Returns the process-wide engine, creating it on first use.
+    """
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                import sqlalchemy
+
+                db_user = os.environ["DB_USER"]
+                db_pass = os.environ["DB_PASS"]
+                db_name = os.environ["DB_NAME"]
+                db_connection_name = os.environ[
+                    "DB_CONNECTION_NAME"
+                ]  # e.g., project:region:instance
+
+                def getconn():
+                    """Opens a connection through the shared Cloud SQL Python Connector."""
+                    return _get_connector().connect(
+                        db_connection_name,
+                        "pg8000",
+                        user=db_user,
+                        password=db_pass,
+                        db=db_name,
+                        ip_type="PRIVATE"
+                    )
+
+                _engine = sqlalchemy.create_engine(
+                    "postgresql+pg8000://",  # Use pg8000 in the connection string
+                    creator=getconn,
+                    **_pool_options(),
+                )
+                atexit.register(close)
+                logger.info("Database connection pool initialized using Cloud SQL Connector.")
+    return _engine
+
+
+def get_async_engine() -> "sqlalchemy.ext.asyncio.AsyncEngine":
+    """
+    Returns the asyncpg engine of the running event loop, creating it on first use.
+
+    asyncpg connections and the async Cloud SQL connector are bound to the loop that
+    created them, so each loop gets its own engine and connector.
+    """
+    loop = asyncio.get_running_loop()
+    engine = _async_engines.get(loop)
+    if engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        db_user = os.environ["DB_USER"]
+        db_pass = os.environ["DB_PASS"]
+        db_name = os.environ["DB_NAME"]
+        db_connection_name = os.environ["DB_CONNECTION_NAME"]
+        connector = None
+        connector_lock = asyncio.Lock()
+
+        async def getconn():
+            """Opens a connection through this loop's async Cloud SQL Python Connector."""
+            nonlocal connector
+            async with connector_lock:
+                if connector is None:
+                    from google.cloud.sql.connector import create_async_connector
+
+                    connector = await create_async_connector()
+            return await connector.connect_async(
+                db_connection_name,
+                "asyncpg",
+                user=db_user,
+                password=db_pass,
+                db=db_name,
+                ip_type="PRIVATE"
+            )
+
+        engine = create_async_engine(
+            "postgresql+asyncpg://", async_creator=getconn, **_pool_options()
+        )
+        _async_engines[loop] = engine
+        logger.info("Async database connection pool initialized using Cloud SQL Connector.")
+    return engine
+
+
+def text(sql: str) -> "sqlalchemy.TextClause":
+    """
+    Returns sqlalchemy.text(sql). SQLAlchemy is imported on the first query rather
+    than when the tools are imported.
+    """
+    import sqlalchemy
+
+    return sqlalchemy.text(sql)
+
+
+def _get_connector():
+    """
+    Returns the shared connector, creating it when the first connection is opened so
+    that building the engine needs no credentials.
+    """
+    global _connector
+    if _connector is None:
+        with _lock:
+            if _connector is None:
+                from google.cloud.sql.connector import Connector
+
+                _connector = Connector()
+    return _connector
+
+
+def close():
+    """
+    Closes the pooled connections and stops the connector's refresh thread.
+    """
+    global _engine, _connector
+    with _lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+        if _connector is not None:
+            _connector.close()
+            _connector = None
@@ -0,0 +1,63 @@
+"""Content hashing and passage-level comparison of 10-K text."""
+
+import difflib
+import hashlib
+import re
+from typing import List, Tuple
+
+# PyPDF2 breaks lines wherever the PDF did, so the same paragraph wraps differently
+# from one year to the next. Text is compared sentence by sentence on collapsed
+# whitespace, and runs of changed sentences are reported as passages.
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+(?=[A-Z0-9\"“(•])")
+_MIN_SENTENCE_WORDS = 3
+
+
+def normalize(text: str) -> str:
+    """
+    Collapses all whitespace so that line wrapping does not count as a change.
+    """
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def content_hash(text: str) -> str:
+    """
+    Returns the SHA-256 hex digest of the whitespace-normalized text.
+    """
+    return hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits text into normalized sentences, dropping fragments such as page numbers
+    and running headers.
+    """
+    sentences = _SENTENCE_END.split(normalize(text))
+    return [s for s in sentences if len(s.split()) >= _MIN_SENTENCE_WORDS]
+
+
+def diff_passages(old_text: str, new_text: str) -> Tuple[List[str], List[str]]:
+    """
+    Compares two versions of a section.
+
+    Args:
+        old_text: The section from the earlier filing.
+        new_text: The section from the later filing.
+
+    Returns:
+        A tuple of (added, removed) passages. Each passage is a run of consecutive
+        sentences that only appears in the later (added) or earlier (removed) text.
+    """
+    old_sentences = split_sentences(old_text)
+    new_sentences = split_sentences(new_text)
+    old_hashes = [hashlib.sha1(s.encode("utf-8")).digest() for s in old_sentences]
+    new_hashes = [hashlib.sha1(s.encode("utf-8")).digest() for s in new_sentences]
+
+    added, removed = [], []
+    matcher = difflib.SequenceMatcher(None, old_hashes, new_hashes, autojunk=False)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag in ("replace", "delete"):
+            removed.append(" ".join(old_sentences[old_start:old_end]))
+        if tag in ("replace", "insert"):
+            added.append(" ".join(new_sentences[new_start:new_end]))
+    return added, removed
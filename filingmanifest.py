@@ -0,0 +1,43 @@
+"""Filing manifests: what the 10-K search returned about a filing.
+
+get_10k_report_link remembers the manifest of the filing it links to, so that
+download_sec_filing can store the filing date and identifiers without searching
+again. The manifests are kept in a bounded TTLCache keyed by URL (see
+ttlcache.row_cache), so a long-running agent does not accumulate one per link.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Optional
+
+
+@dataclass(frozen=True)
+class FilingManifest:
+    """
+    Identifies one SEC filing as returned by the 10-K search.
+    """
+
+    url: str
+    ticker: str
+    filed_at: Optional[date] = None
+    form_type: str = "10-K"
+    cik: Optional[str] = None
+    accession_no: Optional[str] = None
+
+
+def manifest_for_download(
+    manifests: Any, url: str, ticker: str, search: Callable[[str], Optional[FilingManifest]]
+) -> FilingManifest:
+    """
+    Returns the manifest to store a downloaded filing with: the one remembered for
+    `url` in `manifests`, else the latest 10-K of the ticker found by search(ticker)
+    if it is the same filing, else a manifest with only the URL and ticker.
+    """
+    manifest = manifests.get(url)
+    if manifest is None:
+        # The link did not come from get_10k_report_link in this process, or its
+        # manifest has been evicted.
+        manifest = search(ticker)
+    if manifest is None or manifest.url != url:
+        manifest = FilingManifest(url=url, ticker=ticker)
+    return manifest
@@ -0,0 +1,135 @@
+"""Splits the extracted text of a 10-K into its standard Items."""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Items that are segmented at ingest time, in filing order.
+SECTION_ITEMS = ("1", "1A", "7", "7A", "8", "10", "SIGNATURES")
+
+SECTION_TITLES = {
+    "1": "Business",
+    "1A": "Risk Factors",
+    "7": "Management's Discussion and Analysis of Financial Condition and Results of Operations",
+    "7A": "Quantitative and Qualitative Disclosures About Market Risk",
+    "8": "Financial Statements and Supplementary Data",
+    "10": "Directors, Executive Officers and Corporate Governance",
+    "SIGNATURES": "Signatures",
+}
+
+# Any "Item N" heading at the start of a line. All items are matched (not only the
+# segmented ones) so that each section ends where the next heading begins.
+_ITEM_HEADING = re.compile(r"^[ \t]*item[ \t]+(\d{1,2}[a-c]?)\b[ \t]*[.:\-–—]?", re.IGNORECASE | re.MULTILINE)
+_SIGNATURES_HEADING = re.compile(r"^[ \t]*signatures?[ \t]*$", re.IGNORECASE | re.MULTILINE)
+
+
+def normalize_item(item: str) -> Optional[str]:
+    """
+    Maps user or model input such as "Item 1A", "1a" or "Risk Factors" to a section key.
+
+    Args:
+        item: The requested section.
+
+    Returns:
+        One of SECTION_ITEMS, or None if the input does not name a segmented section.
+    """
+    if not item:
+        return None
+    candidate = re.sub(r"^\s*item\s*", "", item.strip(), flags=re.IGNORECASE)
+    candidate = candidate.rstrip(".: ").upper()
+    if candidate in SECTION_ITEMS:
+        return candidate
+    if candidate == "SIGNATURE":
+        return "SIGNATURES"
+    for key, title in SECTION_TITLES.items():
+        if candidate == title.upper():
+            return key
+    return None
+
+
+def _find_headings(text: str) -> List[Tuple[int, str]]:
+    """
+    Returns (offset, item) for every Item and Signatures heading in the text, in order.
+    """
+    headings = [
+        (match.start(), match.group(1).upper())
+        for match in _ITEM_HEADING.finditer(text)
+    ]
+    headings.extend(
+        (match.start(), "SIGNATURES") for match in _SIGNATURES_HEADING.finditer(text)
+    )
+    headings.sort()
+    return headings
+
+
+def split_sections(text: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Locates the segmented Items in the text of a 10-K.
+
+    The table of contents repeats every heading, so an Item usually matches more than
+    once. Each match spans up to the next heading of any Item, and the longest span is
+    kept: table of contents entries are a single line long, the real section is not.
+
+    Args:
+        text: The extracted text of a 10-K.
+
+    Returns:
+        A dict of item -> (start_offset, end_offset) for each item found.
+    """
+    if not text:
+        return {}
+    headings = _find_headings(text)
+    sections = {}
+    for index, (start, item) in enumerate(headings):
+        if item not in SECTION_ITEMS:
+            continue
+        end = headings[index + 1][0] if index + 1 < len(headings) else len(text)
+        best = sections.get(item)
+        if best is None or end - start > best[1] - best[0]:
+            sections[item] = (start, end)
+    return sections
+
+
+def split_passages(text: str, sections: Dict[str, Tuple[int, int]], size: int = 1500) -> List[Tuple[int, int, Optional[str]]]:
+    """
+    Cuts a 10-K into passages of roughly `size` characters for search and retrieval.
+
+    Passages end at a line break where possible and never span two segmented Items,
+    so every passage can be attributed to the Item it came from.
+
+    Args:
+        text: The extracted text of a 10-K.
+        sections: The offsets returned by split_sections.
+        size: The target passage length in characters.
+
+    Returns:
+        A list of (start_offset, end_offset, item) tuples; item is None for text that
+        is outside the segmented Items.
+    """
+    if not text:
+        return []
+    # Item boundaries are hard breaks between passages.
+    boundaries = sorted({0, len(text)} | {offset for span in sections.values() for offset in span})
+    item_at = {start: item for item, (start, _) in sections.items()}
+
+    passages = []
+    current_item = None
+    for region_start, region_end in zip(boundaries, boundaries[1:]):
+        if region_start in item_at:
+            current_item = item_at[region_start]
+        elif not any(start <= region_start < end for start, end in sections.values()):
+            current_item = None
+        start = region_start
+        while start < region_end:
+            end = min(start + size, region_end)
+            if end < region_end:
+                # Prefer to break after the last newline, or else the last space, in the
+                # second half of the window.
+                for separator in ("\n", " "):
+                    position = text.rfind(separator, start + size // 2, end)
+                    if position != -1:
+                        end = position + 1
+                        break
+            if text[start:end].strip():
+                passages.append((start, end, current_item))
+            start = end
+    return passages
@@ -0,0 +1,52 @@
+"""Filing text as stored in sec_filings: zstd compression, and reading it back once.
+
+The text is one zstd frame, which cannot be decompressed from an offset, so a
+section read needs the whole filing. read_text() keeps the decompressed text of
+recently read filings in a cache, so the sections of a filing that the agent reads
+one after the other cost one database read and one decompression between them.
+"""
+
+from typing import Any, Callable, Optional, Tuple
+
+import zstandard
+
+# Compression level for stored filing text; higher levels cost far more CPU for little gain on prose.
+ZSTD_LEVEL = 9
+
+
+def compress_text(text: str) -> bytes:
+    """
+    Compresses extracted filing text for storage in sec_filings.text_report_zstd.
+    """
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(text.encode("utf-8"))
+
+
+def decompress_text(data: bytes) -> str:
+    """
+    Reverses compress_text.
+    """
+    return zstandard.ZstdDecompressor().decompress(bytes(data)).decode("utf-8")
+
+
+def read_text(
+    texts: Any, url: str, read_row: Callable[[], Optional[Tuple[Optional[str], Optional[bytes]]]]
+) -> Optional[str]:
+    """
+    Returns the text of a filing from `texts`, a TTLCache keyed by URL, or else
+    from the (text_report, text_report_zstd) row returned by read_row(), which is
+    decompressed and added to the cache.
+
+    Returns:
+        The text of the filing, or None if read_row() returns no row.
+    """
+    text = texts.get(url)
+    if text is not None:
+        return text
+    row = read_row()
+    if not row:
+        return None
+    text_report, text_report_zstd = row
+    text = decompress_text(text_report_zstd) if text_report_zstd is not None else text_report
+    if text is not None:
+        texts.set(url, text)
+    return text
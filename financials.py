@@ -0,0 +1,136 @@
+"""Extracts headline figures from the consolidated financial statements in Item 8."""
+
+import re
+from typing import Dict, List, Optional
+
+# Statement headings, and the row labels read from each statement. Labels are tried in
+# order and the first row that matches wins, so totals are listed before line items.
+STATEMENTS = {
+    "income_statement": re.compile(
+        r"consolidated\s+statements?\s+of\s+(?:operations|income|earnings)(?!\s+and\s+comprehensive)",
+        re.IGNORECASE,
+    ),
+    "balance_sheet": re.compile(
+        r"consolidated\s+balance\s+sheets?|consolidated\s+statements?\s+of\s+financial\s+(?:position|condition)",
+        re.IGNORECASE,
+    ),
+}
+
+METRICS = {
+    "income_statement": {
+        "revenue": [
+            re.compile(r"^total\s+(?:net\s+)?(?:revenues?|sales)\b", re.IGNORECASE),
+            re.compile(r"^(?:net\s+)?(?:revenues?|sales)(?:,\s*net)?\b(?!\s+(?:per|from|growth))", re.IGNORECASE),
+        ],
+        "net_income": [
+            re.compile(r"^net\s+(?:income|earnings|loss)(?:\s*\(loss\))?\b(?!\s+(?:per|attributable\s+to\s+non))", re.IGNORECASE),
+        ],
+    },
+    "balance_sheet": {
+        "total_assets": [re.compile(r"^total\s+assets\b", re.IGNORECASE)],
+        "total_liabilities": [re.compile(r"^total\s+liabilities\b(?!\s+and)", re.IGNORECASE)],
+    },
+}
+
+# A statement runs until the next statement heading, or at most this many characters.
+_STATEMENT_WINDOW = 8000
+_ANY_STATEMENT = re.compile(r"consolidated\s+(?:statements?\s+of|balance\s+sheets?)", re.IGNORECASE)
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+_NUMBER = re.compile(r"\(?\$?\s*\d[\d,]*(?:\.\d+)?\s*\)?|[—–]")
+_UNIT = re.compile(r"in\s+(thousands|millions|billions)", re.IGNORECASE)
+
+
+def _parse_number(token: str) -> Optional[float]:
+    token = token.strip()
+    if token in ("—", "–"):
+        return 0.0
+    negative = token.startswith("(") and token.endswith(")")
+    digits = re.sub(r"[^\d.]", "", token)
+    if not digits:
+        return None
+    value = float(digits)
+    return -value if negative else value
+
+
+def _year_header(lines: List[str]) -> List[int]:
+    """
+    Returns the fiscal years of the statement's columns, in column order.
+    """
+    for line in lines[:40]:
+        years = [int(year) for year in _YEAR.findall(line)]
+        # A column header is a line that is mostly years (two or more of them).
+        if len(years) >= 2 and len(_YEAR.sub("", line).split()) <= 8:
+            return years
+    return []
+
+
+def _row_values(lines: List[str], index: int, label_end: int, count: int) -> List[float]:
+    """
+    Returns the last `count` numbers on a statement row. PyPDF2 sometimes puts the
+    numbers on the line after the label; that line is only used if it has no label of
+    its own.
+    """
+    following = lines[index + 1] if index + 1 < len(lines) else ""
+    for text in (lines[index][label_end:], "" if re.search(r"[A-Za-z]", following) else following):
+        numbers = [_parse_number(token) for token in _NUMBER.findall(text)]
+        numbers = [number for number in numbers if number is not None]
+        if len(numbers) >= count:
+            return numbers[-count:]
+    return []
+
+
+def _find_row(lines: List[str], labels: List[re.Pattern], count: int) -> List[float]:
+    for label in labels:
+        for index, line in enumerate(lines):
+            match = label.match(line)
+            if match:
+                values = _row_values(lines, index, match.end(), count)
+                if values:
+                    return values
+    return []
+
+
+def _parse_statement(text: str, metrics: Dict[str, List[re.Pattern]]) -> List[dict]:
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    years = _year_header(lines)
+    if not years:
+        return []
+    unit_match = _UNIT.search(text[:2000])
+    unit = f"USD {unit_match.group(1).lower()}" if unit_match else "USD"
+
+    rows = []
+    for metric, labels in metrics.items():
+        values = _find_row(lines, labels, len(years))
+        # A header may repeat a year (e.g. one group of columns per period); the first
+        # column of a year is kept, so there is one row per metric and fiscal year.
+        seen = set()
+        for year, value in zip(years, values):
+            if year not in seen:
+                seen.add(year)
+                rows.append({"metric": metric, "fiscal_year": year, "value": value, "unit": unit})
+    return rows
+
+
+def extract_financials(item8_text: str) -> List[dict]:
+    """
+    Finds the consolidated income statement and balance sheet and reads revenue, net
+    income, total assets and total liabilities for every fiscal year they show.
+
+    Args:
+        item8_text: The text of Item 8 (or the whole filing).
+
+    Returns:
+        A list of dicts with the keys metric, fiscal_year, value and unit.
+    """
+    results = []
+    for statement, heading in STATEMENTS.items():
+        # The heading also appears in the index to the financial statements, so try
+        # every occurrence and keep the first one that parses.
+        for match in heading.finditer(item8_text or ""):
+            body = item8_text[match.end():match.end() + _STATEMENT_WINDOW]
+            following = _ANY_STATEMENT.search(body)
+            rows = _parse_statement(body[:following.start()] if following else body, METRICS[statement])
+            if rows:
+                results.extend(rows)
+                break
+    return results
@@ -0,0 +1,91 @@
+"""Shared HTTP client used by every tool that calls an upstream API.
+
+All requests go through one requests.Session, so connections to sec-api.io,
+api.zoominfo.com, nubela.co and the logo service are kept alive in per-host pools
+and reused across tool calls instead of paying a TCP and TLS handshake each time.
+Every request gets a default timeout and advertises compressed encodings.
+"""
+
+import os
+import threading
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli  # noqa: F401  urllib3 decodes br responses when this is installed
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+# Raised for connection errors, timeouts and invalid URLs, so callers can catch it
+# without importing requests themselves.
+RequestException = requests.exceptions.RequestException
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def default_timeout() -> Tuple[float, float]:
+    """
+    Returns the (connect, read) timeout in seconds applied when a caller sets none.
+    """
+    return (
+        float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5")),
+        float(os.environ.get("HTTP_READ_TIMEOUT", "60")),
+    )
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide session, creating it on first use.
+
+    HTTP_POOL_HOSTS is the number of hosts whose pools are kept, and HTTP_POOL_MAXSIZE
+    the number of keep-alive connections kept per host.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=int(os.environ.get("HTTP_POOL_HOSTS", "10")),
+                    pool_maxsize=int(os.environ.get("HTTP_POOL_MAXSIZE", "10")),
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["Accept-Encoding"] = _ACCEPT_ENCODING
+                _session = session
+    return _session
+
+
+def request(
+    method: str,
+    url: str,
+    timeout: Optional[Union[float, Tuple[float, float]]] = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    Sends a request on the shared session.
+
+    Takes the same arguments as requests.request. Streamed responses must be closed
+    (or used as a context manager) so their connection returns to the pool.
+    """
+    return get_session().request(
+        method, url, timeout=timeout if timeout is not None else default_timeout(), **kwargs
+    )
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """
+    Sends a GET request on the shared session.
+    """
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """
+    Sends a POST request on the shared session.
+    """
+    return request("POST", url, **kwargs)
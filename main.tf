@@ -194,8 +194,9 @@ resource "google_sql_user" "db_user" {
 
 # --- Execute SQL to Create Tables ---
 # Uses a null_resource with local-exec to run gcloud sql connect.
-# WARNING: This requires 'gcloud' and 'psql' (implicitly used by gcloud sql connect for postgres)
-#          to be installed and authenticated on the machine running Terraform.
+# WARNING: This requires 'gcloud', 'psql' (implicitly used by gcloud sql connect for postgres) and
+#          python with requirements.txt (for migrate.py) to be installed, and gcloud
+#          authenticated, on the machine running Terraform.
 #          It also requires network connectivity or the Cloud SQL Auth Proxy
 #          to be implicitly handled by 'gcloud sql connect'.
 resource "null_resource" "create_tables" {
@@ -205,6 +206,8 @@ resource "null_resource" "create_tables" {
     db_name       = google_sql_database.main_db.name
     db_user       = google_sql_user.db_user.name
     project_id    = var.project_id
+    # Rerun when a migration is added or changed.
+    migrations    = sha1(join("", [for f in sort(fileset("${path.module}/migrations", "*.sql")) : filesha1("${path.module}/migrations/${f}")]))
   }
 
   # Ensure the database and user exist before attempting connection
@@ -223,8 +226,10 @@ resource "null_resource" "create_tables" {
     command = <<-EOT
       echo "Attempting to connect to instance '${self.triggers.instance_name}' database '${self.triggers.db_name}' as user '${self.triggers.db_user}'..."
 
+      DB_HOST=$(gcloud sql instances describe "${self.triggers.instance_name}" --project="${self.triggers.project_id}" --format="value(ipAddresses[0].ipAddress)")
+
       # Check if the database is ready for connections
-      pg_isready -h $(gcloud sql instances describe "${self.triggers.instance_name}" --project="${self.triggers.project_id}" --format="value(ipAddresses[0].ipAddress)") -p ${local.sql_db_port} -U "${self.triggers.db_user}"
+      pg_isready -h "$DB_HOST" -p ${local.sql_db_port} -U "${self.triggers.db_user}"
 
       if [ $? -eq 0 ]; then
         echo "Database is ready for connections."
@@ -233,41 +238,27 @@ resource "null_resource" "create_tables" {
         exit 1
       fi
 
+      # Use PGPASSWORD environment variable for non-interactive password supply with
+      # migrate.py and psql (invoked by gcloud), so it stays off the command lines.
+      export PGPASSWORD='${var.db_pass}'
+
+      # Apply the pending migrations in migrations/ with migrate.py, which records them
+      # in schema_migrations. Requires python with requirements.txt installed.
+      (cd "${abspath(path.module)}/.." && python -m ${basename(abspath(path.module))}.migrate \
+        --url "postgresql+pg8000://${urlencode(self.triggers.db_user)}@$DB_HOST:${local.sql_db_port}/${urlencode(self.triggers.db_name)}") || { unset PGPASSWORD; exit 1; }
+
       # Define the SQL command using heredoc
       SQL_COMMAND=$(cat <<EOF
-        CREATE TABLE IF NOT EXISTS sec_filings (
-            url TEXT PRIMARY KEY,
-            text_report TEXT,
-            ticker TEXT,
-            date_of_report DATE,
-            date_of_download DATE
-        );
         GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE sec_filings TO "${self.triggers.db_user}";
-
-        CREATE TABLE IF NOT EXISTS zoominfo_enrichments (
-            ticker TEXT PRIMARY KEY,
-            company_domain TEXT,
-            company_enrichment_data JSONB,
-            last_update_date DATE
-        );
+        GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE sec_filing_sections TO "${self.triggers.db_user}";
+        GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE sec_filing_passages TO "${self.triggers.db_user}";
+        GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE sec_financials TO "${self.triggers.db_user}";
         GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE zoominfo_enrichments TO "${self.triggers.db_user}";
-
-        CREATE TABLE IF NOT EXISTS nubela_enrichments (
-            ticker VARCHAR(255) PRIMARY KEY,
-            linkedin_company_profile TEXT,
-            company_domain TEXT,
-            company_name TEXT,
-            nubela_enrichment_data JSONB,
-            last_update_date DATE
-        );
         GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE nubela_enrichments TO "${self.triggers.db_user}";
 EOF
       )
 
       # Execute using gcloud sql connect, piping the SQL command
-      # Use PGPASSWORD environment variable for non-interactive password supply with psql (invoked by gcloud)
-      export PGPASSWORD='${var.db_pass}'
-
       echo "$SQL_COMMAND" | gcloud sql connect "${self.triggers.instance_name}" \
         --user="${self.triggers.db_user}" \
         --database="${self.triggers.db_name}" \
@@ -0,0 +1,195 @@
+"""Applies the versioned schema migrations in migrations/ to the Cloud SQL database.
+
+Usage (from the directory that contains this package):
+
+    python -m corporate_analyst.migrate            # apply the pending migrations
+    python -m corporate_analyst.migrate --status   # list applied and pending migrations
+
+The database is reached with the DB_* settings used by the tools, or with --url for
+any PostgreSQL database (e.g. postgresql+pg8000://postgres@localhost/analyst). A
+--url without a password takes it from the PGPASSWORD environment variable, so it
+need not appear on the command line.
+
+Migrations are files named NNNN_description.sql and are applied in version order,
+each in its own transaction, which also records it in schema_migrations. A lock
+keeps two deployments from migrating at once. The Terraform provisioner in main.tf
+runs this module with --url. Migrations must be idempotent (IF NOT EXISTS and the
+like), because a database created before schema_migrations existed has the tables
+but no recorded versions, and gets all of them applied once.
+
+The embedded SQLite database (STORAGE_BACKEND=sqlite) is created by storage.py and
+does not use these files.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+_MIGRATION_FILE = re.compile(r"^(\d{4})_\w+\.sql$")
+
+# Key of the PostgreSQL advisory lock held while migrating.
+_LOCK_KEY = 7308419216
+
+_CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str  # e.g. "0002"
+    name: str  # file name, e.g. "0002_covering_indexes.sql"
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+
+
+def list_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Returns the migrations in a directory in version order.
+
+    Raises:
+        ValueError: If a .sql file is not named NNNN_description.sql, or two files
+            share a version.
+    """
+    migrations = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".sql"):
+            continue
+        match = _MIGRATION_FILE.match(name)
+        if not match:
+            raise ValueError(f"Migration file '{name}' is not named NNNN_description.sql.")
+        version = match.group(1)
+        if version in migrations:
+            raise ValueError(
+                f"Migrations '{migrations[version].name}' and '{name}' have the same version."
+            )
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            migrations[version] = Migration(version=version, name=name, sql=f.read())
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def applied_migrations(db_conn) -> Dict[str, str]:
+    """
+    Returns the checksum of every applied migration by version.
+    """
+    from sqlalchemy import text
+
+    db_conn.execute(text(_CREATE_MIGRATIONS_TABLE))
+    rows = db_conn.execute(text("SELECT version, checksum FROM schema_migrations")).fetchall()
+    return {version: checksum for version, checksum in rows}
+
+
+def pending_migrations(migrations: List[Migration], applied: Dict[str, str]) -> List[Migration]:
+    """
+    Returns the migrations that have not been applied. A migration whose file has
+    changed since it was applied is not applied again, but a warning is logged.
+    """
+    pending = []
+    for migration in migrations:
+        checksum = applied.get(migration.version)
+        if checksum is None:
+            pending.append(migration)
+        elif checksum != migration.checksum:
+            logger.warning(
+                f"Migration '{migration.name}' has changed since it was applied; add a new migration instead."
+            )
+    return pending
+
+
+def migrate(engine: "sqlalchemy.engine.Engine", directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Applies the pending migrations in a directory.
+
+    Returns:
+        The migrations that were applied.
+    """
+    from sqlalchemy import text
+
+    migrations = list_migrations(directory)
+    applied = []
+    with engine.connect() as db_conn:
+        db_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _LOCK_KEY})
+        try:
+            # Read under the lock, so a concurrent run's migrations are seen.
+            pending = pending_migrations(migrations, applied_migrations(db_conn))
+            db_conn.commit()
+            for migration in pending:
+                logger.info(f"Applying migration '{migration.name}'.")
+                db_conn.exec_driver_sql(migration.sql)
+                db_conn.execute(
+                    text(
+                        "INSERT INTO schema_migrations (version, name, checksum) VALUES (:version, :name, :checksum)"
+                    ),
+                    {"version": migration.version, "name": migration.name, "checksum": migration.checksum},
+                )
+                db_conn.commit()
+                applied.append(migration)
+        finally:
+            db_conn.rollback()
+            db_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _LOCK_KEY})
+            db_conn.commit()
+    return applied
+
+
+def database_url(url: str) -> "sqlalchemy.engine.URL":
+    """
+    Parses a --url, filling in the password from PGPASSWORD if the URL has none.
+    """
+    from sqlalchemy.engine import make_url
+
+    parsed = make_url(url)
+    if parsed.password is None and os.environ.get("PGPASSWORD"):
+        parsed = parsed.set(password=os.environ["PGPASSWORD"])
+    return parsed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Apply the corporate analyst schema migrations.")
+    parser.add_argument("--url", help="SQLAlchemy URL of the database. Defaults to Cloud SQL through the DB_* settings.")
+    parser.add_argument("--status", action="store_true", help="List the applied and pending migrations without applying any.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.url:
+        import sqlalchemy
+
+        engine = sqlalchemy.create_engine(database_url(args.url))
+    else:
+        from . import database
+
+        engine = database.get_engine()
+
+    if args.status:
+        with engine.connect() as db_conn:
+            applied = applied_migrations(db_conn)
+            db_conn.commit()
+        for migration in list_migrations():
+            state = "applied" if migration.version in applied else "pending"
+            print(f"{migration.name}: {state}")
+        return
+
+    applied = migrate(engine)
+    print(f"Applied {len(applied)} migration(s).")
+
+
+if __name__ == "__main__":
+    main()
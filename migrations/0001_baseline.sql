@@ -0,0 +1,78 @@
+-- Schema provisioned by main.tf before migrations were versioned. Every statement is
+-- idempotent, so databases created by an earlier provisioner are left as they are.
+
+CREATE TABLE IF NOT EXISTS sec_filings (
+    url TEXT PRIMARY KEY,
+    text_report TEXT,
+    ticker TEXT,
+    date_of_report DATE,
+    date_of_download DATE
+);
+-- Filing text is stored zstd-compressed; text_report only holds rows written before compression.
+ALTER TABLE sec_filings ADD COLUMN IF NOT EXISTS text_report_zstd BYTEA;
+ALTER TABLE sec_filings ALTER COLUMN text_report_zstd SET STORAGE EXTERNAL;
+ALTER TABLE sec_filings ADD COLUMN IF NOT EXISTS form_type TEXT;
+ALTER TABLE sec_filings ADD COLUMN IF NOT EXISTS cik TEXT;
+ALTER TABLE sec_filings ADD COLUMN IF NOT EXISTS accession_no TEXT;
+ALTER TABLE sec_filings ADD COLUMN IF NOT EXISTS content_sha256 TEXT;
+ALTER TABLE sec_filings ADD COLUMN IF NOT EXISTS last_verified TIMESTAMPTZ;
+
+CREATE TABLE IF NOT EXISTS sec_filing_sections (
+    url TEXT REFERENCES sec_filings (url) ON DELETE CASCADE,
+    item TEXT,
+    start_offset INTEGER,
+    end_offset INTEGER,
+    PRIMARY KEY (url, item)
+);
+ALTER TABLE sec_filing_sections ADD COLUMN IF NOT EXISTS content_sha256 TEXT;
+
+CREATE TABLE IF NOT EXISTS sec_filing_passages (
+    url TEXT REFERENCES sec_filings (url) ON DELETE CASCADE,
+    passage_no INTEGER,
+    item TEXT,
+    start_offset INTEGER,
+    end_offset INTEGER,
+    search_vector TSVECTOR,
+    PRIMARY KEY (url, passage_no)
+);
+CREATE INDEX IF NOT EXISTS sec_filing_passages_search_idx ON sec_filing_passages USING GIN (search_vector);
+CREATE EXTENSION IF NOT EXISTS vector;
+ALTER TABLE sec_filing_passages ADD COLUMN IF NOT EXISTS embedding vector(768);
+
+CREATE TABLE IF NOT EXISTS sec_financials (
+    url TEXT REFERENCES sec_filings (url) ON DELETE CASCADE,
+    ticker TEXT,
+    metric TEXT,
+    fiscal_year INTEGER,
+    value NUMERIC,
+    unit TEXT,
+    PRIMARY KEY (url, metric, fiscal_year)
+);
+
+CREATE TABLE IF NOT EXISTS zoominfo_enrichments (
+    ticker TEXT PRIMARY KEY,
+    company_domain TEXT,
+    company_enrichment_data JSONB,
+    last_update_date DATE
+);
+-- lz4 needs a server built with lz4 support; keep the default pglz otherwise.
+DO $$ BEGIN
+    ALTER TABLE zoominfo_enrichments ALTER COLUMN company_enrichment_data SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN NULL;
+END $$;
+ALTER TABLE zoominfo_enrichments ADD COLUMN IF NOT EXISTS last_verified TIMESTAMPTZ;
+
+CREATE TABLE IF NOT EXISTS nubela_enrichments (
+    ticker VARCHAR(255) PRIMARY KEY,
+    linkedin_company_profile TEXT,
+    company_domain TEXT,
+    company_name TEXT,
+    nubela_enrichment_data JSONB,
+    last_update_date DATE
+);
+-- lz4 needs a server built with lz4 support; keep the default pglz otherwise.
+DO $$ BEGIN
+    ALTER TABLE nubela_enrichments ALTER COLUMN nubela_enrichment_data SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN NULL;
+END $$;
+ALTER TABLE nubela_enrichments ADD COLUMN IF NOT EXISTS last_verified TIMESTAMPTZ;
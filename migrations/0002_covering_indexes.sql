@@ -0,0 +1,22 @@
+-- Indexes that answer the tools' lookups with index-only scans, so they stay fast as
+-- the cache grows to thousands of companies. The INCLUDE columns are the ones the
+-- queries select; text_report_zstd, search_vector and embedding stay out of them.
+
+-- Latest 10-K of a ticker (get_10k_report_link, get_10k_changes) and the latest
+-- filing per ticker that search_10k restricts its matches to.
+CREATE INDEX IF NOT EXISTS sec_filings_ticker_date_idx
+    ON sec_filings (ticker, date_of_report DESC NULLS LAST)
+    INCLUDE (url, form_type, cik, accession_no, last_verified, content_sha256);
+
+-- Reports cached before compression (sec10ktool compress-existing).
+CREATE INDEX IF NOT EXISTS sec_filings_uncompressed_idx
+    ON sec_filings (url)
+    WHERE text_report IS NOT NULL AND text_report_zstd IS NULL;
+
+-- Financial statements of a filing, by fiscal year (get_financials).
+CREATE INDEX IF NOT EXISTS sec_financials_url_year_idx
+    ON sec_financials (url, fiscal_year)
+    INCLUDE (metric, value, unit);
+
+-- ZoomInfo and Nubela lookups read the JSONB document itself, so their primary key on
+-- ticker is the index they need.
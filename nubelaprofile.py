@@ -0,0 +1,42 @@
+"""Projects a Proxycurl company profile onto the fields the report uses.
+
+A full profile carries updates, similar and affiliated companies and the like,
+which the report never quotes; project_profile() keeps the PROFILE_FIELDS and the
+company's LinkedIn URL, whichever endpoint answered, so that is all that is
+stored and returned to the model.
+"""
+
+from typing import Any, Dict, Optional
+
+# Fields of a Proxycurl company profile used by the report: description, industry,
+# specialities, headquarters, website and employee count (company_size is a
+# [min, max] range). The LinkedIn URL is added as linkedin_url.
+PROFILE_FIELDS = (
+    "description",
+    "industry",
+    "specialities",
+    "hq",
+    "website",
+    "company_size",
+    "company_size_on_linkedin",
+)
+
+
+def project_profile(data: Dict[str, Any], linkedin_company_profile: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Returns the PROFILE_FIELDS of a Proxycurl response and the company's LinkedIn URL.
+
+    Args:
+        data: A company profile, a /resolve response (with the profile under "profile"
+            and the URL under "url"), or a profile that was already projected.
+        linkedin_company_profile: The URL the profile was requested with, if any.
+    """
+    profile = data
+    url = data.get("linkedin_url") or linkedin_company_profile
+    if "profile" in data:
+        profile = data.get("profile") or {}
+        url = data.get("url") or url
+    projected = {field: profile[field] for field in PROFILE_FIELDS if profile.get(field) is not None}
+    if url:
+        projected["linkedin_url"] = url
+    return projected
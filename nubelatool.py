@@ -2,12 +2,18 @@
 
 import os
 import json
+import asyncio
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional, Union
 from dotenv import load_dotenv
 import requests
-import sqlalchemy
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
+
+from . import httpclient
+from . import nubelaprofile
+from . import revalidation
+from . import storage
+from . import ttlcache
 
 
 class NubelaTool:
@@ -17,15 +23,21 @@ class NubelaTool:
 
     def __init__(self):
         """
-        Initializes the NubelaTool, including logging and database connection pool.
+        Initializes the NubelaTool, including logging and its storage.
         """
         load_dotenv()  # Load environment variables from .env file
         self._init_logging()
         self.proxycurl_api_key = os.environ.get("PROXYCURL_API_KEY")
         if not self.proxycurl_api_key:
             self.logger.error("PROXYCURL_API_KEY environment variable not set.")
-        self.db_pool = None
-        self._init_db_pool()
+        self.storage = None
+        self._init_storage()
+        # (LinkedIn profile, domain) pairs Proxycurl could not find a company for.
+        self._negative_cache = ttlcache.negative_cache()
+        # Stale enrichments are returned as is and refreshed in the background.
+        self._revalidator = revalidation.Revalidator("nubela")
+        # Enrichment rows by ticker, so repeated calls skip the database.
+        self._rows = ttlcache.row_cache()
         self.enrichment_data_timelimit = int(os.environ.get("NUBELA_ENRICHMENT_DATA_TIMELIMIT", "60"))
         self.enable_nubela_api = os.getenv("ENABLE_NUBELA_API_CALLS", "false").lower() == "true"
 
@@ -45,55 +57,20 @@ class NubelaTool:
         console_handler.setFormatter(formatter)
         self.logger.addHandler(console_handler)
 
-    def _init_db_pool(self):
+    def _init_storage(self):
         """
-        Initializes the database connection pool using Cloud SQL Python Connector.
+        Uses the storage shared by all tools.
         """
-        if self.db_pool is None:
-            db_user = os.environ["DB_USER"]
-            db_pass = os.environ["DB_PASS"]
-            db_name = os.environ["DB_NAME"]
-            db_connection_name = os.environ[
-                "DB_CONNECTION_NAME"
-            ]  # e.g., project:region:instance
-
-            self.logger.debug(f"db_connection_name: {db_connection_name}")
-            
-
-            from google.cloud.sql.connector import Connector
-
-            def getconn():
-                """Creates a connection to the database using the Cloud SQL Python Connector."""
-                connector = Connector()
-                conn = connector.connect(
-                    db_connection_name,
-                    "pg8000",
-                    user=db_user,
-                    password=db_pass,
-                    db=db_name,
-                    ip_type="PRIVATE"
-                )
-                return conn
-
-            self.db_pool = sqlalchemy.create_engine(
-                "postgresql+pg8000://",  # Use pg8000 in the connection string
-                creator=getconn,
-                pool_size=5,
-                max_overflow=2,
-                pool_timeout=30,
-                pool_recycle=1800,
-            )
-            self.logger.info(
-                "Database connection pool initialized using Cloud SQL Connector."
-            )
+        if self.storage is None:
+            self.storage = storage.get_storage()
 
-    def _get_db_pool(self):
+    def _get_storage(self) -> storage.Storage:
         """
-        Returns the database connection pool.
+        Returns the storage of the cached enrichments.
         """
-        if self.db_pool is None:
-            self._init_db_pool()
-        return self.db_pool
+        if self.storage is None:
+            self._init_storage()
+        return self.storage
 
     def enrich_linkedin_company(
         self, linkedin_company_profile: str, company_domain: str, company_name: str, ticker: str
@@ -108,7 +85,7 @@ class NubelaTool:
             ticker: The ticker symbol of the company.
 
         Returns:
-            Enriched information about the company from LinkedIn in JSON format as a string or None if an error occurs.
+            The company's description, industry, specialities, headquarters (hq), website, employee count (company_size_on_linkedin, and company_size as a range) and LinkedIn URL (linkedin_url) from LinkedIn in JSON format as a string or None if an error occurs.
         """
         self.logger.debug(
             f"enrich_linkedin_company called with linkedin_company_profile: {linkedin_company_profile}, company_domain: {company_domain}, company_name: {company_name}, ticker: {ticker}"
@@ -118,154 +95,313 @@ class NubelaTool:
         if not self.enable_nubela_api:
             self.logger.info("Nubela API calls are disabled. Using only database data.")
 
-        db_pool = self._get_db_pool()
-        with db_pool.connect() as db_conn:
-            # Check if the report already exists in the database
-            result = db_conn.execute(
-                sqlalchemy.text(
-                    "SELECT nubela_enrichment_data, last_update_date FROM nubela_enrichments WHERE ticker = :ticker"
-                ),
-                {"ticker": ticker},
-            ).fetchone()
+        # Repeat lookups are answered from memory without a database round trip.
+        result = self._rows.get(ticker)
+        if result is None:
+            cache = self._get_storage()
+            with cache.connect() as db_conn:
+                # Check if the report already exists in the database
+                result = cache.get_enrichment(db_conn, "nubela", ticker)
+            if result:
+                result = tuple(result)
+                self._rows.set(ticker, result)
+        else:
+            self.logger.debug(f"Enrichment row for ticker '{ticker}' served from memory; row cache {self._rows.stats()}.")
+
+        if result:
+            return self._serve_enrichment(
+                result, linkedin_company_profile, company_domain, company_name, ticker
+            )
+
+        # If not in the database, download and process the report
+        # Check if Nubela API calls are enabled
+        if not self.enable_nubela_api:
+            return None
 
+        with self._get_storage().connect() as db_conn:
+            return self._refresh_enrichment(
+                db_conn, linkedin_company_profile, company_domain, company_name, ticker
+            )
+
+    async def enrich_linkedin_company_async(
+        self, linkedin_company_profile: str, company_domain: str, company_name: str, ticker: str
+    ) -> Optional[str]:
+        """
+        Async variant of enrich_linkedin_company for the agent's event loop. The stored
+        row is read and written through the async storage; only the Proxycurl calls,
+        which use blocking HTTP, run in a worker thread.
+        """
+        result = self._rows.get(ticker)
+        if result is None:
+            cache = storage.get_async_storage()
+            async with cache.connect() as db_conn:
+                result = await cache.get_enrichment(db_conn, "nubela", ticker)
             if result:
-                nubela_enrichment_data, last_update_date = result
-                if (
-                    last_update_date
-                    and date.today() - last_update_date
-                    < timedelta(days=self.enrichment_data_timelimit)
-                ):
-                    self.logger.info(
-                        f"Enrichment data for company ticker '{ticker}' found in the database and is recent."
-                    )
-                    # Ensure nubela_enrichment_data is a string before loading
-                    if isinstance(nubela_enrichment_data, str):
-                        return nubela_enrichment_data  # Return the nubela_enrichment_data from the database
-                    else:
-                        self.logger.error(f"Data from database is not a string: {type(nubela_enrichment_data)}")
-                        return None
-                elif not self.enable_nubela_api:
-                    self.logger.info(
-                        f"Enrichment data for company ticker '{ticker}' found in the database but Nubela API calls are disabled."
-                    )
-                    if isinstance(nubela_enrichment_data, str):
-                        return nubela_enrichment_data
-                    else:
-                        self.logger.error(f"Data from database is not a string: {type(nubela_enrichment_data)}")
-                        return None
-                else:
-                    self.logger.info(
-                        f"Enrichment data for company ticker '{ticker}' found in the database but is older than {self.enrichment_data_timelimit} days. Refreshing..."
-                    )
-                    # Delete the old record
-                    db_conn.execute(
-                        sqlalchemy.text(
-                            "DELETE FROM nubela_enrichments WHERE ticker = :ticker"
-                        ),
-                        {"ticker": ticker},
-                    )
-                    db_conn.commit()
-
-            # If not in the database or the report is too old, download and process the report
-            # Check if Nubela API calls are enabled
-            if not self.enable_nubela_api:
-                return None
-            
-            if not self.proxycurl_api_key:
-                self.logger.error("Cannot enrich LinkedIn data: PROXYCURL_API_KEY not set.")
-                return None
+                result = tuple(result)
+                self._rows.set(ticker, result)
+
+        if result:
+            return self._serve_enrichment(
+                result, linkedin_company_profile, company_domain, company_name, ticker
+            )
+
+        if not self.enable_nubela_api:
+            return None
 
-            headers = {"Authorization": "Bearer " + self.proxycurl_api_key}
-            api_endpoint = "https://nubela.co/proxycurl/api/linkedin/company"
-            params = {
-                "url": linkedin_company_profile,
-                "categories": "include",
-                "funding_data": "include",
-                "exit_data": "include",
-                "acquisitions": "include",
-                "extra": "include",
-                "use_cache": "if-present",
-                "fallback_to_cache": "on-error",
-            }
+        retval = await asyncio.to_thread(
+            self._fetch_enrichment, linkedin_company_profile, company_domain, company_name
+        )
+        if not isinstance(retval, dict):
+            return retval
+        async with storage.get_async_storage().connect() as db_conn:
+            return await db_conn.run_sync(
+                self._store_enrichment,
+                linkedin_company_profile,
+                company_domain,
+                company_name,
+                ticker,
+                retval,
+            )
+
+    def _serve_enrichment(
+        self,
+        result: tuple,
+        linkedin_company_profile: str,
+        company_domain: str,
+        company_name: str,
+        ticker: str,
+    ) -> Optional[str]:
+        """
+        Returns a stored enrichment, scheduling a background refresh if it is stale.
+
+        Args:
+            result: The (data, last_update_date, last_verified) row of the ticker.
+        """
+        nubela_enrichment_data, last_update_date, last_verified = result
+        if last_verified:
+            last_update_date = last_verified.date()
+        if (
+            last_update_date
+            and date.today() - last_update_date
+            < timedelta(days=self.enrichment_data_timelimit)
+        ):
+            self.logger.info(
+                f"Enrichment data for company ticker '{ticker}' found in the database and is recent."
+            )
+            return self._serve_data(nubela_enrichment_data, linkedin_company_profile)
+        elif not self.enable_nubela_api:
+            self.logger.info(
+                f"Enrichment data for company ticker '{ticker}' found in the database but Nubela API calls are disabled."
+            )
+            return self._serve_data(nubela_enrichment_data, linkedin_company_profile)
+        else:
+            self.logger.info(
+                f"Enrichment data for company ticker '{ticker}' found in the database but is older than {self.enrichment_data_timelimit} days. Refreshing in the background."
+            )
+            self._revalidator.submit(
+                ticker,
+                lambda: self._revalidate_enrichment(
+                    linkedin_company_profile, company_domain, company_name, ticker, nubela_enrichment_data
+                ),
+            )
+            return self._serve_data(nubela_enrichment_data, linkedin_company_profile)
+
+    def _serve_data(self, nubela_enrichment_data: Any, linkedin_company_profile: str) -> Optional[str]:
+        """
+        Returns stored enrichment data in JSON format as a string. JSONB columns are
+        read as dicts. Rows stored before profiles were projected are projected here.
+        """
+        if isinstance(nubela_enrichment_data, str):
             try:
-                response = requests.get(api_endpoint, params=params, headers=headers)
-                response.raise_for_status()
-                retval = json.loads(json.dumps(json.loads(response.text)))
-
-                # Check and see if we could load the company. If not, then let's go ahead and search for it by domain
-                if retval.get("code", None) is not None:
-                    # Try and look up the company
-                    self.logger.info(f"Could not find company using linkedin profile {linkedin_company_profile}. Trying to find it by domain {company_domain}")
-                    api_endpoint = "https://nubela.co/proxycurl/api/linkedin/company/resolve"
-                    params = {
-                        "company_domain": company_domain,
-                        "company_name": company_name,
-                        "enrich_profile": "enrich",
-                    }
-                    response = requests.get(api_endpoint, params=params, headers=headers)
-                    response.raise_for_status()
-                    retval = json.loads(json.dumps(json.loads(response.text)))
-                else:
-                    if "similar_companies" in retval:
-                        del retval["similar_companies"]
-                    if "updates" in retval:
-                        del retval["updates"]
-                    if "exit_data" in retval:
-                        del retval["exit_data"]
-                    if "affiliated_companies" in retval:
-                        del retval["affiliated_companies"]
-                    if "acquisitions" in retval:
-                        del retval["acquisitions"]
-
-                # Check for error code on return if no error then return
-                if retval.get("code", None) is not None:
-                    self.logger.error(f"Could not enrich or find the company from Proxy Curl. Error: {retval.get('code', '')}")
-                    return json.dumps({
-                        "status": "error",
-                        "message": "Could not enrich or find the company from Proxy Curl. Error:"
-                        + str(retval.get("code", "")),
-                    })
-                
-                last_update_date = date.today()
-                db_conn.execute(
-                    sqlalchemy.text(
-                        "INSERT INTO nubela_enrichments (ticker, linkedin_company_profile, company_domain, company_name, nubela_enrichment_data, last_update_date) VALUES (:ticker, :linkedin_company_profile, :company_domain, :company_name, :nubela_enrichment_data, :last_update_date) ON CONFLICT (ticker) DO UPDATE SET nubela_enrichment_data = :nubela_enrichment_data, linkedin_company_profile = :linkedin_company_profile, company_domain = :company_domain, company_name = :company_name, last_update_date = :last_update_date"
-                    ),
-                    {
-                        "ticker": ticker,
-                        "linkedin_company_profile": linkedin_company_profile,
-                        "company_domain": company_domain,
-                        "company_name": company_name,
-                        "nubela_enrichment_data": json.dumps(retval),
-                        "last_update_date": last_update_date,
-                    },
-                )
-                db_conn.commit()
-                self.logger.info(
-                    f"Enrichment data for company ticker '{ticker}' saved to the database."
-                )
+                nubela_enrichment_data = json.loads(nubela_enrichment_data)
+            except json.JSONDecodeError:
+                self.logger.error("Data from database is not valid JSON.")
+                return None
+        if not isinstance(nubela_enrichment_data, dict):
+            self.logger.error(f"Data from database is not a JSON object: {type(nubela_enrichment_data)}")
+            return None
+        return json.dumps(nubelaprofile.project_profile(nubela_enrichment_data, linkedin_company_profile))
 
-                return json.dumps(retval)
+    def _revalidate_enrichment(
+        self, linkedin_company_profile: str, company_domain: str, company_name: str, ticker: str, stored_data: Any
+    ):
+        """
+        Refreshes a stale enrichment in the background.
+        """
+        with self._get_storage().connect() as db_conn:
+            self._refresh_enrichment(
+                db_conn, linkedin_company_profile, company_domain, company_name, ticker, stored_data
+            )
 
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"Error during Proxycurl API call: {e}")
-                return json.dumps({
-                    "status": "error",
-                    "message": "Could not enrich this company from linkedin:" + str(e),
-                })
-            except json.JSONDecodeError as e:
-                self.logger.error(f"Error decoding JSON from Proxycurl API: {e}")
-                return json.dumps({
-                    "status": "error",
-                    "message": "Could not decode JSON from Proxycurl API:" + str(e),
-                })
-            except Exception as e:
-                self.logger.error(f"An unexpected error occurred: {e}")
+    def _refresh_enrichment(
+        self,
+        db_conn,
+        linkedin_company_profile: str,
+        company_domain: str,
+        company_name: str,
+        ticker: str,
+        stored_data: Any = None,
+    ) -> Optional[str]:
+        """
+        Fetches the LinkedIn profile of a company from Proxycurl and stores it.
+
+        Args:
+            db_conn: An open database connection.
+            linkedin_company_profile: The LinkedIn company profile URL.
+            company_domain: The company's domain name.
+            company_name: The name of the company.
+            ticker: The ticker symbol of the company.
+            stored_data: The enrichment currently stored for the ticker, if any. When the
+                response is the same only last_verified is updated.
+
+        Returns:
+            The enrichment in JSON format as a string, an error in JSON format, or None.
+        """
+        retval = self._fetch_enrichment(linkedin_company_profile, company_domain, company_name)
+        if not isinstance(retval, dict):
+            return retval
+        return self._store_enrichment(
+            db_conn, linkedin_company_profile, company_domain, company_name, ticker, retval, stored_data
+        )
+
+    def _fetch_enrichment(
+        self, linkedin_company_profile: str, company_domain: str, company_name: str
+    ) -> Union[Dict[str, Any], str, None]:
+        """
+        Calls Proxycurl for a LinkedIn company profile, resolving the company by domain
+        and name if the profile is not found.
+
+        Returns:
+            The PROFILE_FIELDS of the company (see nubelaprofile.project_profile), or an error in JSON format, or None.
+        """
+        if not self.proxycurl_api_key:
+            self.logger.error("Cannot enrich LinkedIn data: PROXYCURL_API_KEY not set.")
+            return None
+
+        lookup_key = ((linkedin_company_profile or "").strip().lower(), (company_domain or "").strip().lower())
+        if lookup_key in self._negative_cache:
+            self.logger.info(f"Proxycurl could not find the company for {linkedin_company_profile} / {company_domain} (cached).")
+            return json.dumps({
+                "status": "error",
+                "message": "Could not enrich or find the company from Proxy Curl (cached).",
+            })
+
+        headers = {"Authorization": "Bearer " + self.proxycurl_api_key}
+        api_endpoint = "https://nubela.co/proxycurl/api/linkedin/company"
+        params = {
+            "url": linkedin_company_profile,
+            "use_cache": "if-present",
+            "fallback_to_cache": "on-error",
+        }
+        try:
+            response = httpclient.get(api_endpoint, params=params, headers=headers)
+            response.raise_for_status()
+            retval = json.loads(response.text)
+
+            # Check and see if we could load the company. If not, then let's go ahead and search for it by domain
+            if retval.get("code", None) is not None:
+                # Try and look up the company
+                self.logger.info(f"Could not find company using linkedin profile {linkedin_company_profile}. Trying to find it by domain {company_domain}")
+                api_endpoint = "https://nubela.co/proxycurl/api/linkedin/company/resolve"
+                params = {
+                    "company_domain": company_domain,
+                    "company_name": company_name,
+                    "enrich_profile": "enrich",
+                }
+                response = httpclient.get(api_endpoint, params=params, headers=headers)
+                response.raise_for_status()
+                retval = json.loads(response.text)
+
+            # Check for error code on return if no error then return
+            if retval.get("code", None) is not None:
+                self._negative_cache.set(lookup_key)
+                self.logger.error(f"Could not enrich or find the company from Proxy Curl. Error: {retval.get('code', '')}")
                 return json.dumps({
                     "status": "error",
-                    "message": "An unexpected error occurred:" + str(e),
+                    "message": "Could not enrich or find the company from Proxy Curl. Error:"
+                    + str(retval.get("code", "")),
                 })
+            # Keep only what the report uses, whichever endpoint answered.
+            return nubelaprofile.project_profile(retval, linkedin_company_profile)
+
+        except requests.exceptions.RequestException as e:
+            if getattr(e.response, "status_code", None) == 404:
+                self._negative_cache.set(lookup_key)
+            self.logger.error(f"Error during Proxycurl API call: {e}")
+            return json.dumps({
+                "status": "error",
+                "message": "Could not enrich this company from linkedin:" + str(e),
+            })
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Error decoding JSON from Proxycurl API: {e}")
+            return json.dumps({
+                "status": "error",
+                "message": "Could not decode JSON from Proxycurl API:" + str(e),
+            })
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred: {e}")
+            return json.dumps({
+                "status": "error",
+                "message": "An unexpected error occurred:" + str(e),
+            })
+
+    def _store_enrichment(
+        self,
+        db_conn,
+        linkedin_company_profile: str,
+        company_domain: str,
+        company_name: str,
+        ticker: str,
+        retval: Dict[str, Any],
+        stored_data: Any = None,
+    ) -> str:
+        """
+        Stores a profile fetched from Proxycurl and commits. When it equals stored_data
+        only last_verified is updated.
+
+        Returns:
+            The enrichment in JSON format as a string, or an error in JSON format.
+        """
+        try:
+            if stored_data is not None and retval == (
+                json.loads(stored_data) if isinstance(stored_data, str) else stored_data
+            ):
+                self._get_storage().touch_enrichment(
+                    db_conn, "nubela", ticker, datetime.now(timezone.utc)
+                )
+                db_conn.commit()
+                self._rows.discard(ticker)
+                self.logger.info(f"Enrichment data for company ticker '{ticker}' is unchanged.")
+                return json.dumps(retval)
+
+            last_update_date = date.today()
+            last_verified = datetime.now(timezone.utc)
+            self._get_storage().save_enrichment(
+                db_conn,
+                "nubela",
+                ticker,
+                retval,
+                last_update_date,
+                last_verified,
+                linkedin_company_profile=linkedin_company_profile,
+                company_domain=company_domain,
+                company_name=company_name,
+            )
+            db_conn.commit()
+            self._rows.set(ticker, (retval, last_update_date, last_verified))
+            self.logger.info(
+                f"Enrichment data for company ticker '{ticker}' saved to the database."
+            )
+
+            return json.dumps(retval)
 
+        except Exception as e:
+            db_conn.rollback()
+            self.logger.error(f"An unexpected error occurred: {e}")
+            return json.dumps({
+                "status": "error",
+                "message": "An unexpected error occurred:" + str(e),
+            })
 
 # Example usage (for testing):
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+"""Embedding-based retrieval of 10-K passages.
+
+Passages are the chunks stored in sec_filing_passages. Two index backends share one
+interface:
+
+* PgVectorPassageIndex keeps the vectors in the sec_filing_passages.embedding column
+  (pgvector) and ranks them in the database.
+* NumpyPassageIndex keeps them in process memory and ranks them with a matrix
+  product. It needs no database extension and works offline.
+
+Vectors come from an embedder: GenAIEmbedder calls the Gemini/Vertex AI embedding
+model, and HashingEmbedder is a deterministic, network-free stand-in for tests and
+local development.
+"""
+
+import hashlib
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import sqlalchemy
+
+# (passage_no, start_offset, end_offset, item)
+Passage = Tuple[int, int, int, Optional[str]]
+
+# Must match the dimension of the sec_filing_passages.embedding column.
+EMBEDDING_DIM = 768
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Deterministic bag-of-words embedder based on feature hashing.
+
+    Words and word bigrams are hashed into a fixed number of signed buckets and the
+    result is L2-normalized. It captures lexical overlap only, but it is stable across
+    processes and needs no network, which makes it suitable for tests.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = _TOKEN.findall(text.lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        return np.vstack([self._embed(text) for text in texts]) if texts else np.zeros((0, self.dim), dtype=np.float32)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed(text)
+
+
+class GenAIEmbedder:
+    """
+    Embeds text with a Gemini/Vertex AI embedding model through google-genai.
+
+    The client is configured from the environment (GOOGLE_API_KEY, or
+    GOOGLE_GENAI_USE_VERTEXAI with GOOGLE_CLOUD_PROJECT and GOOGLE_CLOUD_LOCATION).
+    """
+
+    # Inputs sent per embed_content call.
+    BATCH_SIZE = 100
+
+    def __init__(self, model: str = "text-embedding-004", dim: int = EMBEDDING_DIM):
+        from google import genai
+
+        self.model = model
+        self.dim = dim
+        self._client = genai.Client()
+
+    def _embed(self, texts: Sequence[str], task_type: str) -> np.ndarray:
+        from google.genai import types
+
+        vectors = []
+        for start in range(0, len(texts), self.BATCH_SIZE):
+            response = self._client.models.embed_content(
+                model=self.model,
+                contents=list(texts[start:start + self.BATCH_SIZE]),
+                config=types.EmbedContentConfig(task_type=task_type, output_dimensionality=self.dim),
+            )
+            vectors.extend(embedding.values for embedding in response.embeddings)
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.dim)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        return self._embed(texts, "RETRIEVAL_DOCUMENT")
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed([text], "RETRIEVAL_QUERY")[0]
+
+
+class NumpyPassageIndex:
+    """
+    In-memory passage index. Vectors are expected to be L2-normalized, so the dot
+    product is the cosine similarity.
+
+    The (passages, matrix) of each filing are kept in `filings`, a TTLCache keyed by
+    URL (see ttlcache.passage_cache), so only the most recently used filings stay in
+    memory; an evicted filing is embedded again on its next retrieval.
+    """
+
+    def __init__(self, filings: Any):
+        self._filings = filings
+
+    def has(self, url: str) -> bool:
+        return url in self._filings
+
+    def add(self, url: str, passages: List[Passage], vectors: np.ndarray):
+        """
+        Stores the vectors of a filing's passages, replacing any earlier ones.
+        """
+        self._filings.set(url, (list(passages), np.asarray(vectors, dtype=np.float32)))
+
+    def search(self, url: str, query_vector: np.ndarray, k: int) -> List[Tuple[float, Passage]]:
+        """
+        Returns the k passages of a filing most similar to the query, best first.
+        """
+        passages, matrix = self._filings.get(url, ([], None))
+        if not passages:
+            return []
+        scores = matrix @ np.asarray(query_vector, dtype=np.float32)
+        k = min(k, len(passages))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), passages[i]) for i in top]
+
+
+def _to_pgvector(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{value:.6g}" for value in vector) + "]"
+
+
+class PgVectorPassageIndex:
+    """
+    Passage index stored in the sec_filing_passages.embedding pgvector column.
+    """
+
+    def __init__(self, db_pool: sqlalchemy.engine.Engine):
+        self.db_pool = db_pool
+
+    def has(self, url: str) -> bool:
+        with self.db_pool.connect() as db_conn:
+            result = db_conn.execute(
+                sqlalchemy.text(
+                    "SELECT bool_and(embedding IS NOT NULL) FROM sec_filing_passages WHERE url = :url"
+                ),
+                {"url": url},
+            ).fetchone()
+        return bool(result and result[0])
+
+    def add(self, url: str, passages: List[Passage], vectors: np.ndarray):
+        with self.db_pool.connect() as db_conn:
+            db_conn.execute(
+                sqlalchemy.text(
+                    "UPDATE sec_filing_passages SET embedding = CAST(:embedding AS vector) WHERE url = :url AND passage_no = :passage_no"
+                ),
+                [
+                    {"url": url, "passage_no": passage[0], "embedding": _to_pgvector(vector)}
+                    for passage, vector in zip(passages, vectors)
+                ],
+            )
+            db_conn.commit()
+
+    def search(self, url: str, query_vector: np.ndarray, k: int) -> List[Tuple[float, Passage]]:
+        with self.db_pool.connect() as db_conn:
+            rows = db_conn.execute(
+                sqlalchemy.text(
+                    "SELECT passage_no, start_offset, end_offset, item, 1 - (embedding <=> CAST(:query AS vector)) AS score FROM sec_filing_passages WHERE url = :url AND embedding IS NOT NULL ORDER BY embedding <=> CAST(:query AS vector) LIMIT :k"
+                ),
+                {"url": url, "query": _to_pgvector(query_vector), "k": k},
+            ).fetchall()
+        return [(float(score), (passage_no, start, end, item)) for passage_no, start, end, item, score in rows]
@@ -0,0 +1,94 @@
+"""Text extraction from 10-K PDFs: spooling the download and page-parallel extraction.
+
+A PDF is streamed into a SpooledTemporaryFile, which stays in memory up to a size
+limit and rolls over to an anonymous temporary file beyond it. Page-parallel
+extraction hands each worker process the path of a named copy of the PDF and a page
+range, so the PDF is never read into memory whole nor pickled once per worker.
+
+PyPDF2 is imported where it is used, so that importing this module is cheap.
+"""
+
+import shutil
+import tempfile
+from concurrent.futures import Executor
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+
+def spool_download(chunks: Iterable[bytes], max_bytes: int) -> Tuple[BinaryIO, int]:
+    """
+    Writes the chunks of a download into a spooled buffer.
+
+    Args:
+        chunks: The body of the download, e.g. response.iter_content().
+        max_bytes: The size up to which the buffer is kept in memory.
+
+    Returns:
+        The buffer, positioned at its start, and the number of bytes written.
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=max_bytes)
+    size = 0
+    for chunk in chunks:
+        buffer.write(chunk)
+        size += len(chunk)
+    buffer.seek(0)
+    return buffer, size
+
+
+def page_ranges(num_pages: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Cuts pages [0, num_pages) into at most `workers` contiguous [start, stop) ranges.
+    """
+    workers = max(1, min(workers, num_pages))
+    size = -(-num_pages // workers)  # ceiling division
+    return [(start, min(start + size, num_pages)) for start in range(0, num_pages, size)]
+
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extracts the text of pages [start, stop) of a PDF. Runs in a worker process.
+
+    Args:
+        pdf_path: The path of the PDF.
+        start: Index of the first page to extract.
+        stop: Index one past the last page to extract.
+
+    Returns:
+        The text of each page in the range, in page order.
+    """
+    import PyPDF2
+
+    with open(pdf_path, "rb") as pdf_stream:
+        pdf_reader = PyPDF2.PdfReader(pdf_stream)
+        return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def extract_parallel(executor: Executor, pdf_file: BinaryIO, num_pages: int, workers: int) -> Optional[str]:
+    """
+    Extracts the text of a PDF by splitting its pages across `executor`.
+
+    The PDF is copied chunk by chunk to a named temporary file, which the workers
+    open by path; the page ranges are reassembled in page order.
+
+    Args:
+        executor: A process pool.
+        pdf_file: A binary file-like object holding the PDF.
+        num_pages: The number of pages in the PDF.
+        workers: The number of page ranges to cut the PDF into.
+
+    Returns:
+        The extracted text, or None if the pool failed and the caller should fall
+        back to serial extraction.
+    """
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_copy:
+            pdf_file.seek(0)
+            shutil.copyfileobj(pdf_file, pdf_copy)
+            pdf_copy.flush()
+            starts, stops = zip(*page_ranges(num_pages, workers))
+            page_slices = executor.map(
+                extract_page_range, [pdf_copy.name] * len(starts), starts, stops
+            )
+            return "".join(page for page_slice in page_slices for page in page_slice)
+    except Exception as e:
+        print(f"Page-parallel PDF extraction failed, extracting serially: {e}")
+        return None
@@ -0,0 +1,65 @@
+"""Background refresh of stale cache rows (stale-while-revalidate).
+
+A tool that finds a stale row returns it right away and hands the refresh to a
+Revalidator. Refreshes run on a small thread pool, and a second request for a key
+that is already being refreshed is dropped instead of calling the upstream twice.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Revalidator:
+    """
+    Runs at most one background refresh per key at a time.
+    """
+
+    def __init__(self, name: str, max_workers: Optional[int] = None):
+        self.name = name
+        self.max_workers = max_workers or int(os.environ.get("REVALIDATE_WORKERS", "2"))
+        self._executor = None
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, refresh: Callable[[], None]) -> Optional[Future]:
+        """
+        Schedules `refresh` unless a refresh for `key` is already running.
+
+        Returns:
+            The future of the scheduled refresh, or None if one was already running.
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"revalidate-{self.name}"
+                )
+            try:
+                # _run releases the key under the lock, so it cannot do so before it is added.
+                future = self._executor.submit(self._run, key, refresh)
+            except RuntimeError:  # The interpreter is shutting down
+                return None
+            self._in_flight[key] = future
+            return future
+
+    def pending(self, key: Hashable) -> Optional[Future]:
+        """
+        Returns the future of the refresh running for `key`, or None if there is none.
+        """
+        with self._lock:
+            return self._in_flight.get(key)
+
+    def _run(self, key: Hashable, refresh: Callable[[], None]):
+        try:
+            refresh()
+        except Exception as e:
+            logger.error(f"Background refresh of {self.name} {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
@@ -1,11 +1,35 @@
 """Tool that downloads 10k report for a corporation."""
 
+import asyncio
+import atexit
 import os
 import requests
-import sqlalchemy
-from datetime import date, timedelta
-from typing import Optional
-import PyPDF2
+from datetime import date, datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, Optional, Union
+
+from . import companylist
+from . import database
+from . import filingdiff
+from . import filingmanifest
+from . import filingtext
+from . import filingsections
+from . import financials
+from . import httpclient
+from . import pdftext
+from . import revalidation
+from . import storage
+from . import ttlcache
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# PyPDF2 and passageindex (NumPy) are imported where they are used, so that importing
+# the tool does not pay for them before the first download or retrieval.
+if TYPE_CHECKING:
+    import PyPDF2
 
 
 class SEC10KTool:
@@ -13,13 +37,50 @@ class SEC10KTool:
     A class to handle SEC 10-K report retrieval and processing.
     """
 
+    # Metrics stored in sec_financials, with the labels get_financials prints.
+    FINANCIAL_METRICS = {
+        "revenue": "Revenue",
+        "net_income": "Net Income",
+        "total_assets": "Total Assets",
+        "total_liabilities": "Total Liabilities",
+    }
+
     def __init__(self):
         """
-        Initializes the SEC10KTool, including the database connection pool.
+        Initializes the SEC10KTool, including its storage.
         """
-        self.db_pool = None
+        self.storage = None
         self._init_tools()
-        self._init_db_pool()
+        # PDFs up to this size are buffered in memory; larger ones spill to an anonymous temp file.
+        self.pdf_spool_max_bytes = int(
+            os.environ.get("SEC_PDF_SPOOL_MAX_BYTES", str(16 * 1024 * 1024))
+        )
+        # Page-parallel extraction is used when more than one worker is configured and
+        # the document has at least SEC_PDF_PARALLEL_MIN_PAGES pages.
+        self.pdf_extract_workers = int(os.environ.get("SEC_PDF_EXTRACT_WORKERS", "1"))
+        self.pdf_parallel_min_pages = int(
+            os.environ.get("SEC_PDF_PARALLEL_MIN_PAGES", "40")
+        )
+        self._pdf_executor = None
+        # Filing manifests from get_filing_manifest, keyed by URL, for download_sec_filing.
+        self._manifests = ttlcache.row_cache()
+        # Tickers the SEC API returned no 10-K for.
+        self._negative_cache = ttlcache.negative_cache()
+        # A cached filing older than 90 days is served as is and checked for a newer
+        # 10-K in the background, at most once per SEC_REVALIDATE_INTERVAL_HOURS.
+        self.revalidate_interval = timedelta(
+            hours=float(os.environ.get("SEC_REVALIDATE_INTERVAL_HOURS", "24"))
+        )
+        self._revalidator = revalidation.Revalidator("sec")
+        # Latest sec_filings row by ticker, so repeated lookups skip the database.
+        self._rows = ttlcache.row_cache()
+        # Decompressed filing text by URL, so reading several sections decompresses once.
+        self._texts = ttlcache.text_cache()
+        self._embedder = None
+        self._passage_index = None
+        # Embeds the passages of newly downloaded filings off the download path.
+        self._indexer = revalidation.Revalidator("passages", max_workers=1)
+        self._init_storage()
 
     def _init_tools(self):
         """
@@ -30,51 +91,20 @@ class SEC10KTool:
         # Load environment variables from .env file
         load_dotenv()
 
-    def _init_db_pool(self):
-        """
-        Initializes the database connection pool using Cloud SQL Python Connector.
-        """
-        if self.db_pool is None:
-            db_user = os.environ["DB_USER"]
-            db_pass = os.environ["DB_PASS"]
-            db_name = os.environ["DB_NAME"]
-            db_connection_name = os.environ[
-                "DB_CONNECTION_NAME"
-            ]  # e.g., project:region:instance
-
-            from google.cloud.sql.connector import Connector
-            import pg8000.dbapi
-
-            def getconn():
-                """Creates a connection to the database using the Cloud SQL Python Connector."""
-                connector = Connector()
-                conn = connector.connect(
-                    db_connection_name,
-                    "pg8000",
-                    user=db_user,
-                    password=db_pass,
-                    db=db_name,
-                    ip_type="PRIVATE"
-                )
-                return conn
-
-            self.db_pool = sqlalchemy.create_engine(
-                "postgresql+pg8000://",  # Use pg8000 in the connection string
-                creator=getconn,
-                pool_size=5,
-                max_overflow=2,
-                pool_timeout=30,
-                pool_recycle=1800,
-            )
-            print("Database connection pool initialized using Cloud SQL Connector.")
+    def _init_storage(self):
+        """
+        Uses the storage shared by all tools.
+        """
+        if self.storage is None:
+            self.storage = storage.get_storage()
 
-    def _get_db_pool(self):
+    def _get_storage(self) -> storage.Storage:
         """
-        Returns the database connection pool.
+        Returns the storage of the cached filings.
         """
-        if self.db_pool is None:
-            self._init_db_pool()
-        return self.db_pool
+        if self.storage is None:
+            self._init_storage()
+        return self.storage
 
     # def get_10k_report_link(self, ticker: str) -> Optional[str]:
     #     """
@@ -157,102 +187,244 @@ class SEC10KTool:
         Returns:
             A tuple containing the URL for the 10-K report and its date (or None, None if not found).
         """
+        manifest = self.get_filing_manifest(ticker)
+        if manifest is None:
+            return None, None
+        return manifest.url, manifest.filed_at.strftime("%Y-%m-%d") if manifest.filed_at else None
+
+    def get_filing_manifest(self, ticker: str) -> Optional[filingmanifest.FilingManifest]:
+        """
+        Finds the most recent 10-K for a ticker in the database or through the SEC API.
+
+        The manifest is remembered by URL so that download_sec_filing can store the
+        filing without searching for it again.
+
+        Args:
+            ticker: The company's ticker symbol
+
+        Returns:
+            The manifest of the most recent 10-K, or None if not found.
+        """
+        if not companylist.is_known_ticker(ticker):
+            print(f"'{ticker}' is not a known ticker symbol.")
+            return None
+
         # Check if SEC API calls are enabled
         if os.environ.get("ENABLE_SEC_API_CALLS", "True").lower() != "true":
             print("SEC API calls are disabled. Using only database data.")
 
-        db_pool = self._get_db_pool()
-        with db_pool.connect() as db_conn:
-            # Check if the report already exists in the database
-            result = db_conn.execute(
-                sqlalchemy.text(
-                    "SELECT url, date_of_report FROM sec_filings WHERE ticker = :ticker ORDER BY date_of_report DESC"
-                ),
-                {"ticker": ticker},
-            ).fetchone()
+        # Repeat lookups are answered from memory without a database round trip.
+        result = self._rows.get(ticker)
+        if result is None:
+            cache = self._get_storage()
+            with cache.connect() as db_conn:
+                # Check if the report already exists in the database
+                result = cache.latest_filing(db_conn, ticker)
+            if result:
+                result = tuple(result)
+                self._rows.set(ticker, result)
+        else:
+            print(f"Filing row for ticker '{ticker}' served from memory; row cache {self._rows.stats()}.")
+
+        if result:
+            return self._serve_filing_row(ticker, result)
+        print(f"No report found for ticker '{ticker}' in the database.")
+        return self._find_latest_manifest(ticker)
+
+    async def get_10k_report_link_async(self, ticker: str) -> Optional[str]:
+        """
+        Same as get_10k_report_link, but reads the database without blocking the event
+        loop and runs the SEC API search, if one is needed, in a worker thread.
+        """
+        manifest = await self.get_filing_manifest_async(ticker)
+        if manifest is None:
+            return None, None
+        return manifest.url, manifest.filed_at.strftime("%Y-%m-%d") if manifest.filed_at else None
+
+    async def get_filing_manifest_async(self, ticker: str) -> Optional[filingmanifest.FilingManifest]:
+        """
+        Same as get_filing_manifest, but awaits the database through the async storage.
+        """
+        if not companylist.is_known_ticker(ticker):
+            print(f"'{ticker}' is not a known ticker symbol.")
+            return None
 
+        result = self._rows.get(ticker)
+        if result is None:
+            cache = storage.get_async_storage()
+            async with cache.connect() as db_conn:
+                result = await cache.latest_filing(db_conn, ticker)
             if result:
-                url, date_of_report = result
-                if date_of_report and date.today() - date_of_report < timedelta(days=90):
-                    print(
-                        f"Report for ticker '{ticker}' found in the database and is recent."
-                    )
-                    return url, date_of_report.strftime("%Y-%m-%d") if date_of_report else None
-                elif os.environ.get("ENABLE_SEC_API_CALLS", "True").lower() != "true":
-                    print(
-                        f"Report for ticker '{ticker}' found in the database but SEC API calls are disabled."
-                    )
-                    return url, date_of_report.strftime("%Y-%m-%d") if date_of_report else None
-                else: # Report is old and SEC API calls are enabled
-                    print(f"Report for ticker '{ticker}' found in the database but is too old. Attempting to download a new one.")
-            else:
-                print(f"No report found for ticker '{ticker}' in the database.")
+                result = tuple(result)
+                self._rows.set(ticker, result)
+        else:
+            print(f"Filing row for ticker '{ticker}' served from memory; row cache {self._rows.stats()}.")
 
-            # If not in the database or the report is too old, download and process the report
-            # Check if SEC API calls are enabled
-            if os.environ.get("ENABLE_SEC_API_CALLS", "True").lower() != "true":
-                return None, None
+        if result:
+            return self._serve_filing_row(ticker, result)
+        print(f"No report found for ticker '{ticker}' in the database.")
+        return await asyncio.to_thread(self._find_latest_manifest, ticker)
 
-            api_key = os.environ.get("SEC_API_KEY")
-            # Add a check for API key to avoid making requests without it
-            if not api_key:
-                print("SEC_API_KEY environment variable not set. Cannot fetch from SEC API.")
-                return None, None
+    def _serve_filing_row(self, ticker: str, result: tuple) -> filingmanifest.FilingManifest:
+        """
+        Builds the manifest of a cached filing row, scheduling a check for a newer
+        filing if the row is old.
+        """
+        url, date_of_report, form_type, cik, accession_no, last_verified = result
+        manifest = filingmanifest.FilingManifest(
+            url=url,
+            ticker=ticker,
+            filed_at=date_of_report,
+            form_type=form_type or "10-K",
+            cik=cik,
+            accession_no=accession_no,
+        )
+        if (date_of_report and date.today() - date_of_report < timedelta(days=90)) or (
+            last_verified and datetime.now(timezone.utc) - last_verified < self.revalidate_interval
+        ):
+            print(
+                f"Report for ticker '{ticker}' found in the database and is recent."
+            )
+        elif os.environ.get("ENABLE_SEC_API_CALLS", "True").lower() != "true":
+            print(
+                f"Report for ticker '{ticker}' found in the database but SEC API calls are disabled."
+            )
+        else: # Report is old and SEC API calls are enabled
+            print(f"Report for ticker '{ticker}' found in the database but is old. Checking for a newer one in the background.")
+            self._revalidator.submit(
+                ticker.upper(), lambda: self._revalidate_filing(ticker, manifest)
+            )
+        return self._remember_manifest(manifest)
 
-            url = f"https://api.sec-api.io?token={api_key}"
+    def _find_latest_manifest(self, ticker: str) -> Optional[filingmanifest.FilingManifest]:
+        """
+        Searches the SEC API for the most recent 10-K of a ticker that is not in the database.
+        """
+        # Check if SEC API calls are enabled
+        if os.environ.get("ENABLE_SEC_API_CALLS", "True").lower() != "true":
+            return None
 
-            payload = {
-                "query": f'ticker:({ticker}) AND formType:"10-K"',
-                "from": "0",
-                "size": "1",
-                "sort": [{"filedAt": {"order": "desc"}}],
-            }
+        api_key = os.environ.get("SEC_API_KEY")
+        # Add a check for API key to avoid making requests without it
+        if not api_key:
+            print("SEC_API_KEY environment variable not set. Cannot fetch from SEC API.")
+            return None
 
-            headers = {"Content-Type": "application/json"}
+        manifests = self._search_filing_manifests(ticker, api_key, size=1)
+        return self._remember_manifest(manifests[0]) if manifests else None
 
-            try:
-                response = requests.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                link_to_filing_details, date_of_report = self._extract_link_to_filing_details(
-                    response.json()
-                )
-                return link_to_filing_details, date_of_report.strftime("%Y-%m-%d") if date_of_report else None
+    def _revalidate_filing(self, ticker: str, manifest: filingmanifest.FilingManifest):
+        """
+        Checks whether a newer 10-K than the cached one has been filed. Only the
+        search result is fetched when nothing changed; a newer filing is downloaded.
 
-            except requests.exceptions.RequestException as e:
-                print(f"Error during API call: {e}")
-                return None, None
-            except AttributeError:
-                print("No response received from the API or unexpected JSON structure.")
-                return None, None
+        Args:
+            ticker: The company's ticker symbol
+            manifest: The manifest of the cached filing.
+        """
+        api_key = os.environ.get("SEC_API_KEY")
+        if not api_key:
+            return
+        manifests = self._search_filing_manifests(ticker, api_key, size=1)
+        if not manifests:
+            return
+        latest = manifests[0]
+        if latest.url == manifest.url or (
+            latest.filed_at and manifest.filed_at and latest.filed_at <= manifest.filed_at
+        ):
+            cache = self._get_storage()
+            with cache.connect() as db_conn:
+                cache.touch_filing(db_conn, manifest.url, datetime.now(timezone.utc))
+                db_conn.commit()
+            self._rows.discard(ticker)
+            print(f"Report for ticker '{ticker}' is still the latest 10-K.")
+        else:
+            print(f"A newer 10-K was filed for ticker '{ticker}' on {latest.filed_at}. Downloading it.")
+            self._remember_manifest(latest)
+            self.download_sec_filing(latest.url, ticker)
+
+    def _search_filing_manifests(self, ticker: str, api_key: str, size: int) -> List[filingmanifest.FilingManifest]:
+        """
+        Searches the SEC API for the most recent 10-K filings of a ticker.
+
+        Args:
+            ticker: The company's ticker symbol
+            api_key: The sec-api.io API key.
+            size: The number of filings to return, most recent first.
+
+        Returns:
+            The manifests found (empty on error).
+        """
+        if ticker.upper() in self._negative_cache:
+            print(f"No 10-K reports found for ticker '{ticker}' (cached).")
+            return []
+
+        url = f"https://api.sec-api.io?token={api_key}"
+
+        payload = {
+            "query": f'ticker:({ticker}) AND formType:"10-K"',
+            "from": "0",
+            "size": str(size),
+            "sort": [{"filedAt": {"order": "desc"}}],
+        }
+
+        headers = {"Content-Type": "application/json"}
+
+        try:
+            response = httpclient.post(url, json=payload, headers=headers)
+            response.raise_for_status()
+            manifests = self._extract_filing_manifests(response.json(), ticker)
+            if not manifests:
+                self._negative_cache.set(ticker.upper())
+            return manifests
+
+        except requests.exceptions.RequestException as e:
+            print(f"Error during API call: {e}")
+            return []
+        except AttributeError:
+            print("No response received from the API or unexpected JSON structure.")
+            return []
+
+    def _remember_manifest(self, manifest: filingmanifest.FilingManifest) -> filingmanifest.FilingManifest:
+        """
+        Caches a manifest by URL for a later download_sec_filing call and returns it.
+        """
+        self._manifests.set(manifest.url, manifest)
+        return manifest
 
-    def _extract_link_to_filing_details(self, report_data):
+    def _extract_filing_manifests(self, report_data, ticker: str) -> List[filingmanifest.FilingManifest]:
         """
-        Extracts the link to the filing details from the 10-K report data.
+        Builds filing manifests from the 10-K search results.
 
         Args:
             report_data: The data returned from the SEC API for the 10-K report.
+            ticker: The ticker symbol that was searched for.
 
         Returns:
-            A tuple containing:
-                - The link to the filing details (or None if not found).
-                - The date of the report (or None if not found).
+            One manifest per filing that has a link to its details, in result order.
         """
+        manifests = []
         if report_data and report_data.get("total"):
             filings = report_data.get("filings", [])
-            if filings:
-                filing_details_link = filings[0].get("linkToFilingDetails")
-                if filing_details_link and filings[0].get("filedAt"):
-                    date_of_report = date.fromisoformat(filings[0].get("filedAt")[:10])
-                    return filing_details_link, date_of_report
-                elif filing_details_link:
-                    return filing_details_link, None
+            if not filings:
+                print("No filings found in the response.")
+            for filing in filings:
+                filing_details_link = filing.get("linkToFilingDetails")
+                if filing_details_link:
+                    filed_at = filing.get("filedAt")
+                    manifests.append(filingmanifest.FilingManifest(
+                        url=filing_details_link,
+                        ticker=ticker,
+                        filed_at=date.fromisoformat(filed_at[:10]) if filed_at else None,
+                        form_type=filing.get("formType") or "10-K",
+                        cik=filing.get("cik"),
+                        accession_no=filing.get("accessionNo"),
+                    ))
                 else:
                     print("linkToFilingDetails not found in the response.")
-            else:
-                print("No filings found in the response.")
         else:
             print("No 10-K reports found within the specified criteria.")
-        return None, None
+        return manifests
 
     def download_sec_filing(self, url: str, ticker: str) -> Optional[str]:
         """
@@ -270,17 +442,14 @@ class SEC10KTool:
         if os.environ.get("ENABLE_SEC_API_CALLS", "True").lower() != "true":
             print("SEC API calls are disabled. Using only database data.")
 
-        db_pool = self._get_db_pool()
-        with db_pool.connect() as db_conn:
+        cache = self._get_storage()
+        with cache.connect() as db_conn:
             # Check if the report already exists in the database
-            result = db_conn.execute(
-                sqlalchemy.text("SELECT text_report FROM sec_filings WHERE url = :url"),
-                {"url": url},
-            ).fetchone()
+            text_report = self._read_text_report(db_conn, url)
 
-            if result:
+            if text_report is not None:
                 print(f"Report for URL '{url}' found in the database.")
-                return result[0]  # Return the text_report from the database
+                return text_report
 
             # Check if SEC API calls are enabled
             if os.environ.get("ENABLE_SEC_API_CALLS", "True").lower() != "true":
@@ -293,45 +462,54 @@ class SEC10KTool:
             )
 
             try:
-                response = requests.get(download_url, stream=True)
-                response.raise_for_status()  # Raise an exception for bad status codes
-
-                if response.headers["Content-Type"] == "application/pdf":
-                    filename = f"{ticker}_10k.pdf"
-                    with open(filename, "wb") as pdf_file:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            pdf_file.write(chunk)
-                    print(f"File '{filename}' downloaded successfully.")
-                    text_report = self._extract_text_from_pdf(filename)
-                    os.remove(filename)
-
-                    # Save the report to the database
-                    date_of_download = date.today()
-                    link_to_filing_details, date_of_report = self.get_10k_report_link(ticker)
-                    if not link_to_filing_details:
-                        link_to_filing_details = url
-                    db_conn.execute(
-                        sqlalchemy.text(
-                            "INSERT INTO sec_filings (url, text_report, ticker, date_of_report, date_of_download) VALUES (:url, :text_report, :ticker, :date_of_report, :date_of_download) ON CONFLICT (url) DO UPDATE SET text_report = :text_report, ticker = :ticker, date_of_report = :date_of_report, date_of_download = :date_of_download"
-                        ),
-                        {
-                            "url": link_to_filing_details,
-                            "text_report": text_report,
-                            "ticker": ticker,
-                            "date_of_report": date_of_report,
-                            "date_of_download": date_of_download,
-                        },
-                    )
-                    db_conn.commit()
-                    print(f"Report for URL '{url}' saved to the database.")
-                    return text_report
-                else:
-                    print(
-                        "The file at the given URL is not a PDF. Content-Type:"
-                        f" {response.headers['Content-Type']}"
-                    )
+                # Closing the response returns its keep-alive connection to the shared pool.
+                with httpclient.get(download_url, stream=True) as response:
+                    response.raise_for_status()  # Raise an exception for bad status codes
+
+                    if response.headers["Content-Type"] != "application/pdf":
+                        print(
+                            "The file at the given URL is not a PDF. Content-Type:"
+                            f" {response.headers['Content-Type']}"
+                        )
+                        return None
+                    pdf_buffer = self._download_to_buffer(response)
+
+                with pdf_buffer:
+                    text_report = self._extract_text_from_pdf(pdf_buffer)
+                if text_report is None:
                     return None
 
+                # Save the report to the database
+                date_of_download = date.today()
+                manifest = filingmanifest.manifest_for_download(
+                    self._manifests, url, ticker, self.get_filing_manifest
+                )
+                cache.save_filing(
+                    db_conn,
+                    {
+                        "url": url,
+                        "text_report_zstd": filingtext.compress_text(text_report),
+                        "content_sha256": filingdiff.content_hash(text_report),
+                        "ticker": ticker,
+                        "date_of_report": manifest.filed_at,
+                        "date_of_download": date_of_download,
+                        "form_type": manifest.form_type,
+                        "cik": manifest.cik,
+                        "accession_no": manifest.accession_no,
+                        "last_verified": datetime.now(timezone.utc),
+                    },
+                )
+                sections = self._save_sections(db_conn, url, text_report)
+                self._save_passages(db_conn, url, text_report, sections)
+                self._save_financials(db_conn, url, ticker, text_report, sections)
+                db_conn.commit()
+                self._rows.discard(ticker)
+                self._texts.set(url, text_report)
+                print(f"Report for URL '{url}' saved to the database.")
+                # retrieve_10k_passages embeds the filing itself if this has not run yet.
+                self._indexer.submit(url, lambda: self._embed_passages(url, text_report))
+                return text_report
+
             except requests.exceptions.RequestException as e:
                 print(f"Error downloading file: {e}")
                 return None
@@ -339,31 +517,692 @@ class SEC10KTool:
                 print(f"Error saving or retrieving report from database: {e}")
                 return None
 
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
+    def list_10k_sections(self, url: str, ticker: str) -> Optional[str]:
+        """
+        Makes sure a 10-K is downloaded and lists the Items that can be read from it.
+
+        Args:
+            url: The URL of the SEC filing.
+            ticker: The company's ticker symbol.
+
+        Returns:
+            One line per available Item with its title and length in characters,
+            or None if the filing could not be retrieved.
+        """
+        sections = self._get_sections(url)
+        if not sections:
+            if self.download_sec_filing(url, ticker) is None:
+                return None
+            sections = self._get_sections(url)
+        if not sections:
+            print(f"No sections could be located in the report for URL '{url}'.")
+            return None
+
+        lines = []
+        for item in filingsections.SECTION_ITEMS:
+            if item in sections:
+                start_offset, end_offset = sections[item]
+                label = "Signatures" if item == "SIGNATURES" else f"Item {item}"
+                lines.append(
+                    f"{label} ({filingsections.SECTION_TITLES[item]}): {end_offset - start_offset} characters"
+                )
+        return "\n".join(lines)
+
+    def get_10k_section(self, url: str, item: str) -> Optional[str]:
+        """
+        Returns the text of one Item of a downloaded 10-K.
+
+        Args:
+            url: The URL of the SEC filing.
+            item: The Item to return: 1, 1A, 7, 7A, 8, 10 or Signatures.
+
+        Returns:
+            The text of the requested Item, or None if the filing or the Item is not available.
+        """
+        section_item = filingsections.normalize_item(item)
+        if section_item is None:
+            return (
+                f"Unknown 10-K section '{item}'. Available sections: "
+                + ", ".join(filingsections.SECTION_ITEMS)
+            )
+
+        sections = self._get_sections(url)
+        if section_item not in sections:
+            print(f"Section '{section_item}' not available for URL '{url}'.")
+            return None
+        start_offset, end_offset = sections[section_item]
+
+        with self._get_storage().connect() as db_conn:
+            text_report = self._read_text_report(db_conn, url)
+        return text_report[start_offset:end_offset] if text_report is not None else None
+
+    def get_10k_changes(self, ticker: str, item: str) -> Optional[str]:
+        """
+        Reports what changed in a section between a company's two most recent 10-Ks.
+
+        Only the passages that were added or removed are returned, so this is much
+        smaller than either filing.
+
+        Args:
+            ticker: The company's ticker symbol.
+            item: The Item to compare (1, 1A, 7, 7A, 8, 10 or Signatures), or "all".
+
+        Returns:
+            The changed passages per Item, or None if two filings are not available.
+        """
+        if item and item.strip().lower() == "all":
+            items = list(filingsections.SECTION_ITEMS)
+        else:
+            section_item = filingsections.normalize_item(item)
+            if section_item is None:
+                return (
+                    f"Unknown 10-K section '{item}'. Available sections: "
+                    + ", ".join(filingsections.SECTION_ITEMS) + ", all"
+                )
+            items = [section_item]
+
+        filings = self._get_consecutive_filings(ticker)
+        if len(filings) < 2:
+            print(f"Two 10-K filings for ticker '{ticker}' are not available.")
+            return None
+        (new_url, new_date, new_hash), (old_url, old_date, old_hash) = filings
+
+        header = f"Changes in the {ticker} 10-K filed {new_date} compared with the one filed {old_date}:"
+        if new_hash and new_hash == old_hash:
+            return f"{header}\nThe two filings are identical."
+
+        old_sections = self._get_section_hashes(old_url)
+        new_sections = self._get_section_hashes(new_url)
+        old_text = new_text = None
+        lines = [header]
+        for section_item in items:
+            label = "Signatures" if section_item == "SIGNATURES" else f"Item {section_item}"
+            if section_item not in old_sections or section_item not in new_sections:
+                lines.append(f"\n## {label}\nNot found in both filings.")
+                continue
+            if old_sections[section_item][2] == new_sections[section_item][2]:
+                lines.append(f"\n## {label}\nUnchanged.")
+                continue
+            if new_text is None:
+                with self._get_storage().connect() as db_conn:
+                    old_text = self._read_text_report(db_conn, old_url)
+                    new_text = self._read_text_report(db_conn, new_url)
+            old_start, old_end, _ = old_sections[section_item]
+            new_start, new_end, _ = new_sections[section_item]
+            added, removed = filingdiff.diff_passages(
+                old_text[old_start:old_end], new_text[new_start:new_end]
+            )
+            lines.append(f"\n## {label}")
+            lines.extend(f"+ {passage}" for passage in added)
+            lines.extend(f"- {passage}" for passage in removed)
+            if not added and not removed:
+                lines.append("Only formatting changed.")
+        return "\n".join(lines)
+
+    def _get_consecutive_filings(self, ticker: str) -> list:
+        """
+        Returns (url, date_of_report, content_sha256) for the two most recent 10-Ks of
+        a ticker, most recent first, downloading them if they are not cached.
+        """
+        def cached_filings():
+            cache = self._get_storage()
+            with cache.connect() as db_conn:
+                return cache.recent_filings(db_conn, ticker, 2)
+
+        filings = cached_filings()
+        # Annual reports are about a year apart; a wider gap means a year is missing from the cache.
+        if len(filings) == 2 and (filings[0][1] - filings[1][1]).days <= 400:
+            return filings
+
+        api_key = os.environ.get("SEC_API_KEY")
+        if os.environ.get("ENABLE_SEC_API_CALLS", "True").lower() != "true" or not api_key:
+            return filings
+        cached_urls = {url for url, _, _ in filings}
+        for manifest in self._search_filing_manifests(ticker, api_key, size=2):
+            if manifest.url not in cached_urls:
+                self._remember_manifest(manifest)
+                self.download_sec_filing(manifest.url, ticker)
+        return cached_filings()
+
+    def _get_section_hashes(self, url: str) -> dict:
+        """
+        Returns item -> (start_offset, end_offset, content_sha256) for a filing.
+
+        Hashes missing from rows segmented before hashing existed are computed and stored.
+        """
+        self._get_sections(url)  # Segments the filing if that has not happened yet
+        with self._get_storage().connect() as db_conn:
+            rows = db_conn.execute(
+                database.text(
+                    "SELECT item, start_offset, end_offset, content_sha256 FROM sec_filing_sections WHERE url = :url"
+                ),
+                {"url": url},
+            ).fetchall()
+            if any(content_sha256 is None for _, _, _, content_sha256 in rows):
+                text_report = self._read_text_report(db_conn, url)
+                self._save_sections(db_conn, url, text_report)
+                db_conn.commit()
+                return self._get_section_hashes(url)
+        return {item: (start, end, content_sha256) for item, start, end, content_sha256 in rows}
+
+    def _get_sections(self, url: str) -> dict:
+        """
+        Returns the section offsets stored for a filing, segmenting it first if it was
+        cached before segmentation existed.
+
+        Args:
+            url: The URL of the SEC filing.
+
+        Returns:
+            A dict of item -> (start_offset, end_offset); empty if the filing is not cached.
+        """
+        with self._get_storage().connect() as db_conn:
+            rows = db_conn.execute(
+                database.text(
+                    "SELECT item, start_offset, end_offset FROM sec_filing_sections WHERE url = :url"
+                ),
+                {"url": url},
+            ).fetchall()
+            if rows:
+                return {item: (start, end) for item, start, end in rows}
+
+            text_report = self._read_text_report(db_conn, url)
+            if not text_report:
+                return {}
+            sections = self._save_sections(db_conn, url, text_report)
+            self._save_passages(db_conn, url, text_report, sections)
+            db_conn.commit()
+            return sections
+
+    def get_financials(self, ticker: str) -> Optional[str]:
+        """
+        Returns the headline figures of a company's latest cached 10-K, as read from
+        the consolidated income statement and balance sheet in Item 8.
+
+        Use this for the Financial Performance Highlights instead of reading Item 8.
+
+        Args:
+            ticker: The company's ticker symbol.
+
+        Returns:
+            A table of Revenue, Net Income, Total Assets and Total Liabilities per
+            fiscal year, or None if the 10-K has not been downloaded or its statements
+            could not be parsed.
+        """
+        ticker = (ticker or "").strip().upper()
+        cache = self._get_storage()
+        with cache.connect() as db_conn:
+            result = cache.latest_filing(db_conn, ticker)
+            if not result:
+                print(f"No report found for ticker '{ticker}' in the database.")
+                return None
+            url, date_of_report = result[:2]
+            query = database.text(
+                "SELECT metric, fiscal_year, value, unit FROM sec_financials WHERE url = :url ORDER BY fiscal_year"
+            )
+            rows = db_conn.execute(query, {"url": url}).fetchall()
+            if not rows:
+                # Filings cached before this stage existed are parsed on first use.
+                text_report = self._read_text_report(db_conn, url)
+                sections = self._get_sections(url)
+                self._save_financials(db_conn, url, ticker, text_report, sections)
+                db_conn.commit()
+                rows = db_conn.execute(query, {"url": url}).fetchall()
+        if not rows:
+            print(f"No financial statements could be parsed from the report for URL '{url}'.")
+            return None
+
+        years = sorted({fiscal_year for _, fiscal_year, _, _ in rows})
+        values = {(metric, fiscal_year): value for metric, fiscal_year, value, _ in rows}
+        # The unit is stated per statement, e.g. an income statement in thousands and
+        # a balance sheet in millions, so it labels the table only if they agree.
+        units = {metric: unit for metric, _, _, unit in rows}
+        shared_unit = units[rows[0][0]] if len(set(units.values())) == 1 else None
+        lines = [
+            f"{ticker} 10-K filed {date_of_report}, consolidated statements (Item 8)"
+            + (f", {shared_unit}" if shared_unit else ""),
+            "| Metric | " + " | ".join(f"FY{year}" for year in years) + " |",
+            "|---" * (len(years) + 1) + "|",
+        ]
+        for metric, label in self.FINANCIAL_METRICS.items():
+            if any((metric, year) in values for year in years):
+                if not shared_unit:
+                    label = f"{label} ({units[metric]})"
+                cells = [
+                    f"{float(values[metric, year]):,.0f}" if (metric, year) in values else "n/a"
+                    for year in years
+                ]
+                lines.append(f"| {label} | " + " | ".join(cells) + " |")
+        return "\n".join(lines)
+
+    def search_10k(self, ticker: str, query: str, k: int) -> Optional[str]:
+        """
+        Full-text search over the passages of cached 10-K filings.
+
+        Use this to look up a single fact (e.g., number of employees, competitors named
+        in the risk factors) instead of reading a whole section.
+
+        Args:
+            ticker: The company's ticker symbol, or "all" to search every cached company.
+            query: The words to search for. Supports quoted phrases, "or" and "-word".
+            k: The number of passages to return (at most 20).
+
+        Returns:
+            The top-ranked passages with their source filing, Item and character
+            offsets, or None if nothing matched.
+        """
+        ticker = (ticker or "").strip().upper()
+        if ticker in ("ALL", "*"):
+            ticker = ""
+        k = max(1, min(int(k or 5), 20))
+
+        cache = self._get_storage()
+        with cache.connect() as db_conn:
+            rows = cache.search_passages(db_conn, ticker, query, k)
+            if not rows:
+                print(f"No passages matched '{query}' for ticker '{ticker or 'all'}'.")
+                return None
+
+            texts = {}
+            results = []
+            for url, row_ticker, date_of_report, item, start_offset, end_offset, rank in rows:
+                if url not in texts:
+                    texts[url] = self._read_text_report(db_conn, url) or ""
+                label = "Signatures" if item == "SIGNATURES" else f"Item {item}" if item else "Cover/other"
+                results.append(
+                    f"[{row_ticker} 10-K filed {date_of_report}, {label}, characters {start_offset}-{end_offset}, rank {rank:.3f}]\n"
+                    + texts[url][start_offset:end_offset].strip()
+                )
+        return "\n\n".join(results)
+
+    def retrieve_10k_passages(self, ticker: str, question: str, k: int) -> Optional[str]:
+        """
+        Semantic search over the latest cached 10-K of a company.
+
+        Unlike search_10k this matches meaning rather than keywords, so it also finds
+        paraphrased facts such as the mission statement or the state of incorporation.
+        Use it for the SWOT, strategy and risk synthesis.
+
+        Args:
+            ticker: The company's ticker symbol.
+            question: A natural-language question or description of what to find.
+            k: The number of passages to return (at most 20).
+
+        Returns:
+            The most relevant passages with their Item and character offsets, or None
+            if the company's 10-K has not been downloaded.
+        """
+        ticker = (ticker or "").strip().upper()
+        k = max(1, min(int(k or 5), 20))
+        cache = self._get_storage()
+        with cache.connect() as db_conn:
+            result = cache.latest_filing(db_conn, ticker)
+            if not result:
+                print(f"No report found for ticker '{ticker}' in the database.")
+                return None
+            url, date_of_report = result[:2]
+            text_report = self._read_text_report(db_conn, url)
+
+        self._get_sections(url)  # Segments and chunks filings cached before passages existed
+        embedding = self._indexer.pending(url)
+        if embedding is not None:
+            embedding.result()  # A download is embedding this filing in the background
+        if not self._embed_passages(url, text_report):
+            return None
+        try:
+            query_vector = self._get_embedder().embed_query(question)
+        except Exception as e:
+            print(f"Error embedding the question: {e}")
+            return None
+
+        results = []
+        for score, (_, start_offset, end_offset, item) in self._get_passage_index().search(url, query_vector, k):
+            label = "Signatures" if item == "SIGNATURES" else f"Item {item}" if item else "Cover/other"
+            results.append(
+                f"[{ticker} 10-K filed {date_of_report}, {label}, characters {start_offset}-{end_offset}, similarity {score:.3f}]\n"
+                + text_report[start_offset:end_offset].strip()
+            )
+        return "\n\n".join(results) if results else None
+
+    def _get_embedder(self):
+        """
+        Returns the passage embedder selected by PASSAGE_EMBEDDER ("genai" or "hashing").
+        """
+        from . import passageindex
+
+        if self._embedder is None:
+            if os.environ.get("PASSAGE_EMBEDDER", "genai").lower() == "hashing":
+                self._embedder = passageindex.HashingEmbedder()
+            else:
+                self._embedder = passageindex.GenAIEmbedder(
+                    model=os.environ.get("PASSAGE_EMBEDDING_MODEL", "text-embedding-004")
+                )
+        return self._embedder
+
+    def _get_passage_index(self):
+        """
+        Returns the passage index selected by PASSAGE_INDEX_BACKEND ("pgvector" or
+        "local"). The default depends on the storage backend.
+        """
+        from . import passageindex
+
+        if self._passage_index is None:
+            cache = self._get_storage()
+            if os.environ.get("PASSAGE_INDEX_BACKEND", cache.passage_index_backend).lower() == "local":
+                self._passage_index = passageindex.NumpyPassageIndex(ttlcache.passage_cache())
+            else:
+                self._passage_index = passageindex.PgVectorPassageIndex(cache.engine)
+        return self._passage_index
+
+    def _embed_passages(self, url: str, text_report: str) -> bool:
+        """
+        Embeds the stored passages of a filing unless the index already has them.
+
+        Embedding failures are reported but never fail the ingest; the filing is
+        embedded again on the next retrieval.
+
+        Returns:
+            True if the filing's passages are in the index.
+        """
+        try:
+            index = self._get_passage_index()
+            if index.has(url):
+                return True
+            with self._get_storage().connect() as db_conn:
+                passages = db_conn.execute(
+                    database.text(
+                        "SELECT passage_no, start_offset, end_offset, item FROM sec_filing_passages WHERE url = :url ORDER BY passage_no"
+                    ),
+                    {"url": url},
+                ).fetchall()
+            if not passages:
+                return False
+            passages = [tuple(passage) for passage in passages]
+            vectors = self._get_embedder().embed_documents(
+                [text_report[start:end] for _, start, end, _ in passages]
+            )
+            index.add(url, passages, vectors)
+        except Exception as e:
+            print(f"Error embedding passages of the report for URL '{url}': {e}")
+            return False
+        print(f"Embedded {len(passages)} passages of the report for URL '{url}'.")
+        return True
+
+    def _save_passages(self, db_conn, url: str, text_report: str, sections: dict):
+        """
+        Splits a 10-K into passages and stores their offsets with a full-text search
+        vector. The caller commits.
+
+        Args:
+            db_conn: An open database connection.
+            url: The URL the filing is stored under.
+            text_report: The extracted text of the filing.
+            sections: The section offsets of the filing.
+        """
+        passages = filingsections.split_passages(text_report, sections)
+        self._get_storage().save_passages(
+            db_conn,
+            url,
+            [
+                {
+                    "passage_no": passage_no,
+                    "item": item,
+                    "start_offset": start,
+                    "end_offset": end,
+                    "content": text_report[start:end],
+                }
+                for passage_no, (start, end, item) in enumerate(passages)
+            ],
+        )
+        print(f"Indexed {len(passages)} passages of the report for URL '{url}'.")
+
+    def _save_financials(self, db_conn, url: str, ticker: str, text_report: str, sections: dict):
+        """
+        Parses the consolidated statements in Item 8 into one row per metric and fiscal
+        year. The caller commits.
+
+        The rows are written in a savepoint. Parsing the statements is optional, so if it
+        fails only the savepoint is rolled back, and the filing is still saved and served.
+
+        Args:
+            db_conn: An open database connection.
+            url: The URL the filing is stored under.
+            ticker: The company's ticker symbol.
+            text_report: The extracted text of the filing.
+            sections: The section offsets of the filing.
+        """
+        try:
+            if "8" in sections:
+                start_offset, end_offset = sections["8"]
+                rows = financials.extract_financials(text_report[start_offset:end_offset])
+            else:
+                rows = financials.extract_financials(text_report)
+            with db_conn.begin_nested():
+                db_conn.execute(
+                    database.text("DELETE FROM sec_financials WHERE url = :url"),
+                    {"url": url},
+                )
+                if rows:
+                    db_conn.execute(
+                        database.text(
+                            "INSERT INTO sec_financials (url, ticker, metric, fiscal_year, value, unit) VALUES (:url, :ticker, :metric, :fiscal_year, :value, :unit)"
+                        ),
+                        [dict(row, url=url, ticker=ticker) for row in rows],
+                    )
+        except Exception as e:
+            print(f"Could not save the financial statements of the report for URL '{url}': {e}")
+            return
+        print(f"Parsed {len(rows)} financial statement values from the report for URL '{url}'.")
+
+    def _read_text_report(self, db_conn, url: str) -> Optional[str]:
+        """
+        Reads the text of a cached filing, decompressing it if needed. Recently read
+        filings are served from memory (see filingtext.read_text).
+
+        Args:
+            db_conn: An open database connection.
+            url: The URL the filing is stored under.
+
+        Returns:
+            The extracted text of the filing, or None if it is not cached.
+        """
+        return filingtext.read_text(
+            self._texts, url, lambda: self._get_storage().read_filing(db_conn, url)
+        )
+
+    def compress_existing_reports(self, batch_size: int = 20) -> int:
+        """
+        Moves filings stored as plain text_report into the compressed column.
+
+        Rows are converted in small batches, each in its own transaction, so the
+        migration can be interrupted and resumed.
+
+        Args:
+            batch_size: The number of filings converted per transaction.
+
+        Returns:
+            The number of filings compressed.
+        """
+        cache = self._get_storage()
+        total = 0
+        with cache.connect() as db_conn:
+            while True:
+                rows = cache.uncompressed_filings(db_conn, batch_size)
+                if not rows:
+                    break
+                cache.save_compressed_filings(
+                    db_conn,
+                    [
+                        {"url": url, "text_report_zstd": filingtext.compress_text(text_report)}
+                        for url, text_report in rows
+                    ],
+                )
+                db_conn.commit()
+                total += len(rows)
+                print(f"Compressed {total} reports so far.")
+        return total
+
+    def _save_sections(self, db_conn, url: str, text_report: str) -> dict:
+        """
+        Segments a 10-K into Items and stores their offsets. The caller commits.
+
+        Args:
+            db_conn: An open database connection.
+            url: The URL the filing is stored under.
+            text_report: The extracted text of the filing.
+
+        Returns:
+            A dict of item -> (start_offset, end_offset).
+        """
+        sections = filingsections.split_sections(text_report)
+        db_conn.execute(
+            database.text("DELETE FROM sec_filing_sections WHERE url = :url"),
+            {"url": url},
+        )
+        if sections:
+            db_conn.execute(
+                database.text(
+                    "INSERT INTO sec_filing_sections (url, item, start_offset, end_offset, content_sha256) VALUES (:url, :item, :start_offset, :end_offset, :content_sha256)"
+                ),
+                [
+                    {
+                        "url": url,
+                        "item": item,
+                        "start_offset": start,
+                        "end_offset": end,
+                        "content_sha256": filingdiff.content_hash(text_report[start:end]),
+                    }
+                    for item, (start, end) in sections.items()
+                ],
+            )
+        print(f"Located {len(sections)} sections in the report for URL '{url}'.")
+        return sections
+
+    def _download_to_buffer(self, response: requests.Response) -> BinaryIO:
+        """
+        Streams the body of a PDF response into a spooled buffer.
+
+        The body is kept in memory up to `pdf_spool_max_bytes` and rolls over to an
+        anonymous temporary file beyond that, so nothing is written to the working
+        directory and concurrent downloads of the same ticker cannot collide.
+
+        Args:
+            response: A streaming response for the PDF.
+
+        Returns:
+            A file-like object positioned at the start of the PDF.
+        """
+        pdf_buffer, size = pdftext.spool_download(
+            response.iter_content(chunk_size=64 * 1024), self.pdf_spool_max_bytes
+        )
+        location = "temporary file" if size > self.pdf_spool_max_bytes else "memory"
+        print(f"Downloaded {size} bytes of PDF into {location}.")
+        return pdf_buffer
+
+    def _iter_pdf_pages(self, pdf_reader: "PyPDF2.PdfReader") -> Iterator[str]:
+        """
+        Yields the text of each page of a PDF, one page at a time.
+
+        Args:
+            pdf_reader: An open PdfReader.
+
+        Yields:
+            The extracted text of each page (empty string for pages without text).
+        """
+        for page in pdf_reader.pages:
+            yield page.extract_text() or ""
+
+    def _extract_text_from_pdf(self, pdf_file: Union[str, BinaryIO]) -> str:
         """
         Extracts text from a PDF file.
 
         Args:
-            pdf_path: The path to the PDF file.
+            pdf_file: The path to the PDF file or a binary file-like object holding it.
 
         Returns:
             The extracted text from the PDF file or None if there's an error.
         """
+        import PyPDF2
+
         try:
-            with open(pdf_path, "rb") as pdf_file:
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                text = ""
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text()
-                return text
+            if isinstance(pdf_file, str):
+                with open(pdf_file, "rb") as pdf_stream:
+                    return self._extract_text_from_pdf(pdf_stream)
+
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            num_pages = len(pdf_reader.pages)
+            if (
+                self.pdf_extract_workers > 1
+                and num_pages >= self.pdf_parallel_min_pages
+            ):
+                text = self._extract_text_parallel(pdf_file, num_pages)
+            else:
+                text = None
+            if text is None:
+                text = "".join(self._iter_pdf_pages(pdf_reader))
+            print(
+                f"Extracted {len(text)} characters from {num_pages} pages"
+                f" (peak RSS {self._peak_rss_mb():.1f} MB)."
+            )
+            return text
         except FileNotFoundError:
-            print(f"Error: PDF file not found at '{pdf_path}'")
+            print(f"Error: PDF file not found at '{pdf_file}'")
             return None
         except PyPDF2.errors.PdfReadError:
-            print(f"Error: Could not read PDF file at '{pdf_path}'")
+            print("Error: Could not read PDF file")
             return None
 
+    def _extract_text_parallel(self, pdf_file: BinaryIO, num_pages: int) -> Optional[str]:
+        """
+        Extracts text from a PDF by splitting its pages across a process pool (see
+        pdftext.extract_parallel).
+
+        Args:
+            pdf_file: A binary file-like object holding the PDF.
+            num_pages: The number of pages in the PDF.
+
+        Returns:
+            The extracted text, or None if the process pool failed and the caller
+            should fall back to serial extraction.
+        """
+        text = pdftext.extract_parallel(
+            self._get_pdf_executor(), pdf_file, num_pages, self.pdf_extract_workers
+        )
+        if text is None:
+            # The pool may be broken; the next parallel extraction starts a new one.
+            self._pdf_executor.shutdown(wait=False, cancel_futures=True)
+            self._pdf_executor = None
+        return text
+
+    def _get_pdf_executor(self) -> ProcessPoolExecutor:
+        """
+        Returns the process pool used for page-parallel PDF extraction. The pool is
+        shut down when the interpreter exits.
+        """
+        if self._pdf_executor is None:
+            self._pdf_executor = ProcessPoolExecutor(max_workers=self.pdf_extract_workers)
+            atexit.register(self._pdf_executor.shutdown, wait=False, cancel_futures=True)
+        return self._pdf_executor
+
+    @staticmethod
+    def _peak_rss_mb() -> float:
+        """
+        Returns the peak resident set size of this process in MB (0.0 if unknown).
+        """
+        if resource is None:
+            return 0.0
+        # ru_maxrss is reported in kilobytes on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    # One-off migration of reports cached before compression:
+    #   python -m corporate_analyst.sec10ktool compress-existing
+    import sys
+
+    if sys.argv[1:] == ["compress-existing"]:
+        SEC10KTool().compress_existing_reports()
+
 
 # Example usage (you can remove this part if you don't need it in this file):
 # if __name__ == "__main__":
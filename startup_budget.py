@@ -0,0 +1,110 @@
+"""Checks the import time of the agent package against startup_budget.json.
+
+Usage (from the package directory):
+
+    python startup_budget.py [--top N]
+
+The package is imported in --runs fresh interpreters with `python -X importtime`,
+and each module's cumulative time is the median of the runs, so one slow run does
+not fail the check. The script prints the slowest imports and fails if a package
+module exceeds its cumulative budget, or if a module that should only load on
+first use (the database driver, PyPDF2, NumPy, ...) was imported.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_FILE = os.path.join(PACKAGE_DIR, "startup_budget.json")
+
+
+def profile_imports(package: str, module: str) -> List[Tuple[str, float, float]]:
+    """
+    Imports package.module in a new interpreter.
+
+    Returns:
+        One (module name, self ms, cumulative ms) tuple per import, in import order.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {package}.{module}"],
+        cwd=os.path.dirname(PACKAGE_DIR),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {package}.{module} failed:\n{result.stderr[-2000:]}")
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return imports
+
+
+def median_imports(runs: List[List[Tuple[str, float, float]]]) -> List[Tuple[str, float, float]]:
+    """
+    Combines the imports of several runs into one (module name, self ms, cumulative
+    ms) tuple per module, with the median times of the runs that imported it.
+    """
+    times: Dict[str, List[Tuple[float, float]]] = {}
+    for imports in runs:
+        for name, self_ms, cumulative_ms in imports:
+            times.setdefault(name, []).append((self_ms, cumulative_ms))
+    return [
+        (
+            name,
+            statistics.median(self_ms for self_ms, _ in samples),
+            statistics.median(cumulative_ms for _, cumulative_ms in samples),
+        )
+        for name, samples in times.items()
+    ]
+
+
+def check(budget: Dict, imports: List[Tuple[str, float, float]], package: str) -> List[str]:
+    """
+    Returns one message per budget violation.
+    """
+    cumulative = {name: ms for name, _, ms in imports}
+    violations = []
+    for module, limit in budget["max_cumulative_ms"].items():
+        ms = cumulative.get(f"{package}.{module}")
+        if ms is not None and ms > limit:
+            violations.append(f"{module} took {ms:.0f} ms to import (budget {limit} ms)")
+    for module in budget["deferred_modules"]:
+        for name in (module, f"{package}.{module}"):
+            if name in cumulative:
+                violations.append(f"{name} is imported at startup but should load on first use")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to print")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to take the median of")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as budget_file:
+        budget = json.load(budget_file)
+    package = os.path.basename(PACKAGE_DIR)
+    imports = median_imports([profile_imports(package, budget["module"]) for _ in range(max(1, args.runs))])
+
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for name, self_ms, cumulative_ms in sorted(imports, key=lambda i: -i[1])[:args.top]:
+        print(f"{self_ms:9.1f} {cumulative_ms:9.1f}  {name}")
+    total = next((ms for name, _, ms in imports if name == f"{package}.{budget['module']}"), 0.0)
+    print(f"\nImporting {package}.{budget['module']} took {total:.0f} ms (median of {max(1, args.runs)} runs).")
+
+    violations = check(budget, imports, package)
+    for violation in violations:
+        print(f"OVER BUDGET: {violation}")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,779 @@
+"""Storage of the cached filings and enrichments.
+
+The tools read and write `sec_filings`, `zoominfo_enrichments`, `nubela_enrichments`
+and the passage search index through a Storage, so the SQL that differs between
+databases lives in one place. Two backends are available, selected by
+STORAGE_BACKEND:
+
+* "postgres" (default): the Cloud SQL database created by main.tf.
+* "sqlite": an embedded database file at SQLITE_PATH (corporate_analyst.db by
+  default). The schema is created on first use, full-text search uses FTS5 and
+  passages are embedded in the in-process NumPy index. Nothing but the upstream
+  APIs is needed, so the tools run offline and on a single node without a network
+  hop per lookup.
+
+Statements that mean the same thing on both databases (the section and financial
+statement tables) are still run directly on the connection from Storage.connect().
+Values read back have the same Python types on both backends: DATE columns are
+dates, TIMESTAMPTZ columns are aware datetimes and JSONB columns are decoded.
+
+get_enrichment_projection() reads selected paths of an enrichment document, picked
+out by the database, so only the fields a tool reports are sent over the wire.
+project_json() applies the same projection to a document in memory.
+
+Code running on an event loop uses get_async_storage() instead, which runs the same
+statements through SQLAlchemy's asyncio extension (asyncpg or aiosqlite) without
+blocking the loop.
+"""
+
+import abc
+import json
+import os
+import re
+import threading
+import weakref
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import sqlalchemy
+
+# Enrichment source -> (table, JSON column).
+ENRICHMENT_TABLES = {
+    "zoominfo": ("zoominfo_enrichments", "company_enrichment_data"),
+    "nubela": ("nubela_enrichments", "nubela_enrichment_data"),
+}
+
+# A path into a JSON document: object keys and array indexes, e.g. ("data", 0, "name").
+JsonPath = Tuple[Union[str, int], ...]
+
+# Output key -> the paths it may be found at, tried in order.
+Projection = Dict[str, Sequence[JsonPath]]
+
+_storage = None
+_lock = threading.Lock()
+_async_storages = weakref.WeakKeyDictionary()  # event loop -> AsyncStorage
+
+
+def _text(sql: str) -> "sqlalchemy.TextClause":
+    import sqlalchemy
+
+    return sqlalchemy.text(sql)
+
+
+_MISSING = object()
+
+
+def _follow(document: Any, path: JsonPath) -> Any:
+    for step in path:
+        if isinstance(step, int):
+            if not isinstance(document, list) or step >= len(document):
+                return _MISSING
+            document = document[step]
+        elif isinstance(document, dict) and step in document:
+            document = document[step]
+        else:
+            return _MISSING
+    return document
+
+
+def project_json(document: Any, projection: Projection) -> Dict[str, Any]:
+    """
+    Returns the fields of a decoded JSON document named by a projection, as
+    get_enrichment_projection would read them from the database. Each field takes
+    the value at the first of its paths that exists; fields that are missing or
+    null are left out.
+    """
+    fields = {}
+    for key, paths in projection.items():
+        for path in paths:
+            value = _follow(document, path)
+            if value is not _MISSING:
+                if value is not None:
+                    fields[key] = value
+                break
+    return fields
+
+
+class Storage(abc.ABC):
+    """
+    Reads and writes of the cache tables. Subclasses supply the engine and the
+    full-text search statements.
+    """
+
+    # The passage index used when PASSAGE_INDEX_BACKEND is not set.
+    passage_index_backend = "pgvector"
+
+    def __init__(self, engine: "sqlalchemy.engine.Engine"):
+        self.engine = engine
+
+    def connect(self) -> "sqlalchemy.engine.Connection":
+        """
+        Opens a connection. The caller commits.
+        """
+        return self.engine.connect()
+
+    def latest_filing(self, db_conn, ticker: str):
+        """
+        Returns (url, date_of_report, form_type, cik, accession_no, last_verified) of
+        the most recent cached 10-K of a ticker, or None.
+        """
+        return db_conn.execute(
+            _text(
+                "SELECT url, date_of_report, form_type, cik, accession_no, last_verified FROM sec_filings WHERE ticker = :ticker ORDER BY date_of_report DESC NULLS LAST LIMIT 1"
+            ),
+            {"ticker": ticker},
+        ).fetchone()
+
+    def recent_filings(self, db_conn, ticker: str, limit: int) -> list:
+        """
+        Returns (url, date_of_report, content_sha256) of the most recent cached 10-Ks
+        of a ticker that have a report date, most recent first.
+        """
+        return db_conn.execute(
+            _text(
+                "SELECT url, date_of_report, content_sha256 FROM sec_filings WHERE ticker = :ticker AND date_of_report IS NOT NULL ORDER BY date_of_report DESC NULLS LAST LIMIT :limit"
+            ),
+            {"ticker": ticker, "limit": limit},
+        ).fetchall()
+
+    def read_filing(self, db_conn, url: str):
+        """
+        Returns (text_report, text_report_zstd) of a cached filing, or None.
+        """
+        return db_conn.execute(
+            _text(
+                "SELECT text_report, text_report_zstd FROM sec_filings WHERE url = :url"
+            ),
+            {"url": url},
+        ).fetchone()
+
+    def save_filing(self, db_conn, filing: Dict[str, Any]):
+        """
+        Inserts or replaces a filing. `filing` has the url, text_report_zstd,
+        content_sha256, ticker, date_of_report, date_of_download, form_type, cik,
+        accession_no and last_verified columns.
+        """
+        db_conn.execute(
+            _text(
+                "INSERT INTO sec_filings (url, text_report, text_report_zstd, content_sha256, ticker, date_of_report, date_of_download, form_type, cik, accession_no, last_verified) VALUES (:url, NULL, :text_report_zstd, :content_sha256, :ticker, :date_of_report, :date_of_download, :form_type, :cik, :accession_no, :last_verified) ON CONFLICT (url) DO UPDATE SET text_report = NULL, text_report_zstd = :text_report_zstd, content_sha256 = :content_sha256, ticker = :ticker, date_of_report = :date_of_report, date_of_download = :date_of_download, form_type = :form_type, cik = :cik, accession_no = :accession_no, last_verified = :last_verified"
+            ),
+            filing,
+        )
+
+    def touch_filing(self, db_conn, url: str, last_verified: datetime):
+        """
+        Records that a cached filing is still the latest one.
+        """
+        db_conn.execute(
+            _text(
+                "UPDATE sec_filings SET last_verified = :last_verified WHERE url = :url"
+            ),
+            {"url": url, "last_verified": last_verified},
+        )
+
+    def uncompressed_filings(self, db_conn, limit: int) -> list:
+        """
+        Returns (url, text_report) of filings stored before compression.
+        """
+        return db_conn.execute(
+            _text(
+                "SELECT url, text_report FROM sec_filings WHERE text_report IS NOT NULL AND text_report_zstd IS NULL LIMIT :batch_size"
+            ),
+            {"batch_size": limit},
+        ).fetchall()
+
+    def save_compressed_filings(self, db_conn, compressed: Sequence[Dict[str, Any]]):
+        """
+        Replaces text_report with text_report_zstd for each {"url", "text_report_zstd"}.
+        """
+        db_conn.execute(
+            _text(
+                "UPDATE sec_filings SET text_report_zstd = :text_report_zstd, text_report = NULL WHERE url = :url"
+            ),
+            list(compressed),
+        )
+
+    def get_enrichment(self, db_conn, source: str, ticker: str):
+        """
+        Returns (data, last_update_date, last_verified) of a cached enrichment, or None.
+
+        Args:
+            source: "zoominfo" or "nubela".
+        """
+        table, data_column = ENRICHMENT_TABLES[source]
+        return db_conn.execute(
+            _text(
+                f"SELECT {data_column}, last_update_date, last_verified FROM {table} WHERE ticker = :ticker"
+            ),
+            {"ticker": ticker},
+        ).fetchone()
+
+    def get_enrichments(self, db_conn, source: str, tickers: Sequence[str]) -> Dict[str, tuple]:
+        """
+        Returns the (data, last_update_date, last_verified) of the cached enrichments
+        of several tickers, by ticker. Tickers without one are left out.
+        """
+        if not tickers:
+            return {}
+        import sqlalchemy
+
+        table, data_column = ENRICHMENT_TABLES[source]
+        statement = _text(
+            f"SELECT ticker, {data_column}, last_update_date, last_verified FROM {table} WHERE ticker IN :tickers"
+        ).bindparams(sqlalchemy.bindparam("tickers", expanding=True))
+        return {
+            row[0]: tuple(row[1:])
+            for row in db_conn.execute(statement, {"tickers": list(tickers)})
+        }
+
+    def get_enrichment_projection(
+        self, db_conn, source: str, ticker: str, projection: Projection
+    ) -> Optional[Tuple[Dict[str, Any], date, datetime]]:
+        """
+        Returns (fields, last_update_date, last_verified) of a cached enrichment, or
+        None. Only the fields named by the projection are read from the document
+        (see project_json).
+
+        Args:
+            source: "zoominfo" or "nubela".
+        """
+        table, data_column = ENRICHMENT_TABLES[source]
+        params = {"ticker": ticker}
+        pairs = []
+        for i, (key, paths) in enumerate(projection.items()):
+            params[f"key_{i}"] = key
+            alternatives = [
+                self._json_path_sql(data_column, path, f"path_{i}_{j}", params)
+                for j, path in enumerate(paths)
+            ]
+            value = alternatives[0] if len(alternatives) == 1 else f"COALESCE({', '.join(alternatives)})"
+            pairs.append(f"{self._json_key_sql(f'key_{i}')}, {value}")
+        row = db_conn.execute(
+            _text(
+                f"SELECT {self._json_object_function}({', '.join(pairs)}), last_update_date, last_verified FROM {table} WHERE ticker = :ticker"
+            ),
+            params,
+        ).fetchone()
+        if row is None:
+            return None
+        fields, last_update_date, last_verified = row
+        if isinstance(fields, str):
+            fields = json.loads(fields)
+        return (
+            {key: fields[key] for key in projection if fields.get(key) is not None},
+            last_update_date,
+            last_verified,
+        )
+
+    # The SQL of get_enrichment_projection, which differs between databases.
+    _json_object_function = "jsonb_build_object"
+
+    @staticmethod
+    def _json_path_sql(column: str, path: JsonPath, param: str, params: Dict[str, Any]) -> str:
+        # One text parameter per step: asyncpg does not accept a string for a text[]
+        # parameter, and pg8000 and asyncpg both bind scalars the same way.
+        names = []
+        for k, step in enumerate(path):
+            params[f"{param}_{k}"] = str(step)
+            names.append(f"CAST(:{param}_{k} AS TEXT)")
+        return f"jsonb_extract_path({column}, {', '.join(names)})"
+
+    @staticmethod
+    def _json_key_sql(param: str) -> str:
+        return f"CAST(:{param} AS TEXT)"
+
+    def save_enrichment(
+        self,
+        db_conn,
+        source: str,
+        ticker: str,
+        data: Any,
+        last_update_date: date,
+        last_verified: datetime,
+        **columns: Any,
+    ):
+        """
+        Inserts or replaces the enrichment of a ticker.
+
+        Args:
+            source: "zoominfo" or "nubela".
+            data: The decoded API response, stored as JSON.
+            columns: The other columns of the table, e.g. company_domain.
+        """
+        table, data_column = ENRICHMENT_TABLES[source]
+        values = dict(
+            columns,
+            ticker=ticker,
+            last_update_date=last_update_date,
+            last_verified=last_verified,
+        )
+        values[data_column] = json.dumps(data)
+        names = list(values)
+        updates = ", ".join(f"{name} = :{name}" for name in names if name != "ticker")
+        db_conn.execute(
+            _text(
+                f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join(':' + name for name in names)}) ON CONFLICT (ticker) DO UPDATE SET {updates}"
+            ),
+            values,
+        )
+
+    def touch_enrichment(self, db_conn, source: str, ticker: str, last_verified: datetime):
+        """
+        Records that a cached enrichment matches the API.
+        """
+        table, _ = ENRICHMENT_TABLES[source]
+        db_conn.execute(
+            _text(
+                f"UPDATE {table} SET last_verified = :last_verified WHERE ticker = :ticker"
+            ),
+            {"ticker": ticker, "last_verified": last_verified},
+        )
+
+    @abc.abstractmethod
+    def save_passages(self, db_conn, url: str, passages: Sequence[Dict[str, Any]]):
+        """
+        Replaces the passages of a filing and their full-text search entries. Each
+        passage has passage_no, item, start_offset, end_offset and content.
+        """
+
+    @abc.abstractmethod
+    def search_passages(self, db_conn, ticker: str, query: str, k: int) -> list:
+        """
+        Full-text search over the passages of the latest filing of each ticker.
+
+        Args:
+            ticker: The ticker to search, or "" for every ticker.
+            query: Words, quoted phrases, "or" and "-word".
+            k: The number of passages to return.
+
+        Returns:
+            (url, ticker, date_of_report, item, start_offset, end_offset, rank) rows,
+            best first.
+        """
+
+
+class PostgresStorage(Storage):
+    """
+    The Cloud SQL database, searched with tsvector.
+    """
+
+    def save_passages(self, db_conn, url: str, passages: Sequence[Dict[str, Any]]):
+        db_conn.execute(
+            _text("DELETE FROM sec_filing_passages WHERE url = :url"),
+            {"url": url},
+        )
+        if passages:
+            db_conn.execute(
+                _text(
+                    "INSERT INTO sec_filing_passages (url, passage_no, item, start_offset, end_offset, search_vector) VALUES (:url, :passage_no, :item, :start_offset, :end_offset, to_tsvector('english', :content))"
+                ),
+                [dict(passage, url=url) for passage in passages],
+            )
+
+    def search_passages(self, db_conn, ticker: str, query: str, k: int) -> list:
+        return db_conn.execute(
+            _text(
+                """
+                WITH latest AS (
+                    SELECT DISTINCT ON (ticker) url, ticker, date_of_report
+                    FROM sec_filings
+                    WHERE :ticker = '' OR ticker = :ticker
+                    ORDER BY ticker, date_of_report DESC NULLS LAST
+                )
+                SELECT p.url, latest.ticker, latest.date_of_report, p.item, p.start_offset, p.end_offset,
+                       ts_rank_cd(p.search_vector, query) AS rank
+                FROM sec_filing_passages p
+                JOIN latest ON latest.url = p.url,
+                     websearch_to_tsquery('english', :query) query
+                WHERE p.search_vector @@ query
+                ORDER BY rank DESC
+                LIMIT :k
+                """
+            ),
+            {"ticker": ticker, "query": query, "k": k},
+        ).fetchall()
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sec_filings (
+    url TEXT PRIMARY KEY,
+    text_report TEXT,
+    text_report_zstd BLOB,
+    content_sha256 TEXT,
+    ticker TEXT,
+    date_of_report DATE,
+    date_of_download DATE,
+    form_type TEXT,
+    cik TEXT,
+    accession_no TEXT,
+    last_verified TIMESTAMPTZ
+);
+
+-- The covering indexes of migrations/0002_covering_indexes.sql. SQLite has no INCLUDE,
+-- so the selected columns are trailing key columns; DESC sorts NULLs last.
+CREATE INDEX IF NOT EXISTS sec_filings_ticker_date_idx
+    ON sec_filings (ticker, date_of_report DESC, url, form_type, cik, accession_no, last_verified, content_sha256);
+
+CREATE TABLE IF NOT EXISTS sec_filing_sections (
+    url TEXT REFERENCES sec_filings (url) ON DELETE CASCADE,
+    item TEXT,
+    start_offset INTEGER,
+    end_offset INTEGER,
+    content_sha256 TEXT,
+    PRIMARY KEY (url, item)
+);
+
+-- The section and passage lookups use the primary keys; drop the url indexes that
+-- earlier versions created alongside them.
+DROP INDEX IF EXISTS sec_filing_sections_url_idx;
+
+CREATE TABLE IF NOT EXISTS sec_filing_passages (
+    url TEXT REFERENCES sec_filings (url) ON DELETE CASCADE,
+    passage_no INTEGER,
+    item TEXT,
+    start_offset INTEGER,
+    end_offset INTEGER,
+    PRIMARY KEY (url, passage_no)
+);
+
+DROP INDEX IF EXISTS sec_filing_passages_url_idx;
+
+-- One row per passage, sharing the passage's rowid.
+CREATE VIRTUAL TABLE IF NOT EXISTS sec_filing_passages_fts USING fts5 (
+    content, tokenize = 'porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS sec_filing_passages_fts_delete
+AFTER DELETE ON sec_filing_passages BEGIN
+    DELETE FROM sec_filing_passages_fts WHERE rowid = old.rowid;
+END;
+
+CREATE TABLE IF NOT EXISTS sec_financials (
+    url TEXT REFERENCES sec_filings (url) ON DELETE CASCADE,
+    ticker TEXT,
+    metric TEXT,
+    fiscal_year INTEGER,
+    value NUMERIC,
+    unit TEXT,
+    PRIMARY KEY (url, metric, fiscal_year)
+);
+
+CREATE INDEX IF NOT EXISTS sec_financials_url_year_idx
+    ON sec_financials (url, fiscal_year, metric, value, unit);
+
+CREATE TABLE IF NOT EXISTS zoominfo_enrichments (
+    ticker TEXT PRIMARY KEY,
+    company_domain TEXT,
+    company_enrichment_data JSONB,
+    last_update_date DATE,
+    last_verified TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS nubela_enrichments (
+    ticker TEXT PRIMARY KEY,
+    linkedin_company_profile TEXT,
+    company_domain TEXT,
+    company_name TEXT,
+    nubela_enrichment_data JSONB,
+    last_update_date DATE,
+    last_verified TIMESTAMPTZ
+);
+"""
+
+_PHRASE_OR_WORD = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+
+
+def to_fts5_query(query: str) -> str:
+    """
+    Translates a web-search style query (words, quoted phrases, "or" and "-word",
+    as accepted by Postgres websearch_to_tsquery) into an FTS5 MATCH expression.
+
+    Returns:
+        The expression, or "" if the query has no words to match.
+    """
+    terms, excluded = [], []
+    operator = "AND"
+    for negated_phrase, phrase, negated_word, word in _PHRASE_OR_WORD.findall(query or ""):
+        if not phrase and word.lower() == "or":
+            operator = "OR"
+            continue
+        words = re.findall(r"\w+", phrase or word)
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"'
+        if negated_phrase or negated_word:
+            excluded.append(term)
+            continue
+        if terms:
+            terms.append(operator)
+        terms.append(term)
+        operator = "AND"
+    if not terms:
+        return ""
+    expression = "(" + " ".join(terms) + ")"
+    return " NOT ".join([expression] + excluded)
+
+
+def _register_sqlite_types():
+    """
+    Makes sqlite3 return dates, aware datetimes and decoded JSON for the DATE,
+    TIMESTAMPTZ and JSONB columns, as pg8000 does.
+    """
+    import sqlite3
+
+    sqlite3.register_adapter(date, date.isoformat)
+    sqlite3.register_adapter(datetime, datetime.isoformat)
+    sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+    sqlite3.register_converter(
+        "TIMESTAMPTZ", lambda value: datetime.fromisoformat(value.decode())
+    )
+    sqlite3.register_converter("JSONB", lambda value: json.loads(value.decode()))
+
+
+def _sqlite_connect_args() -> Dict[str, Any]:
+    import sqlite3
+
+    _register_sqlite_types()
+    return {
+        "detect_types": sqlite3.PARSE_DECLTYPES,
+        "timeout": float(os.environ.get("SQLITE_BUSY_TIMEOUT", "30")),
+    }
+
+
+def _on_sqlite_connect(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.close()
+
+
+class SQLiteStorage(Storage):
+    """
+    An embedded SQLite database file, searched with FTS5.
+    """
+
+    passage_index_backend = "local"
+
+    def __init__(self, path: str):
+        import sqlalchemy
+
+        engine = sqlalchemy.create_engine(
+            f"sqlite:///{path}",
+            connect_args=dict(_sqlite_connect_args(), check_same_thread=False),
+        )
+        sqlalchemy.event.listen(engine, "connect", _on_sqlite_connect)
+        super().__init__(engine)
+        self.path = path
+        connection = engine.raw_connection()
+        try:
+            connection.driver_connection.executescript(_SQLITE_SCHEMA)
+        finally:
+            connection.close()
+
+    _json_object_function = "json_object"
+
+    @staticmethod
+    def _json_path_sql(column: str, path: JsonPath, param: str, params: Dict[str, Any]) -> str:
+        params[param] = "$" + "".join(
+            f"[{step}]" if isinstance(step, int) else '.' + json.dumps(step) for step in path
+        )
+        # -> returns JSON, so json_object nests objects and arrays instead of quoting them.
+        return f"{column} -> :{param}"
+
+    @staticmethod
+    def _json_key_sql(param: str) -> str:
+        return f":{param}"
+
+    def save_passages(self, db_conn, url: str, passages: Sequence[Dict[str, Any]]):
+        # The trigger on sec_filing_passages removes the old search entries.
+        db_conn.execute(
+            _text("DELETE FROM sec_filing_passages WHERE url = :url"),
+            {"url": url},
+        )
+        if passages:
+            rows = [dict(passage, url=url) for passage in passages]
+            db_conn.execute(
+                _text(
+                    "INSERT INTO sec_filing_passages (url, passage_no, item, start_offset, end_offset) VALUES (:url, :passage_no, :item, :start_offset, :end_offset)"
+                ),
+                rows,
+            )
+            db_conn.execute(
+                _text(
+                    "INSERT INTO sec_filing_passages_fts (rowid, content) SELECT rowid, :content FROM sec_filing_passages WHERE url = :url AND passage_no = :passage_no"
+                ),
+                rows,
+            )
+
+    def search_passages(self, db_conn, ticker: str, query: str, k: int) -> list:
+        match = to_fts5_query(query)
+        if not match:
+            return []
+        return db_conn.execute(
+            _text(
+                """
+                WITH latest AS (
+                    SELECT url, ticker, date_of_report
+                    FROM (
+                        SELECT url, ticker, date_of_report,
+                               ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY date_of_report DESC NULLS LAST) AS n
+                        FROM sec_filings
+                        WHERE :ticker = '' OR ticker = :ticker
+                    )
+                    WHERE n = 1
+                )
+                SELECT p.url, latest.ticker, latest.date_of_report, p.item, p.start_offset, p.end_offset,
+                       -bm25(sec_filing_passages_fts) AS rank
+                FROM sec_filing_passages_fts
+                JOIN sec_filing_passages p ON p.rowid = sec_filing_passages_fts.rowid
+                JOIN latest ON latest.url = p.url
+                WHERE sec_filing_passages_fts MATCH :query
+                ORDER BY rank DESC
+                LIMIT :k
+                """
+            ),
+            {"ticker": ticker, "query": match, "k": k},
+        ).fetchall()
+
+
+class AsyncStorage:
+    """
+    Async variants of the lookups and upserts of a Storage. The Storage's own
+    statements are run on an AsyncConnection with run_sync, so both paths issue the
+    same SQL; only the driver differs.
+    """
+
+    def __init__(self, storage: Storage, engine: "sqlalchemy.ext.asyncio.AsyncEngine"):
+        self.storage = storage
+        self.engine = engine
+
+    def connect(self) -> "sqlalchemy.ext.asyncio.AsyncConnection":
+        """
+        Opens a connection, to be used with `async with`. The caller commits.
+        """
+        return self.engine.connect()
+
+    async def latest_filing(self, db_conn, ticker: str):
+        """
+        Async variant of Storage.latest_filing.
+        """
+        return await db_conn.run_sync(self.storage.latest_filing, ticker)
+
+    async def read_filing(self, db_conn, url: str):
+        """
+        Async variant of Storage.read_filing.
+        """
+        return await db_conn.run_sync(self.storage.read_filing, url)
+
+    async def save_filing(self, db_conn, filing: Dict[str, Any]):
+        """
+        Async variant of Storage.save_filing.
+        """
+        await db_conn.run_sync(self.storage.save_filing, filing)
+
+    async def touch_filing(self, db_conn, url: str, last_verified: datetime):
+        """
+        Async variant of Storage.touch_filing.
+        """
+        await db_conn.run_sync(self.storage.touch_filing, url, last_verified)
+
+    async def get_enrichment(self, db_conn, source: str, ticker: str):
+        """
+        Async variant of Storage.get_enrichment.
+        """
+        return await db_conn.run_sync(self.storage.get_enrichment, source, ticker)
+
+    async def get_enrichment_projection(
+        self, db_conn, source: str, ticker: str, projection: Projection
+    ) -> Optional[Tuple[Dict[str, Any], date, datetime]]:
+        """
+        Async variant of Storage.get_enrichment_projection.
+        """
+        return await db_conn.run_sync(
+            self.storage.get_enrichment_projection, source, ticker, projection
+        )
+
+    async def save_enrichment(
+        self,
+        db_conn,
+        source: str,
+        ticker: str,
+        data: Any,
+        last_update_date: date,
+        last_verified: datetime,
+        **columns: Any,
+    ):
+        """
+        Async variant of Storage.save_enrichment.
+        """
+        await db_conn.run_sync(
+            lambda sync_conn: self.storage.save_enrichment(
+                sync_conn, source, ticker, data, last_update_date, last_verified, **columns
+            )
+        )
+
+    async def touch_enrichment(self, db_conn, source: str, ticker: str, last_verified: datetime):
+        """
+        Async variant of Storage.touch_enrichment.
+        """
+        await db_conn.run_sync(self.storage.touch_enrichment, source, ticker, last_verified)
+
+
+def get_storage() -> Storage:
+    """
+    Returns the process-wide storage selected by STORAGE_BACKEND, creating it on
+    first use.
+    """
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                backend = os.environ.get("STORAGE_BACKEND", "postgres").lower()
+                if backend == "sqlite":
+                    _storage = SQLiteStorage(
+                        os.environ.get("SQLITE_PATH", "corporate_analyst.db")
+                    )
+                elif backend == "postgres":
+                    from . import database
+
+                    _storage = PostgresStorage(database.get_engine())
+                else:
+                    raise ValueError(
+                        f"Unknown STORAGE_BACKEND '{backend}'; use 'postgres' or 'sqlite'."
+                    )
+    return _storage
+
+
+def get_async_storage() -> AsyncStorage:
+    """
+    Returns the async storage of the running event loop, creating it on first use.
+    Async connections belong to the loop that opened them, so each loop gets its
+    own engine.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    async_storage = _async_storages.get(loop)
+    if async_storage is None:
+        sync_storage = get_storage()  # Also creates the SQLite schema
+        if isinstance(sync_storage, SQLiteStorage):
+            import sqlalchemy
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            # aiosqlite runs each connection in a (non-daemon) thread of its own; a
+            # pooled one would outlive its event loop and keep the process from exiting.
+            # Opening a local file is cheap, so connections are not pooled.
+            engine = create_async_engine(
+                f"sqlite+aiosqlite:///{sync_storage.path}",
+                connect_args=_sqlite_connect_args(),
+                poolclass=sqlalchemy.pool.NullPool,
+            )
+            sqlalchemy.event.listen(engine.sync_engine, "connect", _on_sqlite_connect)
+        else:
+            from . import database
+
+            engine = database.get_async_engine()
+        async_storage = AsyncStorage(sync_storage, engine)
+        _async_storages[loop] = async_storage
+    return async_storage
@@ -0,0 +1,100 @@
+import asyncio
+import importlib
+import inspect
+import os
+import sys
+import types
+import unittest
+
+from google.adk.tools import FunctionTool
+
+# agent.py imports the tools relative to the package, so import it as part of the
+# package this directory is.
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_PACKAGE_DIR))
+agent = importlib.import_module(f"{os.path.basename(_PACKAGE_DIR)}.agent")
+
+
+class FakeTool:
+    instances = 0
+
+    def __init__(self):
+        FakeTool.instances += 1
+
+    def lookup(self, ticker: str, limit: int = 3) -> str:
+        """Looks a ticker up."""
+        return f"sync {ticker} {limit}"
+
+    def lookup_async_only(self, ticker: str) -> str:
+        """Looks a ticker up on the loop."""
+        return "sync"
+
+    async def lookup_async_only_async(self, ticker: str) -> str:
+        return f"async {ticker}"
+
+
+def lazy_tools():
+    """Returns (tool class, method name, wrapper) for every lazy tool of the agent."""
+    tools = []
+    for tool in agent.root_agent.tools:
+        method = getattr(tool, "__wrapped__", None)
+        if method is not None:
+            tool_class = getattr(sys.modules[method.__module__], method.__qualname__.split(".")[0])
+            tools.append((tool_class, method.__name__, tool))
+    return tools
+
+
+class TestLazyTool(unittest.TestCase):
+
+    def setUp(self):
+        agent._tools.pop(FakeTool, None)
+        FakeTool.instances = 0
+
+    def test_wrapper_calls_the_tool_built_once(self):
+        """The sync wrapper builds the tool on its first call and reuses it."""
+        lookup = agent._lazy_tool(FakeTool, "lookup")
+        self.assertFalse(inspect.iscoroutinefunction(lookup))
+        self.assertEqual(FakeTool.instances, 0)
+        self.assertEqual(lookup("GOOG"), "sync GOOG 3")
+        self.assertEqual(lookup("MSFT", limit=1), "sync MSFT 1")
+        self.assertEqual(FakeTool.instances, 1)
+
+    def test_async_variant_is_preferred(self):
+        """A method with a <name>_async coroutine is wrapped as a coroutine awaiting it."""
+        lookup = agent._lazy_tool(FakeTool, "lookup_async_only")
+        self.assertTrue(inspect.iscoroutinefunction(lookup))
+        self.assertEqual(asyncio.run(lookup("GOOG")), "async GOOG")
+        # The docstring and signature are those of the sync method the model is told about.
+        self.assertEqual(lookup.__doc__, FakeTool.lookup_async_only.__doc__)
+
+    def test_wrappers_keep_name_docstring_and_signature(self):
+        tools = lazy_tools()
+        self.assertTrue(tools)
+        for tool_class, name, wrapper in tools:
+            with self.subTest(tool=name):
+                method = getattr(tool_class, name)
+                self.assertEqual(wrapper.__name__, name)
+                self.assertEqual(wrapper.__doc__, method.__doc__)
+                self.assertEqual(
+                    list(inspect.signature(wrapper).parameters.values()),
+                    list(inspect.signature(method).parameters.values())[1:],
+                )
+                self.assertEqual(
+                    inspect.iscoroutinefunction(wrapper),
+                    inspect.iscoroutinefunction(getattr(tool_class, f"{name}_async", None)),
+                )
+
+    def test_declarations_match_the_eager_tools(self):
+        """The model sees the same function declarations as for the tools' bound methods."""
+        for tool_class, name, wrapper in lazy_tools():
+            with self.subTest(tool=name):
+                # A bound method of an instance that was never initialized, so no
+                # settings or database are needed.
+                eager = types.MethodType(getattr(tool_class, name), object.__new__(tool_class))
+                self.assertEqual(
+                    FunctionTool(wrapper)._get_declaration(), FunctionTool(eager)._get_declaration()
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import companylist
+from companyindex import CompanyIndex, edit_distances, normalize_name
+from companylist import Company
+
+COMPANIES = [
+    Company("GOOGL", "Alphabet Inc.", "1652044", "abc.xyz", ("Google",)),
+    Company("GOOG", "Alphabet Inc.", "1652044", "abc.xyz"),
+    Company("BRK-B", "BERKSHIRE HATHAWAY INC", "1067983"),
+    Company("MSFT", "MICROSOFT CORP", "789019", "microsoft.com"),
+    Company("JPM", "JPMORGAN CHASE & CO", "19617"),
+    Company("VRTX", "VERTEX PHARMACEUTICALS INC / MA", "875320"),
+    Company("ORCL", "ORACLE CORP /DE/", "1341439"),
+]
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class TestCompanyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CompanyIndex(COMPANIES)
+
+    def tickers(self, query):
+        return [match.company.ticker for match in self.index.search(query)]
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("Alphabet Inc."), "alphabet")
+        self.assertEqual(normalize_name("JPMORGAN CHASE & CO"), "jpmorgan chase")
+        self.assertEqual(normalize_name("VERTEX PHARMACEUTICALS INC / MA"), "vertex pharmaceuticals")
+        self.assertEqual(normalize_name("The Coca-Cola Company"), "coca cola")
+        self.assertEqual(normalize_name("Inc"), "inc")
+
+    def test_edit_distances_match_dynamic_programming(self):
+        rng = random.Random(7)
+        for _ in range(2000):
+            pattern = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 10)))
+            text = "".join(rng.choice("abcd ") for _ in range(rng.randint(1, 10)))
+            expected = [levenshtein(pattern, text[:j]) for j in range(1, len(text) + 1)]
+            self.assertEqual(edit_distances(pattern, text), expected, (pattern, text))
+
+    def test_exact_name_alias_ticker_and_domain(self):
+        """Every share class of an exactly matching name is returned, scored 1.0."""
+        matches = self.index.search("alphabet inc")
+        self.assertEqual([match.company.ticker for match in matches], ["GOOGL", "GOOG"])
+        self.assertEqual({match.score for match in matches}, {1.0})
+        self.assertEqual(self.tickers("Google"), ["GOOGL"])
+        self.assertEqual(self.tickers("goog"), ["GOOG"])
+        self.assertEqual(self.tickers("https://www.microsoft.com/"), ["MSFT"])
+
+    def test_misspelled_and_partial_names(self):
+        self.assertEqual(self.tickers("microsfot")[:1], ["MSFT"])
+        self.assertEqual(self.tickers("berkshire")[:1], ["BRK-B"])
+        self.assertEqual(self.tickers("jp morgan chase")[:1], ["JPM"])
+        self.assertEqual(self.tickers("vertx pharma")[:1], ["VRTX"])
+        self.assertLess(self.index.search("berkshire")[0].score, 1.0)
+        self.assertEqual(self.tickers("zzzz qqq"), [])
+
+    def test_aliases_from_csv_company_list(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "companies.csv")
+            with open(path, "w") as companies_file:
+                companies_file.write("ticker,name,cik,domain,aliases\n")
+                companies_file.write("GOOGL,Alphabet Inc.,1652044,abc.xyz,Google;Google LLC\n")
+            with mock.patch.dict(os.environ, {"COMPANY_LIST_FILE": path}):
+                self.assertEqual(companylist.get_companies()[0].aliases, ("Google", "Google LLC"))
+                index = CompanyIndex(companylist.get_companies())
+                self.assertEqual(index.search("google llc")[0].company.domain, "abc.xyz")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import companylist
+
+
+class TestCompanyList(unittest.TestCase):
+
+    def test_ticker_syntax_without_company_list(self):
+        """Without a company list only the ticker syntax is checked."""
+        with mock.patch.dict(os.environ, {"COMPANY_LIST_FILE": ""}):
+            self.assertTrue(companylist.is_known_ticker("goog"))
+            self.assertTrue(companylist.is_known_ticker("BRK.B"))
+            self.assertFalse(companylist.is_known_ticker("INVALID_TICKER"))
+            self.assertFalse(companylist.is_known_ticker("Alphabet Inc"))
+            self.assertFalse(companylist.is_known_ticker(""))
+
+    def test_ticker_must_be_in_sec_company_list(self):
+        """With SEC's company_tickers.json, tickers missing from it are rejected."""
+        entries = {
+            "0": {"cik_str": 1652044, "ticker": "GOOGL", "title": "Alphabet Inc."},
+            "1": {"cik_str": 789019, "ticker": "MSFT", "title": "MICROSOFT CORP"},
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "company_tickers.json")
+            with open(path, "w") as companies_file:
+                json.dump(entries, companies_file)
+            with mock.patch.dict(os.environ, {"COMPANY_LIST_FILE": path}):
+                self.assertTrue(companylist.is_known_ticker("msft"))
+                self.assertFalse(companylist.is_known_ticker("MSFTT"))
+                self.assertEqual(companylist.get_companies()[0].cik, "1652044")
+
+    def test_is_plausible_domain(self):
+        """Domains need a dot and a top-level domain, with or without www."""
+        self.assertTrue(companylist.is_plausible_domain("google.com"))
+        self.assertTrue(companylist.is_plausible_domain("www.microsoft.co.uk"))
+        self.assertFalse(companylist.is_plausible_domain("google"))
+        self.assertFalse(companylist.is_plausible_domain("http://google.com"))
+        self.assertFalse(companylist.is_plausible_domain(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
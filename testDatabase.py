@@ -0,0 +1,62 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+import database
+
+SETTINGS = {
+    "DB_USER": "analyst",
+    "DB_PASS": "secret",
+    "DB_NAME": "analyst",
+    "DB_CONNECTION_NAME": "project:region:instance",
+    "DB_POOL_SIZE": "7",
+    "DB_MAX_OVERFLOW": "3",
+    "DB_POOL_TIMEOUT": "12.5",
+    "DB_POOL_RECYCLE": "600",
+}
+
+
+class TestDatabase(unittest.TestCase):
+    """Engines are built without connecting, so no database is needed."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, SETTINGS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(database.close)
+
+    def assert_pool_settings(self, pool):
+        self.assertEqual(pool.size(), 7)
+        self.assertEqual(pool._max_overflow, 3)
+        self.assertEqual(pool._timeout, 12.5)
+        self.assertEqual(pool._recycle, 600)
+
+    def test_get_engine_is_a_singleton(self):
+        """Every caller gets the one engine, built with the DB_* pool settings."""
+        engine = database.get_engine()
+        self.assertIs(database.get_engine(), engine)
+        self.assert_pool_settings(engine.pool)
+        database.close()
+        self.assertIsNot(database.get_engine(), engine)
+
+    def test_pool_settings_have_defaults(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            options = database._pool_options()
+        self.assertEqual(options, {"pool_size": 5, "max_overflow": 2, "pool_timeout": 30.0, "pool_recycle": 1800})
+
+    def test_each_event_loop_gets_its_own_async_engine(self):
+        """An async engine is reused on its loop and never shared with another loop."""
+
+        async def engines():
+            return database.get_async_engine(), database.get_async_engine()
+
+        first, again = asyncio.run(engines())
+        second, _ = asyncio.run(engines())
+        self.assertIs(first, again)
+        self.assertIsNot(first, second)
+        self.assert_pool_settings(first.sync_engine.pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
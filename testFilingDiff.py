@@ -0,0 +1,29 @@
+import unittest
+
+from filingdiff import content_hash, diff_passages
+
+
+class TestFilingDiff(unittest.TestCase):
+
+    def test_content_hash_ignores_line_wrapping(self):
+        """Re-wrapped text hashes the same; changed wording does not."""
+        self.assertEqual(
+            content_hash("Competition is intense\nin all markets."),
+            content_hash("Competition is intense in all\nmarkets.  "),
+        )
+        self.assertNotEqual(
+            content_hash("Competition is intense in all markets."),
+            content_hash("Competition is fierce in all markets."),
+        )
+
+    def test_diff_passages_returns_only_changed_sentences(self):
+        """Unchanged sentences are left out of the added and removed passages."""
+        old = "We make widgets in Ohio.\nWe have 100 employees in total. Our fiscal year ends in June."
+        new = "We make widgets\nin Ohio. We have 120 employees in total. Our fiscal year ends in June."
+        added, removed = diff_passages(old, new)
+        self.assertEqual(added, ["We have 120 employees in total."])
+        self.assertEqual(removed, ["We have 100 employees in total."])
+
+
+if __name__ == "__main__":
+    unittest.main()
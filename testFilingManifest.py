@@ -0,0 +1,52 @@
+import unittest
+from datetime import date
+from unittest import mock
+
+from filingmanifest import FilingManifest, manifest_for_download
+from ttlcache import TTLCache
+
+URL = "https://www.sec.gov/Archives/edgar/data/1652044/000165204426000010/goog-20251231.htm"
+
+MANIFEST = FilingManifest(
+    url=URL, ticker="GOOGL", filed_at=date(2026, 2, 1), cik="1652044", accession_no="0001652044-26-000010"
+)
+
+
+class TestFilingManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.manifests = TTLCache(maxsize=2, ttl=300)
+        self.search = mock.Mock(return_value=None)
+
+    def test_remembered_manifest_is_reused_without_a_search(self):
+        self.manifests.set(URL, MANIFEST)
+        self.assertIs(manifest_for_download(self.manifests, URL, "GOOGL", self.search), MANIFEST)
+        self.search.assert_not_called()
+
+    def test_unknown_url_is_searched_for(self):
+        self.search.return_value = MANIFEST
+        self.assertIs(manifest_for_download(self.manifests, URL, "GOOGL", self.search), MANIFEST)
+        self.search.assert_called_once_with("GOOGL")
+
+    def test_other_filing_or_no_result_gives_a_bare_manifest(self):
+        self.search.return_value = FilingManifest(url="https://www.sec.gov/other", ticker="GOOGL")
+        self.assertEqual(
+            manifest_for_download(self.manifests, URL, "GOOGL", self.search), FilingManifest(url=URL, ticker="GOOGL")
+        )
+        self.search.return_value = None
+        self.assertEqual(
+            manifest_for_download(self.manifests, URL, "GOOGL", self.search), FilingManifest(url=URL, ticker="GOOGL")
+        )
+
+    def test_manifests_are_bounded(self):
+        self.manifests.set(URL, MANIFEST)
+        for n in range(2):
+            self.manifests.set(f"https://www.sec.gov/{n}", FilingManifest(url=f"https://www.sec.gov/{n}", ticker="X"))
+        self.assertEqual(len(self.manifests), 2)
+        self.search.return_value = MANIFEST
+        self.assertIs(manifest_for_download(self.manifests, URL, "GOOGL", self.search), MANIFEST)
+        self.search.assert_called_once_with("GOOGL")
+
+
+if __name__ == "__main__":
+    unittest.main()
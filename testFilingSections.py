@@ -0,0 +1,59 @@
+import unittest
+
+from filingsections import normalize_item, split_sections
+
+SAMPLE_10K = """Table of Contents
+Item 1. Business 3
+Item 1A. Risk Factors 10
+Item 7. Management's Discussion and Analysis 30
+Item 8. Financial Statements 50
+PART I
+ITEM 1. BUSINESS
+We design and sell widgets. As described in Item 1A, our business has risks.
+ITEM 1A. RISK FACTORS
+Competition in the widget market is intense.
+ITEM 1B. UNRESOLVED STAFF COMMENTS
+None.
+Item 7. Management's Discussion and Analysis
+Revenue increased 12% year over year.
+Item 8. Financial Statements and Supplementary Data
+Total revenues 1,234 1,100
+Item 9. Changes in and Disagreements with Accountants
+None.
+SIGNATURES
+/s/ Jane Doe, Chief Executive Officer
+"""
+
+
+class TestFilingSections(unittest.TestCase):
+
+    def test_split_sections_skips_table_of_contents(self):
+        """Each Item resolves to the body heading, not the table of contents entry."""
+        sections = split_sections(SAMPLE_10K)
+        start, end = sections["1"]
+        self.assertTrue(SAMPLE_10K[start:end].startswith("ITEM 1. BUSINESS"))
+        self.assertIn("widgets", SAMPLE_10K[start:end])
+        self.assertNotIn("RISK FACTORS", SAMPLE_10K[start:end])
+
+    def test_split_sections_ends_at_next_heading(self):
+        """Sections stop at the next Item heading, including Items that are not segmented."""
+        sections = split_sections(SAMPLE_10K)
+        start, end = sections["1A"]
+        self.assertEqual(
+            SAMPLE_10K[start:end],
+            "ITEM 1A. RISK FACTORS\nCompetition in the widget market is intense.\n",
+        )
+        start, end = sections["SIGNATURES"]
+        self.assertIn("Jane Doe", SAMPLE_10K[start:end])
+        self.assertNotIn("7A", sections)
+
+    def test_normalize_item(self):
+        """Item names from the model are mapped to section keys."""
+        self.assertEqual(normalize_item("Item 1A."), "1A")
+        self.assertEqual(normalize_item("risk factors"), "1A")
+        self.assertEqual(normalize_item("Signatures"), "SIGNATURES")
+        self.assertIsNone(normalize_item("Item 9"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+import filingtext
+from filingsections import split_sections
+from ttlcache import TTLCache
+
+FILING = (
+    "Cover page\n"
+    "Item 1. Business\nWe make widgets – and gadgets.\n"
+    "Item 1A. Risk Factors\nCompetition is intense.\n"
+    "Item 7. Management's Discussion and Analysis\nRevenue grew 10%.\n"
+)
+
+
+class TestFilingText(unittest.TestCase):
+
+    def test_compressed_round_trip(self):
+        data = filingtext.compress_text(FILING)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(filingtext.decompress_text(memoryview(data)), FILING)
+
+    def test_sections_are_sliced_from_the_decompressed_text(self):
+        sections = split_sections(FILING)
+        text = filingtext.decompress_text(filingtext.compress_text(FILING))
+        start, end = sections["1A"]
+        self.assertEqual(text[start:end].strip(), "Item 1A. Risk Factors\nCompetition is intense.")
+        start, end = sections["7"]
+        self.assertTrue(text[start:end].startswith("Item 7."))
+
+    def test_read_text_decompresses_a_filing_once(self):
+        texts = TTLCache(maxsize=2, ttl=60)
+        reads = []
+
+        def read_row():
+            reads.append(1)
+            return (None, filingtext.compress_text(FILING))
+
+        self.assertEqual(filingtext.read_text(texts, "https://sec/a", read_row), FILING)
+        self.assertEqual(filingtext.read_text(texts, "https://sec/a", read_row), FILING)
+        self.assertEqual(len(reads), 1)
+
+    def test_read_text_of_uncompressed_and_missing_filings(self):
+        texts = TTLCache(maxsize=2, ttl=60)
+        self.assertEqual(filingtext.read_text(texts, "https://sec/old", lambda: ("plain text", None)), "plain text")
+        self.assertIsNone(filingtext.read_text(texts, "https://sec/none", lambda: None))
+        self.assertNotIn("https://sec/none", texts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from financials import extract_financials
+
+ITEM_8 = """
+ITEM 8. FINANCIAL STATEMENTS AND SUPPLEMENTARY DATA
+INDEX TO CONSOLIDATED FINANCIAL STATEMENTS
+Consolidated Balance Sheets 52
+Consolidated Statements of Income 53
+Consolidated Statements of Comprehensive Income 54
+CONSOLIDATED BALANCE SHEETS
+(in millions, except par value per share amounts)
+As of December 31,
+2023 2024
+Total current assets 171,530 163,711
+Total assets $ 402,392 $ 450,256
+Total liabilities 119,013 125,172
+Total liabilities and stockholders' equity $ 402,392 $ 450,256
+CONSOLIDATED STATEMENTS OF INCOME
+(in millions, except per share amounts)
+Year Ended December 31,
+2022 2023 2024
+Revenues $ 282,836 $ 307,394 $ 350,018
+Costs and expenses:
+Cost of revenues 126,203 133,332 146,306
+Other income (expense), net (3,514) 1,424 7,425
+Net income
+$ 59,972 $ 73,795 $ 100,118
+Net income per share:
+Basic $ 4.59 $ 5.84 $ 8.13
+"""
+
+
+class TestFinancials(unittest.TestCase):
+
+    def test_extract_financials_reads_statement_rows(self):
+        """Each metric is read from the statement itself, not from the index."""
+        rows = {(r["metric"], r["fiscal_year"]): (r["value"], r["unit"]) for r in extract_financials(ITEM_8)}
+        self.assertEqual(rows[("revenue", 2024)], (350018.0, "USD millions"))
+        self.assertEqual(rows[("revenue", 2022)], (282836.0, "USD millions"))
+        self.assertEqual(rows[("net_income", 2023)], (73795.0, "USD millions"))
+        self.assertEqual(rows[("total_assets", 2024)], (450256.0, "USD millions"))
+        self.assertEqual(rows[("total_liabilities", 2023)], (119013.0, "USD millions"))
+        self.assertEqual(len(rows), 3 + 3 + 2 + 2)
+
+    def test_extract_financials_prefers_totals_and_reads_losses(self):
+        """A total line wins over a segment line, and parenthesized values are negative."""
+        text = """Consolidated Statements of Operations
+(In thousands)
+Fiscal Year 2024 2023
+Net sales:
+Products $ 900 $ 800
+Total net sales 1,250 1,100
+Net loss $ (45) $ (60)
+"""
+        rows = {(r["metric"], r["fiscal_year"]): r["value"] for r in extract_financials(text)}
+        self.assertEqual(rows[("revenue", 2024)], 1250.0)
+        self.assertEqual(rows[("net_income", 2023)], -60.0)
+
+    def test_repeated_header_year_gives_one_row_per_year(self):
+        """A year that appears twice in the column header keeps its first column."""
+        text = """Consolidated Statements of Operations
+(In thousands)
+Quarter 2023 2022 Year 2023 2022
+Total revenues 300 250 1,200 1,000
+Net income 30 20 120 100
+"""
+        rows = extract_financials(text)
+        keys = [(r["metric"], r["fiscal_year"]) for r in rows]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual({key: r["value"] for key, r in zip(keys, rows)}[("revenue", 2023)], 300.0)
+
+    def test_extract_financials_without_statements(self):
+        """Text without consolidated statements yields no rows."""
+        self.assertEqual(extract_financials("Item 8. See the financial statements."), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
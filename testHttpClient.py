@@ -0,0 +1,38 @@
+import os
+import unittest
+from unittest import mock
+
+import httpclient
+
+
+class TestHttpClient(unittest.TestCase):
+
+    def setUp(self):
+        httpclient._session = None
+        self.addCleanup(setattr, httpclient, "_session", None)
+
+    def test_session_is_a_singleton_with_pooled_adapters(self):
+        """Every caller shares one session whose adapters keep HTTP_POOL_* connections."""
+        with mock.patch.dict(os.environ, {"HTTP_POOL_HOSTS": "4", "HTTP_POOL_MAXSIZE": "16"}):
+            session = httpclient.get_session()
+        self.assertIs(httpclient.get_session(), session)
+        for prefix in ("https://", "http://"):
+            adapter = session.get_adapter(f"{prefix}api.zoominfo.com")
+            self.assertEqual(adapter._pool_connections, 4)
+            self.assertEqual(adapter._pool_maxsize, 16)
+            # Failed requests are not retried by the adapter; the tools handle errors.
+            self.assertEqual(adapter.max_retries.total, 0)
+        self.assertIn("gzip", session.headers["Accept-Encoding"])
+
+    def test_requests_get_the_default_timeout_unless_given_one(self):
+        session = httpclient.get_session()
+        with mock.patch.dict(os.environ, {"HTTP_CONNECT_TIMEOUT": "2", "HTTP_READ_TIMEOUT": "9"}), \
+                mock.patch.object(session, "request") as request:
+            httpclient.get("https://api.sec-api.io/")
+            httpclient.post("https://api.sec-api.io/", timeout=30, json={})
+        self.assertEqual(request.call_args_list[0], mock.call("GET", "https://api.sec-api.io/", timeout=(2.0, 9.0)))
+        self.assertEqual(request.call_args_list[1], mock.call("POST", "https://api.sec-api.io/", timeout=30, json={}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from migrate import MIGRATIONS_DIR, database_url, list_migrations, pending_migrations
+
+
+class TestMigrations(unittest.TestCase):
+
+    def write(self, directory, name, sql="SELECT 1;"):
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(sql)
+
+    def test_shipped_migrations_are_numbered_in_sequence(self):
+        versions = [migration.version for migration in list_migrations(MIGRATIONS_DIR)]
+        self.assertEqual(versions, [f"{n:04d}" for n in range(1, len(versions) + 1)])
+
+    def test_files_are_ordered_by_version_and_validated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.write(directory, "0010_later.sql")
+            self.write(directory, "0002_first.sql")
+            self.write(directory, "README.md")
+            self.assertEqual([m.name for m in list_migrations(directory)], ["0002_first.sql", "0010_later.sql"])
+            self.write(directory, "0002_duplicate.sql")
+            with self.assertRaises(ValueError):
+                list_migrations(directory)
+        with tempfile.TemporaryDirectory() as directory:
+            self.write(directory, "add_index.sql")
+            with self.assertRaises(ValueError):
+                list_migrations(directory)
+
+    def test_applied_migrations_are_not_pending(self):
+        """A migration edited after it was applied is not applied again."""
+        with tempfile.TemporaryDirectory() as directory:
+            self.write(directory, "0001_baseline.sql")
+            self.write(directory, "0002_indexes.sql")
+            self.write(directory, "0003_more.sql")
+            first, second, third = list_migrations(directory)
+            applied = {first.version: first.checksum, second.version: "edited"}
+            with self.assertLogs("migrate", level="WARNING"):
+                self.assertEqual(pending_migrations([first, second, third], applied), [third])
+
+    def test_url_password_comes_from_pgpassword(self):
+        """A --url without a password takes PGPASSWORD; an explicit one is kept."""
+        with mock.patch.dict(os.environ, {"PGPASSWORD": "s3cret/:@"}):
+            self.assertEqual(database_url("postgresql+pg8000://analyst@db:5432/analyst").password, "s3cret/:@")
+            self.assertEqual(database_url("postgresql+pg8000://analyst:given@db/analyst").password, "given")
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertIsNone(database_url("postgresql+pg8000://analyst@db/analyst").password)
+
+
+if __name__ == "__main__":
+    unittest.main()
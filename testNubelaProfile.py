@@ -0,0 +1,63 @@
+import json
+import unittest
+
+from nubelaprofile import PROFILE_FIELDS, project_profile
+
+URL = "https://www.linkedin.com/company/acme"
+
+PROFILE = {
+    "linkedin_internal_id": "1441",
+    "description": "Acme makes everything.",
+    "website": "https://acme.com",
+    "industry": "Manufacturing",
+    "company_size": [10001, None],
+    "company_size_on_linkedin": 12345,
+    "hq": {"country": "US", "city": "Springfield", "postal_code": "62701", "line_1": "1 Main St", "is_hq": True},
+    "specialities": ["anvils", "rockets", "tunnels"],
+    "locations": [{"city": "Springfield"}, {"city": "Shelbyville"}],
+    "similar_companies": [{"name": "Ajax", "link": "https://www.linkedin.com/company/ajax"}],
+    "updates": [{"text": "We are hiring."}],
+    "tagline": None,
+}
+
+
+class TestNubelaProfile(unittest.TestCase):
+
+    def test_keeps_only_profile_fields_and_the_requested_url(self):
+        projected = project_profile(PROFILE, URL)
+        self.assertEqual(set(projected), set(PROFILE_FIELDS) | {"linkedin_url"})
+        self.assertEqual(projected["linkedin_url"], URL)
+        self.assertEqual(projected["description"], "Acme makes everything.")
+        self.assertLess(len(json.dumps(projected)), len(json.dumps(PROFILE)))
+
+    def test_nested_values_are_kept_whole(self):
+        projected = project_profile(PROFILE, URL)
+        self.assertEqual(projected["specialities"], ["anvils", "rockets", "tunnels"])
+        self.assertEqual(projected["company_size"], [10001, None])
+        self.assertEqual(projected["hq"], PROFILE["hq"])
+
+    def test_missing_and_null_fields_are_left_out(self):
+        projected = project_profile({"industry": "Retail", "website": None, "tagline": "Buy"})
+        self.assertEqual(projected, {"industry": "Retail"})
+
+    def test_stored_linkedin_url_is_passed_through(self):
+        stored = {"industry": "Retail", "linkedin_url": URL}
+        self.assertEqual(project_profile(stored), stored)
+        self.assertEqual(project_profile(stored, "https://www.linkedin.com/company/other"), stored)
+
+    def test_resolve_response_is_unwrapped(self):
+        resolved = {"url": URL, "last_updated": "2025-01-01T00:00:00Z", "profile": PROFILE}
+        projected = project_profile(resolved)
+        self.assertEqual(projected, project_profile(PROFILE, URL))
+        self.assertNotIn("profile", projected)
+        self.assertEqual(project_profile({"url": URL, "profile": None}), {"linkedin_url": URL})
+        self.assertEqual(project_profile({"url": None, "profile": {"industry": "Retail"}}, URL)["linkedin_url"], URL)
+
+    def test_projection_is_idempotent(self):
+        projected = project_profile(PROFILE, URL)
+        self.assertEqual(project_profile(projected), projected)
+        self.assertEqual(project_profile(json.loads(json.dumps(projected))), projected)
+
+
+if __name__ == "__main__":
+    unittest.main()
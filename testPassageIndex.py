@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from passageindex import HashingEmbedder, NumpyPassageIndex
+from ttlcache import TTLCache
+
+PASSAGES = [
+    (0, 0, 60, "1", "We were incorporated in Delaware in 1998 and moved headquarters."),
+    (1, 60, 120, "1", "Our mission is to organize the world's information."),
+    (2, 120, 180, "1A", "We face intense competition in search and cloud computing."),
+]
+
+
+class TestPassageIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.embedder = HashingEmbedder(dim=256)
+        self.index = NumpyPassageIndex(TTLCache(maxsize=2, ttl=300))
+        vectors = self.embedder.embed_documents([text for *_, text in PASSAGES])
+        self.index.add("url", [passage[:4] for passage in PASSAGES], vectors)
+
+    def test_hashing_embedder_is_deterministic(self):
+        """The stub embedder returns identical unit vectors across instances."""
+        first = HashingEmbedder(dim=256).embed_query("our mission statement")
+        second = HashingEmbedder(dim=256).embed_query("our mission statement")
+        np.testing.assert_array_equal(first, second)
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=5)
+
+    def test_search_ranks_best_match_first(self):
+        """The passage sharing the most terms with the question ranks first."""
+        results = self.index.search("url", self.embedder.embed_query("when were we incorporated"), k=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][1], PASSAGES[0][:4])
+        self.assertGreaterEqual(results[0][0], results[1][0])
+
+    def test_add_replaces_previous_vectors(self):
+        """Adding a filing again replaces its passages; unknown filings return nothing."""
+        self.index.add("url", [PASSAGES[2][:4]], self.embedder.embed_documents([PASSAGES[2][4]]))
+        results = self.index.search("url", self.embedder.embed_query("mission"), k=5)
+        self.assertEqual([passage for _, passage in results], [PASSAGES[2][:4]])
+        self.assertEqual(self.index.search("other", self.embedder.embed_query("mission"), k=5), [])
+
+    def test_least_recently_used_filings_are_evicted(self):
+        """Only maxsize filings are kept; the least recently searched one is dropped."""
+        vectors = self.embedder.embed_documents([PASSAGES[0][4]])
+        self.index.add("other", [PASSAGES[0][:4]], vectors)
+        self.index.search("url", self.embedder.embed_query("mission"), k=1)
+        self.index.add("third", [PASSAGES[0][:4]], vectors)
+        self.assertTrue(self.index.has("url"))
+        self.assertFalse(self.index.has("other"))
+        self.assertTrue(self.index.has("third"))
+
+
+if __name__ == "__main__":
+    unittest.main()
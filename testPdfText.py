@@ -0,0 +1,95 @@
+import contextlib
+import io
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+import pdftext
+
+
+def make_pdf(pages):
+    """
+    Builds a PDF with one page per list of text lines.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, lines in enumerate(pages):
+        content = ("BT /F1 10 Tf 50 750 Td 12 TL " + " ".join(f"({line}) Tj T*" for line in lines) + " ET").encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream")
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(pdf)
+
+
+PDF = make_pdf([[f"Page {page} line {line} of the annual report" for line in range(20)] for page in range(9)])
+
+
+def serial_text(pdf_file):
+    pdf_file.seek(0)
+    return "".join(page.extract_text() or "" for page in PyPDF2.PdfReader(pdf_file).pages)
+
+
+class TestPdfText(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_page_ranges_cover_every_page_once(self):
+        """Pages are cut into contiguous ranges, never more ranges than pages."""
+        self.assertEqual(pdftext.page_ranges(9, 4), [(0, 3), (3, 6), (6, 9)])
+        self.assertEqual(pdftext.page_ranges(2, 8), [(0, 1), (1, 2)])
+        self.assertEqual(pdftext.page_ranges(5, 1), [(0, 5)])
+
+    def test_parallel_matches_serial(self):
+        """Page-parallel extraction returns the serial text, pages in order."""
+        expected = serial_text(io.BytesIO(PDF))
+        self.assertIn("Page 8 line 19", expected)
+        for workers in (2, 4, 9):
+            with self.subTest(workers=workers):
+                self.assertEqual(pdftext.extract_parallel(self.executor, io.BytesIO(PDF), 9, workers), expected)
+
+    def test_failed_pool_returns_none(self):
+        """Any failure of the pool returns None so the caller extracts serially."""
+        executor = ProcessPoolExecutor(max_workers=2)
+        executor.shutdown()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(pdftext.extract_parallel(executor, io.BytesIO(PDF), 9, 2))
+
+    def test_download_larger_than_spool_limit_rolls_over_to_disk(self):
+        """A download beyond max_bytes is spooled to a file and extracts unchanged."""
+        chunks = [PDF[start:start + 1024] for start in range(0, len(PDF), 1024)]
+        buffer, size = pdftext.spool_download(iter(chunks), max_bytes=4096)
+        with buffer:
+            self.assertGreater(size, 4096)
+            self.assertEqual(size, len(PDF))
+            self.assertTrue(buffer._rolled)
+            self.assertEqual(pdftext.extract_parallel(self.executor, buffer, 9, 3), serial_text(io.BytesIO(PDF)))
+
+    def test_small_download_stays_in_memory(self):
+        """A download within max_bytes is kept in memory."""
+        buffer, size = pdftext.spool_download([PDF], max_bytes=len(PDF) + 1)
+        with buffer:
+            self.assertFalse(buffer._rolled)
+            self.assertEqual(buffer.read(), PDF)
+
+
+if __name__ == "__main__":
+    unittest.main()
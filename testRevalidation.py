@@ -0,0 +1,41 @@
+import threading
+import unittest
+
+from revalidation import Revalidator
+
+
+class TestRevalidator(unittest.TestCase):
+
+    def test_one_refresh_per_key_at_a_time(self):
+        """A refresh requested while one for the same key runs is dropped."""
+        revalidator = Revalidator("test", max_workers=2)
+        release = threading.Event()
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            release.wait(5)
+
+        first = revalidator.submit("GOOG", refresh)
+        self.assertIsNone(revalidator.submit("GOOG", refresh))
+        self.assertIs(revalidator.pending("GOOG"), first)
+        release.set()
+        first.result(5)
+        self.assertIsNone(revalidator.pending("GOOG"))
+        revalidator.submit("GOOG", refresh).result(5)
+        self.assertEqual(len(calls), 2)
+
+    def test_failed_refresh_releases_key(self):
+        """An exception in a refresh is logged and does not block later refreshes."""
+        revalidator = Revalidator("test", max_workers=1)
+
+        def refresh():
+            raise RuntimeError("upstream down")
+
+        with self.assertLogs("revalidation", level="ERROR"):
+            revalidator.submit("MSFT", refresh).result(5)
+        self.assertIsNotNone(revalidator.submit("MSFT", lambda: None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+from datetime import date, datetime, timezone
+
+import storage
+from storage import PostgresStorage, SQLiteStorage, project_json, to_fts5_query
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = SQLiteStorage(os.path.join(self.directory.name, "cache.db"))
+
+    def tearDown(self):
+        self.storage.engine.dispose()
+        self.directory.cleanup()
+
+    def save_filing(self, db_conn, url, date_of_report):
+        self.storage.save_filing(db_conn, {
+            "url": url,
+            "text_report_zstd": b"compressed",
+            "content_sha256": "hash",
+            "ticker": "GOOG",
+            "date_of_report": date_of_report,
+            "date_of_download": date(2024, 2, 2),
+            "form_type": "10-K",
+            "cik": "1652044",
+            "accession_no": None,
+            "last_verified": datetime(2024, 2, 2, 12, tzinfo=timezone.utc),
+        })
+
+    def test_filings_round_trip_with_postgres_types(self):
+        """Dates and timestamps come back as date and aware datetime objects."""
+        with self.storage.connect() as db_conn:
+            self.save_filing(db_conn, "https://sec.gov/old", date(2023, 2, 2))
+            self.save_filing(db_conn, "https://sec.gov/new", date(2024, 2, 1))
+            db_conn.commit()
+            url, date_of_report, form_type, _, _, last_verified = self.storage.latest_filing(db_conn, "GOOG")
+            self.assertEqual((url, date_of_report, form_type), ("https://sec.gov/new", date(2024, 2, 1), "10-K"))
+            self.assertEqual(last_verified, datetime(2024, 2, 2, 12, tzinfo=timezone.utc))
+            self.assertEqual(self.storage.read_filing(db_conn, url), (None, b"compressed"))
+            self.assertEqual(len(self.storage.recent_filings(db_conn, "GOOG", 2)), 2)
+
+    def test_enrichment_upsert_and_touch(self):
+        """Enrichments are stored as JSON and replaced per ticker."""
+        verified = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        with self.storage.connect() as db_conn:
+            self.storage.save_enrichment(db_conn, "zoominfo", "GOOG", {"data": [1]}, date(2024, 1, 1), verified, company_domain="google.com")
+            self.storage.save_enrichment(db_conn, "zoominfo", "GOOG", {"data": [2]}, date(2024, 2, 1), verified, company_domain="google.com")
+            self.storage.touch_enrichment(db_conn, "zoominfo", "GOOG", datetime(2024, 4, 1, tzinfo=timezone.utc))
+            db_conn.commit()
+            data, last_update_date, last_verified = self.storage.get_enrichment(db_conn, "zoominfo", "GOOG")
+        self.assertEqual(data, {"data": [2]})
+        self.assertEqual(last_update_date, date(2024, 2, 1))
+        self.assertEqual(last_verified, datetime(2024, 4, 1, tzinfo=timezone.utc))
+        with self.storage.connect() as db_conn:
+            rows = self.storage.get_enrichments(db_conn, "zoominfo", ["GOOG", "MSFT"])
+        self.assertEqual(rows, {"GOOG": (data, last_update_date, last_verified)})
+
+    def test_enrichment_projection_reads_selected_paths(self):
+        """The database picks the same fields as project_json, for either response shape."""
+        projection = {
+            "name": [("data", 0, "name"), ("data", "result", 0, "data", 0, "name")],
+            "departments": [("data", 0, "departments"), ("data", "result", 0, "data", 0, "departments")],
+            "matchStatus": [("data", "result", 0, "matchStatus")],
+        }
+        legacy = {"data": [{"name": "Alphabet", "departments": [{"name": "Engineering"}], "description": "..."}]}
+        current = {"data": {"result": [{"data": [{"name": "Alphabet", "departments": None}], "matchStatus": "FULL_MATCH"}]}}
+        verified = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        with self.storage.connect() as db_conn:
+            for ticker, document in (("GOOG", legacy), ("GOOGL", current)):
+                self.storage.save_enrichment(db_conn, "zoominfo", ticker, document, date(2024, 1, 1), verified, company_domain="abc.xyz")
+                fields, last_update_date, _ = self.storage.get_enrichment_projection(db_conn, "zoominfo", ticker, projection)
+                self.assertEqual(fields, project_json(document, projection))
+                self.assertEqual(last_update_date, date(2024, 1, 1))
+            self.assertIsNone(self.storage.get_enrichment_projection(db_conn, "zoominfo", "MSFT", projection))
+        self.assertEqual(project_json(legacy, projection), {"name": "Alphabet", "departments": [{"name": "Engineering"}]})
+        self.assertEqual(project_json(current, projection), {"name": "Alphabet", "matchStatus": "FULL_MATCH"})
+
+    def test_passage_search_uses_latest_filing(self):
+        """Only passages of each ticker's latest filing match, and replacing them drops the old ones."""
+        with self.storage.connect() as db_conn:
+            self.save_filing(db_conn, "https://sec.gov/old", date(2023, 2, 2))
+            self.save_filing(db_conn, "https://sec.gov/new", date(2024, 2, 1))
+            for url in ("https://sec.gov/old", "https://sec.gov/new"):
+                self.storage.save_passages(db_conn, url, [
+                    {"passage_no": 0, "item": "1", "start_offset": 0, "end_offset": 40, "content": "We had 182,502 full-time employees."},
+                    {"passage_no": 1, "item": "1A", "start_offset": 40, "end_offset": 80, "content": "Competitors include Microsoft and Amazon."},
+                ])
+            self.storage.save_passages(db_conn, "https://sec.gov/new", [
+                {"passage_no": 0, "item": "1", "start_offset": 0, "end_offset": 40, "content": "We had 181,269 employees."},
+            ])
+            db_conn.commit()
+            rows = self.storage.search_passages(db_conn, "GOOG", "employees", 5)
+            self.assertEqual([(row[0], row[3]) for row in rows], [("https://sec.gov/new", "1")])
+            self.assertEqual(self.storage.search_passages(db_conn, "", "Microsoft", 5), [])
+            self.assertEqual(self.storage.search_passages(db_conn, "MSFT", "employees", 5), [])
+
+    def test_async_storage_reads_and_writes(self):
+        """The async storage commits through run_sync and sees rows written by the sync engine."""
+        verified = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        with self.storage.connect() as db_conn:
+            self.save_filing(db_conn, "https://sec.gov/new", date(2024, 2, 1))
+            db_conn.commit()
+
+        async def run():
+            cache = storage.get_async_storage()
+            try:
+                async with cache.connect() as db_conn:
+                    filing = await cache.latest_filing(db_conn, "GOOG")
+                    await cache.save_enrichment(db_conn, "zoominfo", "GOOG", {"data": [1]}, date(2024, 1, 1), verified, company_domain="google.com")
+                    await db_conn.commit()
+            finally:
+                await cache.engine.dispose()
+            return filing
+
+        with mock.patch.object(storage, "_storage", self.storage):
+            filing = asyncio.run(run())
+        self.assertEqual(filing[:2], ("https://sec.gov/new", date(2024, 2, 1)))
+        self.assertEqual(filing[5], datetime(2024, 2, 2, 12, tzinfo=timezone.utc))
+        with self.storage.connect() as db_conn:
+            self.assertEqual(self.storage.get_enrichment(db_conn, "zoominfo", "GOOG")[0], {"data": [1]})
+
+    def test_websearch_query_translation(self):
+        self.assertEqual(to_fts5_query("employees"), '("employees")')
+        self.assertEqual(to_fts5_query('"cloud revenue" or ads -youtube'), '("cloud revenue" OR "ads") NOT "youtube"')
+        self.assertEqual(to_fts5_query("AND (*"), '("AND")')
+        self.assertEqual(to_fts5_query("-only"), "")
+
+
+class TestStorage(unittest.TestCase):
+
+    def test_backend_without_passage_search_cannot_be_created(self):
+        class IncompleteStorage(storage.Storage):
+            def save_passages(self, db_conn, url, passages):
+                pass
+
+        with self.assertRaises(TypeError):
+            IncompleteStorage(engine=None)
+
+
+class TestPostgresStorage(unittest.TestCase):
+
+    def test_postgres_projection_binds_scalar_path_steps(self):
+        """Every path step is its own text parameter, which asyncpg and pg8000 both accept."""
+        db_conn = mock.Mock()
+        db_conn.execute.return_value.fetchone.return_value = None
+        projection = {"name": [("data", 0, "name"), ("data", "result", 0, "data", 0, "name")]}
+        self.assertIsNone(PostgresStorage(engine=None).get_enrichment_projection(db_conn, "zoominfo", "GOOG", projection))
+        statement, params = db_conn.execute.call_args[0]
+        sql = str(statement)
+        self.assertIn("jsonb_extract_path(company_enrichment_data, CAST(:path_0_0_0 AS TEXT), CAST(:path_0_0_1 AS TEXT), CAST(:path_0_0_2 AS TEXT))", sql)
+        self.assertNotIn("TEXT[]", sql)
+        self.assertEqual(
+            [params[f"path_0_1_{k}"] for k in range(6)], ["data", "result", "0", "data", "0", "name"]
+        )
+        self.assertTrue(all(isinstance(value, str) for value in params.values()))
+        self.assertEqual((params["key_0"], params["ticker"]), ("name", "GOOG"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+import ttlcache
+from ttlcache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_entries_expire_after_ttl(self):
+        """An entry is returned until its time to live has passed."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        with mock.patch.object(ttlcache.time, "monotonic", return_value=1000.0):
+            cache.set("INVALID_TICKER")
+        with mock.patch.object(ttlcache.time, "monotonic", return_value=1059.0):
+            self.assertIn("INVALID_TICKER", cache)
+        with mock.patch.object(ttlcache.time, "monotonic", return_value=1060.0):
+            self.assertNotIn("INVALID_TICKER", cache)
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """When full, the entry that was read or written longest ago goes first."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+
+    def test_hits_and_misses_are_counted(self):
+        """Expired entries count as misses."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        with mock.patch.object(ttlcache.time, "monotonic", return_value=1000.0):
+            self.assertIsNone(cache.get("GOOG"))
+            cache.set("GOOG", ("row",))
+            self.assertEqual(cache.get("GOOG"), ("row",))
+        with mock.patch.object(ttlcache.time, "monotonic", return_value=1060.0):
+            self.assertIsNone(cache.get("GOOG"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "size": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+import tokenmanager
+from tokenmanager import TokenManager
+
+
+def join_refreshes():
+    for thread in threading.enumerate():
+        if thread.name.startswith("token-"):
+            thread.join(5)
+
+
+class TestTokenManager(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_refresh(self):
+        """Callers that find no token wait for the same single fetch."""
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return "jwt-1"
+
+        manager = TokenManager("test", fetch, lifetime=3300, refresh_ahead=300)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(manager.get(timeout=5))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, ["jwt-1"] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(manager.get(), "jwt-1")
+        stats = manager.stats()
+        self.assertEqual((stats["refreshes"], stats["failures"], stats["waits"]), (1, 0, 8))
+
+    def test_token_is_refreshed_ahead_of_expiry_without_waiting(self):
+        """Inside the refresh window the current token is returned while a new one is fetched."""
+        tokens = iter(["jwt-1", "jwt-2"])
+        manager = TokenManager("test", lambda: next(tokens), lifetime=3300, refresh_ahead=300)
+        with mock.patch.object(tokenmanager.threading, "Timer"):
+            with mock.patch.object(tokenmanager.time, "monotonic", return_value=1000.0):
+                self.assertEqual(manager.get(timeout=5), "jwt-1")
+            with mock.patch.object(tokenmanager.time, "monotonic", return_value=4100.0):
+                self.assertEqual(manager.get(), "jwt-1")
+                in_flight = manager._refresh
+                if in_flight is not None:
+                    in_flight.result(5)
+                self.assertEqual(manager.get(), "jwt-2")
+        self.assertEqual(manager.stats()["waits"], 1)
+
+    def test_failed_refresh_is_counted_and_retried_on_demand(self):
+        responses = iter([None, "jwt-1"])
+        manager = TokenManager("test", lambda: next(responses), lifetime=3300, refresh_ahead=300)
+        self.assertIsNone(manager.get(timeout=5))
+        self.assertEqual(asyncio.run(manager.get_async()), "jwt-1")
+        stats = manager.stats()
+        self.assertEqual((stats["refreshes"], stats["failures"]), (1, 1))
+
+    def test_refresh_is_in_flight_until_its_future_resolves(self):
+        """Waiters are woken before the refresh is cleared, and no second fetch starts meanwhile."""
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return "jwt-1"
+
+        manager = TokenManager("test", fetch, lifetime=3300, refresh_ahead=300)
+        seen = []
+        future = manager.refresh()
+        future.add_done_callback(lambda done: seen.append((manager._refresh is done, manager.get())))
+        self.assertIs(manager.refresh(), future)
+        release.set()
+        join_refreshes()
+        self.assertEqual(seen, [(True, "jwt-1")])
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(manager._refresh)
+
+    def test_refresh_after_a_failure_starts_a_new_fetch(self):
+        """A caller woken by a failed refresh that asks again is not handed the failed result."""
+        responses = iter([None, "jwt-1"])
+        manager = TokenManager("test", lambda: next(responses), lifetime=3300, refresh_ahead=300)
+        retried = []
+        release = threading.Event()
+
+        def fetch():
+            release.wait(5)
+            return next(responses)
+
+        manager._fetch = fetch
+        failed = manager.refresh()
+        failed.add_done_callback(lambda done: retried.append(manager.refresh()))
+        release.set()
+        join_refreshes()
+        self.assertIsNone(failed.result())
+        self.assertIsNot(retried[0], failed)
+        self.assertEqual(retried[0].result(5), "jwt-1")
+        self.assertEqual(manager.stats()["failures"], 1)
+
+    def test_async_timeout_leaves_the_refresh_running(self):
+        """get_async gives up after its timeout without cancelling the shared refresh."""
+        release = threading.Event()
+
+        def fetch():
+            release.wait(5)
+            return "jwt-1"
+
+        manager = TokenManager("test", fetch, lifetime=3300, refresh_ahead=300)
+        self.assertIsNone(asyncio.run(manager.get_async(timeout=0.05)))
+        in_flight = manager._refresh
+        self.assertFalse(in_flight.cancelled())
+        release.set()
+        self.assertEqual(in_flight.result(5), "jwt-1")
+        self.assertEqual(asyncio.run(manager.get_async(timeout=5)), "jwt-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from warm_cache import WarmState, _warm_zoominfo, read_companies
+
+
+class TestWarmCache(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as output:
+            output.write(text)
+        return path
+
+    def test_read_tickers_one_per_line(self):
+        path = self.write("tickers.txt", "# watchlist\nmsft\n\nGOOGL\n  \nMSFT\n")
+        self.assertEqual(
+            read_companies(path),
+            [
+                {"ticker": "MSFT", "domain": "", "company_name": "", "linkedin_url": ""},
+                {"ticker": "GOOGL", "domain": "", "company_name": "", "linkedin_url": ""},
+            ],
+        )
+
+    def test_read_csv_with_header(self):
+        path = self.write(
+            "companies.csv",
+            "Ticker, Domain ,company_name,linkedin_url\n"
+            "msft,microsoft.com,\"Microsoft, Corp.\",https://www.linkedin.com/company/microsoft\n"
+            "# skipped\n"
+            "GOOGL,abc.xyz\n"
+            ",nodomain.com,No Ticker,\n",
+        )
+        self.assertEqual(
+            read_companies(path),
+            [
+                {
+                    "ticker": "MSFT",
+                    "domain": "microsoft.com",
+                    "company_name": "Microsoft, Corp.",
+                    "linkedin_url": "https://www.linkedin.com/company/microsoft",
+                },
+                {"ticker": "GOOGL", "domain": "abc.xyz", "company_name": "", "linkedin_url": ""},
+            ],
+        )
+
+    def test_state_resumes_completed_pairs_only(self):
+        path = os.path.join(self.directory, "state.jsonl")
+        state = WarmState(path)
+        state.record("sec", "MSFT", True, 1.25)
+        state.record("zoominfo", "MSFT", False, 0.5)
+        state.record("zoominfo", "GOOGL", True, 0.5)
+        with open(path, "a") as state_file:
+            state_file.write('{"upstream": "nubela", "ticker": "MS')  # interrupted mid-write
+
+        resumed = WarmState(path)
+        self.assertEqual(resumed.completed, {("sec", "MSFT"), ("zoominfo", "GOOGL")})
+        self.assertTrue(resumed.is_done("sec", "MSFT"))
+        self.assertFalse(resumed.is_done("zoominfo", "MSFT"))
+
+    def test_state_without_path_records_nothing(self):
+        state = WarmState(None)
+        state.record("sec", "MSFT", True, 1.0)
+        self.assertFalse(state.is_done("sec", "MSFT"))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_zoominfo_status_comes_from_the_tool(self):
+        tool = mock.Mock()
+        tool.enrich_companies.return_value = {
+            "MSFT": (True, '{"name": "Microsoft"}'),
+            "ACME": (False, "ZoomInfo has no company matching the domain acme.com."),
+            "XYZ": (False, None),
+        }
+        companies = [
+            {"ticker": "MSFT", "domain": "microsoft.com"},
+            {"ticker": "ACME", "domain": "acme.com"},
+            {"ticker": "XYZ", "domain": "xyz.com"},
+        ]
+        self.assertEqual(_warm_zoominfo(tool, companies), {"MSFT": True, "ACME": False, "XYZ": False})
+        tool.enrich_companies.assert_called_once_with(
+            [("microsoft.com", "MSFT"), ("acme.com", "ACME"), ("xyz.com", "XYZ")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
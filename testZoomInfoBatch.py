@@ -0,0 +1,63 @@
+import unittest
+
+from zoominfobatch import split_enrich_response, website_domain
+
+
+def result(website, name=None, status="FULL_MATCH"):
+    companies = [{"name": name, "website": f"www.{website}"}] if name else []
+    return {"input": {"companyWebsite": f"http://www.{website}"}, "data": companies, "matchStatus": status}
+
+
+def response(*results):
+    return {"success": True, "data": {"outputFields": [["name"]], "result": list(results)}}
+
+
+class TestZoomInfoBatch(unittest.TestCase):
+
+    def test_website_domain(self):
+        self.assertEqual(website_domain("http://www.Acme.com/about"), "acme.com")
+        self.assertEqual(website_domain("acme.co.uk"), "acme.co.uk")
+        self.assertEqual(website_domain(None), "")
+
+    def test_results_are_matched_by_input_not_position(self):
+        batch = response(result("b.com", "B"), result("a.com", "A"))
+        documents = split_enrich_response(batch, ["a.com", "b.com"])
+        self.assertEqual(documents[0]["data"]["result"][0]["data"][0]["name"], "A")
+        self.assertEqual(documents[1]["data"]["result"][0]["data"][0]["name"], "B")
+        self.assertEqual(documents[0]["data"]["outputFields"], [["name"]])
+        self.assertTrue(documents[0]["success"])
+
+    def test_results_without_input_are_matched_by_website(self):
+        matched = {"data": [{"name": "A", "website": "https://acme.com/"}], "matchStatus": "FULL_MATCH"}
+        documents = split_enrich_response(response(matched), ["zzz.com", "acme.com"])
+        self.assertIsNone(documents[0])
+        self.assertEqual(documents[1]["data"]["result"], [matched])
+
+    def test_missing_results_leave_their_domains_unmatched(self):
+        documents = split_enrich_response(response(result("a.com", "A")), ["a.com", "b.com", "c.com"])
+        self.assertIsNotNone(documents[0])
+        self.assertEqual(documents[1:], [None, None])
+        self.assertEqual(split_enrich_response({"success": False}, ["a.com", "b.com"]), [None, None])
+
+    def test_no_match_result_is_kept_for_its_domain(self):
+        documents = split_enrich_response(response(result("a.com", "A"), result("b.com", status="NO_MATCH")), ["a.com", "b.com"])
+        self.assertEqual(documents[1]["data"]["result"][0]["matchStatus"], "NO_MATCH")
+
+    def test_repeated_domain_shares_one_result(self):
+        documents = split_enrich_response(response(result("abc.xyz", "Alphabet")), ["abc.xyz", "ABC.xyz"])
+        self.assertIsNotNone(documents[0])
+        self.assertEqual(documents[0], documents[1])
+
+    def test_legacy_response_is_split_by_website(self):
+        legacy = {"success": True, "data": [{"name": "B", "website": "www.b.com"}, {"name": "A", "website": "www.a.com"}]}
+        documents = split_enrich_response(legacy, ["a.com", "b.com"])
+        self.assertEqual(documents[0]["data"], [{"name": "A", "website": "www.a.com"}])
+        self.assertEqual(documents[1]["data"], [{"name": "B", "website": "www.b.com"}])
+
+    def test_single_domain_response_is_returned_whole(self):
+        single = response(result("a.com", "A"))
+        self.assertEqual(split_enrich_response(single, ["a.com"]), [single])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import unittest
+
+from zoominfosummary import department_rows, estimate_tokens, location_rows, summarize
+
+FIELDS = {
+    "id": 123,
+    "name": "Acme, Inc.",
+    "ticker": "ACME",
+    "website": "www.acme.com",
+    "revenue": 1200000,
+    "employeeCount": 5400,
+    "primaryIndustry": ["Manufacturing", "Industrial Machinery"],
+    "companyStatus": "Active",
+    "parentName": None,
+    "street": "1 Main St",
+    "city": "Springfield",
+    "state": "Illinois",
+    "zipCode": "62701",
+    "country": "United States",
+    "employeeCountByDepartment": {"marketing": 120, "humanResources": 40, "it": 300},
+    "departmentBudgets": {"marketingBudget": 15000000, "itBudget": 42000000, "financeBudget": 9000000},
+    "matchStatus": "FULL_MATCH",
+}
+
+
+class TestZoomInfoSummary(unittest.TestCase):
+
+    def test_departments_join_head_counts_and_budgets(self):
+        self.assertEqual(
+            department_rows(FIELDS),
+            [
+                ["Marketing", 120, 15000000],
+                ["Human Resources", 40, None],
+                ["IT", 300, 42000000],
+                ["Finance", None, 9000000],
+            ],
+        )
+
+    def test_departments_read_lists_of_objects(self):
+        fields = {
+            "employeeCountByDepartment": [{"department": "Sales", "employeeCount": 75}],
+            "departmentBudgets": [{"department": "Sales", "budget": 5000}],
+        }
+        self.assertEqual(department_rows(fields), [["Sales", 75, 5000]])
+
+    def test_summary_has_headline_and_tables(self):
+        summary = summarize(FIELDS)
+        lines = summary.split("\n")
+        self.assertEqual(
+            lines[0],
+            "name: Acme, Inc.; ticker: ACME; website: www.acme.com; revenue (USD thousands): 1200000; "
+            "employees: 5400; industry: Manufacturing; Industrial Machinery; status: Active; "
+            "match status: FULL_MATCH",
+        )
+        self.assertEqual(lines[1], "departments (department,employees,budget):")
+        self.assertEqual(lines[2], "Marketing,120,15000000")
+        self.assertEqual(lines[3], "Human Resources,40,")
+        self.assertEqual(lines[6], "locations (street,city,state,zip code,country):")
+        self.assertEqual(lines[7], "1 Main St,Springfield,Illinois,62701,United States")
+        self.assertLess(len(summary), len(json.dumps(FIELDS)))
+
+    def test_empty_tables_are_left_out(self):
+        summary = summarize({"name": "Acme", "matchStatus": "NO_MATCH"})
+        self.assertEqual(summary, "name: Acme; match status: NO_MATCH")
+        self.assertEqual(location_rows({}), [])
+
+    def test_values_with_commas_are_quoted(self):
+        summary = summarize({"street": "1 Main St, Suite 2", "city": "Springfield"})
+        self.assertEqual(summary.split("\n")[-1], '"1 Main St, Suite 2",Springfield,,,')
+
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("abcde"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
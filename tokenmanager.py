@@ -0,0 +1,174 @@
+"""Access tokens that are refreshed ahead of expiry, one refresh at a time.
+
+A TokenManager holds the current token of an upstream API and fetches a new one in
+a background thread `refresh_ahead` seconds before the current one expires, so
+callers keep getting the valid token while it is replaced. Concurrent callers that
+need a token while none is valid (at startup, or after a failed refresh) wait for
+the same single refresh instead of each authenticating. Threads call get(), code on
+an event loop awaits get_async(). Refresh counts, latencies and failures are
+reported by stats().
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenManager:
+    """
+    The token of one upstream, refreshed by calling `fetch`, which returns a new
+    token or None on failure.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Optional[str]],
+        lifetime: float,
+        refresh_ahead: float,
+        retry_interval: float = 30.0,
+    ):
+        self.name = name
+        self.lifetime = lifetime
+        self.refresh_ahead = min(refresh_ahead, lifetime)
+        self.retry_interval = retry_interval
+        self._fetch = fetch
+        self._token = None
+        self._expires_at = 0.0  # time.monotonic() after which the token is not used
+        self._refresh = None  # Future of the refresh in flight
+        self._timer = None
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.failures = 0
+        self.waits = 0
+        self.last_refresh_seconds = None
+        self._total_refresh_seconds = 0.0
+
+    def start(self):
+        """
+        Fetches the first token in the background, so that the first caller need not wait.
+        """
+        self.refresh()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Returns a valid token, or None if none could be fetched within `timeout` seconds.
+        Only waits if there is no valid token.
+        """
+        token = self._valid_token()
+        if token is not None:
+            return token
+        try:
+            return self.refresh().result(timeout)
+        except FutureTimeoutError:
+            return None
+
+    async def get_async(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Async variant of get(), which waits for a refresh without blocking the event loop.
+        """
+        token = self._valid_token()
+        if token is not None:
+            return token
+        try:
+            # The refresh is shared with other callers, so a timeout must not cancel it.
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(self.refresh())), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def refresh(self) -> "Future[Optional[str]]":
+        """
+        Starts a refresh unless one is already running.
+
+        Returns:
+            The future of the refresh in flight, which resolves to the new token or None.
+        """
+        with self._lock:
+            # A resolved future may not have been cleared by _run_refresh yet.
+            if self._refresh is None or self._refresh.done():
+                self._refresh = Future()
+                threading.Thread(
+                    target=self._run_refresh,
+                    args=(self._refresh,),
+                    name=f"token-{self.name}",
+                    daemon=True,
+                ).start()
+            return self._refresh
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the number of refreshes, failed refreshes and callers that had to wait
+        for one, and the latency of the last and the average refresh in seconds.
+        """
+        with self._lock:
+            return {
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "waits": self.waits,
+                "last_refresh_seconds": self.last_refresh_seconds,
+                "mean_refresh_seconds": (
+                    self._total_refresh_seconds / self.refreshes if self.refreshes else None
+                ),
+            }
+
+    def _valid_token(self) -> Optional[str]:
+        with self._lock:
+            now = time.monotonic()
+            if self._token is None or now >= self._expires_at:
+                self.waits += 1
+                return None
+            token = self._token
+            due = now >= self._expires_at - self.refresh_ahead
+        if due:
+            # The timer normally starts this refresh; this covers a missed one.
+            self.refresh()
+        return token
+
+    def _run_refresh(self, future: "Future[Optional[str]]"):
+        started = time.monotonic()
+        try:
+            token = self._fetch()
+        except Exception as e:
+            logger.error(f"Refreshing the {self.name} token failed: {e}")
+            token = None
+        elapsed = time.monotonic() - started
+        delay = None
+        with self._lock:
+            self.last_refresh_seconds = elapsed
+            if token:
+                self._token = token
+                self._expires_at = started + self.lifetime
+                self.refreshes += 1
+                self._total_refresh_seconds += elapsed
+                delay = self.lifetime - self.refresh_ahead
+            else:
+                self.failures += 1
+                if self._token is not None and time.monotonic() < self._expires_at:
+                    # Keep trying while the current token is still good.
+                    delay = self.retry_interval
+        # The refresh stays in flight until its waiters have their result, so a caller
+        # cannot start a second one in between.
+        future.set_result(token or None)
+        with self._lock:
+            if self._refresh is future:
+                self._refresh = None
+            if delay is not None:
+                self._schedule(delay)
+        if token:
+            logger.info(f"Refreshed the {self.name} token in {elapsed:.2f}s.")
+        else:
+            logger.warning(f"Could not refresh the {self.name} token ({elapsed:.2f}s); token stats {self.stats()}.")
+
+    def _schedule(self, delay: float):
+        # Called with the lock held.
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(delay, 0.0), self.refresh)
+        self._timer.daemon = True
+        self._timer.start()
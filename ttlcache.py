@@ -0,0 +1,122 @@
+"""Small thread-safe in-process cache with a per-entry time to live."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+
+class TTLCache:
+    """
+    A bounded mapping whose entries expire `ttl` seconds after they were set. When
+    the cache is full the least recently used entry is evicted. Lookups are counted
+    in `hits` and `misses`.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value stored for a key, or `default` if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any = True):
+        """
+        Stores a value for a key, replacing any earlier one.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit and miss counts and the number of entries.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def __contains__(self, key: Hashable) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def negative_cache() -> TTLCache:
+    """
+    Returns a cache for upstream lookups that found nothing (unknown tickers,
+    domains ZoomInfo cannot match, LinkedIn profiles Proxycurl cannot resolve), so
+    they are not paid for again until NEGATIVE_CACHE_TTL_SECONDS have passed.
+    """
+    return TTLCache(
+        maxsize=int(os.environ.get("NEGATIVE_CACHE_MAXSIZE", "4096")),
+        ttl=float(os.environ.get("NEGATIVE_CACHE_TTL_SECONDS", "86400")),
+    )
+
+
+def row_cache() -> TTLCache:
+    """
+    Returns a cache for rows read from the cache tables, keyed like the table, so
+    that repeat lookups within ROW_CACHE_TTL_SECONDS do not query the database.
+    Tools update or drop an entry whenever they write its row.
+    """
+    return TTLCache(
+        maxsize=int(os.environ.get("ROW_CACHE_MAXSIZE", "1024")),
+        ttl=float(os.environ.get("ROW_CACHE_TTL_SECONDS", "300")),
+    )
+
+
+def passage_cache() -> TTLCache:
+    """
+    Returns a cache for the passage vectors of the in-memory passage index, keyed
+    by URL. Embedding a filing calls the embedding model, so entries are kept for
+    PASSAGE_INDEX_TTL_SECONDS, but only for the PASSAGE_INDEX_MAXSIZE most recently
+    used filings.
+    """
+    return TTLCache(
+        maxsize=int(os.environ.get("PASSAGE_INDEX_MAXSIZE", "32")),
+        ttl=float(os.environ.get("PASSAGE_INDEX_TTL_SECONDS", "86400")),
+    )
+
+
+def text_cache() -> TTLCache:
+    """
+    Returns a cache for the decompressed text of filings, keyed by URL. Each entry
+    is a whole 10-K, so only the SEC_TEXT_CACHE_MAXSIZE most recently read are kept.
+    """
+    return TTLCache(
+        maxsize=int(os.environ.get("SEC_TEXT_CACHE_MAXSIZE", "8")),
+        ttl=float(os.environ.get("ROW_CACHE_TTL_SECONDS", "300")),
+    )
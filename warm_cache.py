@@ -0,0 +1,264 @@
+"""Fills the SEC, ZoomInfo and Nubela cache tables ahead of time for a list of companies.
+
+Usage (from the directory that contains this package):
+
+    python -m corporate_analyst.warm_cache companies.csv
+
+The input is either one ticker per line or a CSV file with a header row and the
+columns ticker, domain, company_name and linkedin_url. Only the ticker is required;
+ZoomInfo needs the domain and Nubela needs the LinkedIn URL, so companies without
+them are warmed for the SEC only. Lines starting with '#' are ignored.
+
+Each upstream gets its own bounded worker pool. ZoomInfo companies are enriched in
+batches, several per request. Completed (upstream, ticker) pairs
+are appended to a state file, and a rerun skips them, so an interrupted run can be
+resumed. A throughput and latency summary is printed at the end.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from . import nubelatool
+    from . import sec10ktool
+    from . import zoominfotool
+
+logger = logging.getLogger(__name__)
+
+UPSTREAMS = ("sec", "zoominfo", "nubela")
+
+
+def read_companies(path: str) -> List[Dict[str, str]]:
+    """
+    Reads the list of companies to warm.
+
+    Args:
+        path: A file with one ticker per line, or a CSV file with a header row.
+
+    Returns:
+        One dict per company with the keys ticker, domain, company_name and linkedin_url.
+    """
+    with open(path, newline="") as companies_file:
+        lines = [
+            line for line in companies_file
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+    if lines and "ticker" in lines[0].lower().split(","):
+        rows = list(csv.DictReader(lines))
+    else:
+        rows = [{"ticker": line.split(",")[0]} for line in lines]
+
+    companies = []
+    seen = set()
+    for row in rows:
+        row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+        ticker = row.get("ticker", "").upper()
+        if not ticker or ticker in seen:
+            continue
+        seen.add(ticker)
+        companies.append({
+            "ticker": ticker,
+            "domain": row.get("domain", ""),
+            "company_name": row.get("company_name", ""),
+            "linkedin_url": row.get("linkedin_url", ""),
+        })
+    return companies
+
+
+class WarmState:
+    """
+    Append-only record of completed (upstream, ticker) pairs, used to resume a run.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.completed = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as state_file:
+                for line in state_file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A partially written last line from an interrupted run
+                    if entry.get("ok"):
+                        self.completed.add((entry["upstream"], entry["ticker"]))
+
+    def is_done(self, upstream: str, ticker: str) -> bool:
+        return (upstream, ticker) in self.completed
+
+    def record(self, upstream: str, ticker: str, ok: bool, seconds: float):
+        if not self.path:
+            return
+        entry = {"upstream": upstream, "ticker": ticker, "ok": ok, "seconds": round(seconds, 3)}
+        with self._lock:
+            with open(self.path, "a") as state_file:
+                state_file.write(json.dumps(entry) + "\n")
+
+
+class UpstreamStats:
+    """
+    Counts and latencies for the tasks of one upstream.
+    """
+
+    def __init__(self):
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def add(self, ok: bool, seconds: float):
+        with self._lock:
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.latencies.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _warm_sec(tool: "sec10ktool.SEC10KTool", company: Dict[str, str]) -> bool:
+    url, _ = tool.get_10k_report_link(company["ticker"])
+    return bool(url) and tool.download_sec_filing(url, company["ticker"]) is not None
+
+
+def _warm_zoominfo(tool: "zoominfotool.ZoomInfoTool", companies: List[Dict[str, str]]) -> Dict[str, bool]:
+    results = tool.enrich_companies([(company["domain"], company["ticker"]) for company in companies])
+    # Each result is a zoominfotool.Enrichment, (ok, result).
+    return {ticker: ok for ticker, (ok, _) in results.items()}
+
+
+def _warm_nubela(tool: "nubelatool.NubelaTool", company: Dict[str, str]) -> bool:
+    result = tool.enrich_linkedin_company(
+        company["linkedin_url"], company["domain"], company["company_name"], company["ticker"]
+    )
+    return bool(result) and json.loads(result).get("status") != "error"
+
+
+def warm(companies: List[Dict[str, str]], concurrency: Dict[str, int], state: WarmState) -> Dict[str, UpstreamStats]:
+    """
+    Warms every upstream for every company, each upstream on its own bounded pool.
+
+    Args:
+        companies: The companies returned by read_companies.
+        concurrency: The number of concurrent requests allowed per upstream.
+        state: Completed pairs to skip; new results are recorded in it.
+
+    Returns:
+        The statistics of each upstream.
+    """
+    tasks = {
+        "sec": list(companies),
+        "zoominfo": [c for c in companies if c["domain"]],
+        "nubela": [c for c in companies if c["linkedin_url"]],
+    }
+    stats = {upstream: UpstreamStats() for upstream in UPSTREAMS}
+    for upstream in UPSTREAMS:
+        pending = [c for c in tasks[upstream] if not state.is_done(upstream, c["ticker"])]
+        stats[upstream].skipped = len(tasks[upstream]) - len(pending)
+        tasks[upstream] = pending
+
+    from . import nubelatool
+    from . import sec10ktool
+    from . import zoominfotool
+
+    # Only build the tools that have work to do. Each task warms a batch of companies:
+    # one for the SEC and Nubela, and as many as ZoomInfo enriches per request.
+    warmers: Dict[str, Callable[[List[Dict[str, str]]], Dict[str, bool]]] = {}
+    batch_sizes = {upstream: 1 for upstream in UPSTREAMS}
+    if tasks["sec"]:
+        sec_tool = sec10ktool.SEC10KTool()
+        warmers["sec"] = lambda batch: {c["ticker"]: _warm_sec(sec_tool, c) for c in batch}
+    if tasks["zoominfo"]:
+        zoominfo_tool = zoominfotool.ZoomInfoTool()
+        warmers["zoominfo"] = lambda batch: _warm_zoominfo(zoominfo_tool, batch)
+        batch_sizes["zoominfo"] = zoominfo_tool.batch_size
+    if tasks["nubela"]:
+        nubela_tool = nubelatool.NubelaTool()
+        warmers["nubela"] = lambda batch: {c["ticker"]: _warm_nubela(nubela_tool, c) for c in batch}
+
+    def run(upstream: str, batch: List[Dict[str, str]]):
+        started = time.perf_counter()
+        try:
+            ok_by_ticker = warmers[upstream](batch)
+        except Exception as e:
+            logger.error(f"{upstream} failed for {', '.join(c['ticker'] for c in batch)}: {e}")
+            ok_by_ticker = {}
+        # Every company of a batch is charged the time of the whole batch.
+        seconds = time.perf_counter() - started
+        for company in batch:
+            ok = ok_by_ticker.get(company["ticker"], False)
+            stats[upstream].add(ok, seconds)
+            state.record(upstream, company["ticker"], ok, seconds)
+            logger.info(f"{upstream} {company['ticker']}: {'ok' if ok else 'failed'} in {seconds:.2f}s")
+
+    executors = [
+        ThreadPoolExecutor(max_workers=max(1, concurrency[upstream]), thread_name_prefix=f"warm-{upstream}")
+        for upstream in UPSTREAMS
+    ]
+    try:
+        for upstream, executor in zip(UPSTREAMS, executors):
+            size = batch_sizes[upstream]
+            for start in range(0, len(tasks[upstream]), size):
+                executor.submit(run, upstream, tasks[upstream][start:start + size])
+    finally:
+        for executor in executors:
+            executor.shutdown(wait=True)
+    return stats
+
+
+def format_summary(stats: Dict[str, UpstreamStats], elapsed: float) -> str:
+    """
+    Formats the end-of-run throughput and latency summary.
+    """
+    lines = [
+        f"Cache warming finished in {elapsed:.1f}s",
+        f"{'upstream':<10}{'ok':>6}{'failed':>8}{'skipped':>9}{'per min':>9}{'p50 s':>8}{'p95 s':>8}{'max s':>8}",
+    ]
+    for upstream, upstream_stats in stats.items():
+        done = upstream_stats.succeeded + upstream_stats.failed
+        per_minute = done / elapsed * 60 if elapsed > 0 else 0.0
+        lines.append(
+            f"{upstream:<10}{upstream_stats.succeeded:>6}{upstream_stats.failed:>8}{upstream_stats.skipped:>9}"
+            f"{per_minute:>9.1f}{upstream_stats.percentile(0.5):>8.2f}{upstream_stats.percentile(0.95):>8.2f}"
+            f"{max(upstream_stats.latencies, default=0.0):>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Warm the corporate analyst cache tables for a list of companies.")
+    parser.add_argument("companies", help="File with one ticker per line, or a CSV with ticker,domain,company_name,linkedin_url columns.")
+    parser.add_argument("--state", default="warm_cache_state.jsonl", help="Progress file used to resume an interrupted run. Pass '' to disable.")
+    parser.add_argument("--sec-concurrency", type=int, default=4, help="Concurrent SEC downloads.")
+    parser.add_argument("--zoominfo-concurrency", type=int, default=2, help="Concurrent ZoomInfo requests.")
+    parser.add_argument("--nubela-concurrency", type=int, default=2, help="Concurrent Proxycurl requests.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    companies = read_companies(args.companies)
+    concurrency = {
+        "sec": args.sec_concurrency,
+        "zoominfo": args.zoominfo_concurrency,
+        "nubela": args.nubela_concurrency,
+    }
+    started = time.perf_counter()
+    stats = warm(companies, concurrency, WarmState(args.state or None))
+    print(format_summary(stats, time.perf_counter() - started))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Splits a batched ZoomInfo /enrich/company response into one response per company.
+
+enrich_companies sends up to ZOOMINFO_MAX_BATCH_SIZE companies per request. Each
+entry of data.result[] echoes the matchCompanyInput it answers under "input", and
+matched companies carry their website, so results are matched to the requested
+domains by those rather than by position. A domain that no result can be matched
+to is reported as unmatched instead of being requested again on its own.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+def website_domain(website: Any) -> str:
+    """
+    Returns the host of a website without scheme, "www." and path, in lower case,
+    e.g. "http://www.Acme.com/about" -> "acme.com"; "" if it is not a string.
+    """
+    if not isinstance(website, str):
+        return ""
+    host = website.strip().lower()
+    if "://" in host:
+        host = host.split("://", 1)[1]
+    host = host.split("/", 1)[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def _result_domains(result: Dict[str, Any]) -> List[str]:
+    """
+    Returns the domains a result may answer: the website it was requested with,
+    then the websites of the companies it matched.
+    """
+    domains = []
+    request = result.get("input")
+    if isinstance(request, dict):
+        domains.append(website_domain(request.get("companyWebsite")))
+    companies = result.get("data")
+    if isinstance(companies, list):
+        domains.extend(website_domain(company.get("website")) for company in companies if isinstance(company, dict))
+    elif isinstance(result.get("website"), str):
+        domains.append(website_domain(result["website"]))  # a company of a legacy response
+    return [domain for domain in domains if domain]
+
+
+def split_enrich_response(response: Dict[str, Any], company_domains: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Splits an enrich response for several domains into one response per domain,
+    shaped as if the domain had been enriched on its own.
+
+    Args:
+        response: The decoded response, with the results in data.result[] (or, from
+            the legacy API, the companies in data[]).
+        company_domains: The domains the request was sent for, in order.
+
+    Returns:
+        The response of each domain, in order, or None for a domain that no result
+        could be matched to.
+    """
+    if len(company_domains) == 1:
+        return [response]
+    data = response.get("data")
+    legacy = not isinstance(data, dict)
+    results = data if legacy else data.get("result")
+    if not isinstance(results, list):
+        results = []
+
+    positions: Dict[str, List[int]] = {}
+    for i, domain in enumerate(company_domains):
+        positions.setdefault(website_domain(domain), []).append(i)
+    documents: List[Optional[Dict[str, Any]]] = [None] * len(company_domains)
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        for domain in _result_domains(result):
+            free = [i for i in positions.get(domain, ()) if documents[i] is None]
+            if free:
+                documents[free[0]] = dict(response, data=[result] if legacy else dict(data, result=[result]))
+                break
+    # A domain requested twice (e.g. for two share classes) may be answered once.
+    for indices in positions.values():
+        answered = next((documents[i] for i in indices if documents[i] is not None), None)
+        for i in indices:
+            if documents[i] is None:
+                documents[i] = answered
+    return documents
@@ -0,0 +1,138 @@
+"""Formats the report fields of a ZoomInfo enrichment as compact text for the model.
+
+The report tabulates the company's departments (head count and budget) and
+locations, and quotes a few headline facts and the match status. summarize()
+returns exactly that, as a line of headline facts followed by CSV rows with a
+header per table, which takes a fraction of the tokens of the JSON document.
+"""
+
+import csv
+import io
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+# Headline fields and their labels, in the order they are listed.
+HEADLINE_FIELDS = (
+    ("name", "name"),
+    ("ticker", "ticker"),
+    ("website", "website"),
+    ("revenue", "revenue (USD thousands)"),
+    ("revenueRange", "revenue range"),
+    ("employeeCount", "employees"),
+    ("employeeRange", "employee range"),
+    ("primaryIndustry", "industry"),
+    ("businessModel", "business model"),
+    ("companyStatus", "status"),
+    ("parentName", "parent"),
+    ("ultimateParentName", "ultimate parent"),
+    ("matchStatus", "match status"),
+)
+
+LOCATION_FIELDS = (
+    ("street", "street"),
+    ("city", "city"),
+    ("state", "state"),
+    ("zipCode", "zip code"),
+    ("country", "country"),
+)
+
+_CAMEL_CASE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Returns a rough count of the model tokens in a text, at four characters per token.
+    """
+    return (len(text) + 3) // 4
+
+
+def _value(value: Any) -> str:
+    if isinstance(value, list):
+        return "; ".join(_value(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def _department_key(name: str) -> str:
+    key = re.sub(r"[^a-z0-9]", "", name.lower())
+    return key[: -len("budget")] if key.endswith("budget") and key != "budget" else key
+
+
+def _department_label(name: str) -> str:
+    if name.endswith("Budget") and name != "Budget":
+        name = name[: -len("Budget")]
+    words = _CAMEL_CASE.sub(" ", name).split()
+    return " ".join(word.upper() if len(word) <= 2 else word[:1].upper() + word[1:] for word in words)
+
+
+def _named_values(value: Any, name_keys: Tuple[str, ...], value_keys: Tuple[str, ...]) -> List[Tuple[str, Any]]:
+    """
+    Reads (name, value) pairs from either {name: value} or [{name_key: ..., value_key: ...}].
+    """
+    if isinstance(value, dict):
+        return [(str(name), item) for name, item in value.items()]
+    pairs = []
+    for item in value if isinstance(value, list) else []:
+        if not isinstance(item, dict):
+            continue
+        name = next((item[key] for key in name_keys if item.get(key)), None)
+        amount = next((item[key] for key in value_keys if item.get(key) is not None), None)
+        if name:
+            pairs.append((str(name), amount))
+    return pairs
+
+
+def department_rows(fields: Dict[str, Any]) -> List[List[Any]]:
+    """
+    Returns [department, employees, budget] rows, joining the head counts and the
+    budgets of the same department (e.g. "marketing" and "marketingBudget").
+    """
+    rows: Dict[str, List[Any]] = {}
+    for name, count in _named_values(
+        fields.get("employeeCountByDepartment"), ("department", "name"), ("employeeCount", "count", "employees")
+    ):
+        rows.setdefault(_department_key(name), [_department_label(name), None, None])[1] = count
+    for name, budget in _named_values(
+        fields.get("departmentBudgets"), ("department", "name"), ("budget", "amount", "value")
+    ):
+        rows.setdefault(_department_key(name), [_department_label(name), None, None])[2] = budget
+    return list(rows.values())
+
+
+def location_rows(fields: Dict[str, Any]) -> List[List[Any]]:
+    """
+    Returns the [street, city, state, zip code, country] row of the headquarters, if known.
+    """
+    row = [fields.get(field) for field, _ in LOCATION_FIELDS]
+    return [row] if any(value is not None for value in row) else []
+
+
+def summarize(fields: Dict[str, Any]) -> str:
+    """
+    Formats the report fields of an enrichment (see zoominfotool.REPORT_FIELDS).
+
+    Returns:
+        A "label: value; ..." headline line, then a "departments" and a "locations"
+        table as CSV rows under a "<table> (<columns>):" line. Tables without rows
+        are left out.
+    """
+    out = io.StringIO()
+    headline = [
+        f"{label}: {_value(fields[field])}"
+        for field, label in HEADLINE_FIELDS
+        if fields.get(field) not in (None, "", [])
+    ]
+    out.write("; ".join(headline) + "\n")
+    writer = csv.writer(out, lineterminator="\n")
+    tables: List[Tuple[str, Tuple[str, ...], List[List[Any]]]] = [
+        ("departments", ("department", "employees", "budget"), department_rows(fields)),
+        ("locations", tuple(label for _, label in LOCATION_FIELDS), location_rows(fields)),
+    ]
+    for name, columns, rows in tables:
+        if not rows:
+            continue
+        out.write(f"{name} ({','.join(columns)}):\n")
+        writer.writerows([["" if value is None else _value(value) for value in row] for row in rows])
+    return out.getvalue().rstrip("\n")
@@ -1,17 +1,67 @@
 """Tool that pulls corporate information from ZoomInfo."""
 
 import os
-import ssl
-import certifi
-import http.client
 import json
+import asyncio
 import datetime
-import sqlalchemy
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 from dotenv import load_dotenv
 import requests
 
+from . import companylist
+from . import httpclient
+from . import revalidation
+from . import storage
+from . import tokenmanager
+from . import ttlcache
+from . import zoominfobatch
+from . import zoominfosummary
+
+ZOOMINFO_BASE_URL = "https://api.zoominfo.com"  # Or your region specific base url
+
+# The most companies /enrich/company accepts in one request.
+ZOOMINFO_MAX_BATCH_SIZE = 25
+
+# The fields of an enriched company that the report uses: headline facts, the
+# locations table and the department head count and budget table.
+REPORT_FIELDS = (
+    "id",
+    "name",
+    "ticker",
+    "website",
+    "revenue",
+    "revenueRange",
+    "employeeCount",
+    "employeeRange",
+    "primaryIndustry",
+    "businessModel",
+    "companyStatus",
+    "parentName",
+    "ultimateParentName",
+    "street",
+    "city",
+    "state",
+    "zipCode",
+    "country",
+    "metroArea",
+    "departmentBudgets",
+    "employeeCountByDepartment",
+)
+
+# The enriched company is data[0] in responses of the legacy enrich API and
+# data.result[0].data[0] in current ones, which also carry the match status.
+_COMPANY_PATHS = (("data", 0), ("data", "result", 0, "data", 0))
+REPORT_PROJECTION = {
+    field: [path + (field,) for path in _COMPANY_PATHS] for field in REPORT_FIELDS
+}
+REPORT_PROJECTION["matchStatus"] = [("data", "result", 0, "matchStatus")]
+
+
+class Enrichment(NamedTuple):
+    ok: bool  # True if result holds the company's report fields
+    result: Optional[str]  # what enrich_company would return: the report fields, an error message or None
+
 
 class ZoomInfoTool:
     """
@@ -20,14 +70,38 @@ class ZoomInfoTool:
 
     def __init__(self):
         """
-        Initializes the ZoomInfoTool, including the database connection pool and logging.
+        Initializes the ZoomInfoTool, including its storage and logging.
         """
         load_dotenv()  # Load environment variables from .env file
         self._init_logging()
-        self.db_pool = None
-        self.zoom_token_update_time = datetime.datetime.min
-        self.zoom_token = None
-        self._init_db_pool()
+        self.storage = None
+        # The JWT is refreshed in the background before it expires, one refresh at a time.
+        self._token_manager = tokenmanager.TokenManager(
+            "zoominfo",
+            self._authenticate,
+            lifetime=float(os.environ.get("ZOOMINFO_TOKEN_TTL_SECONDS", "3300")),
+            refresh_ahead=float(os.environ.get("ZOOMINFO_TOKEN_REFRESH_AHEAD_SECONDS", "300")),
+        )
+        # Domains ZoomInfo returned no company for.
+        self._negative_cache = ttlcache.negative_cache()
+        # Enrichments older than 30 days are returned as is and refreshed in the background.
+        self._revalidator = revalidation.Revalidator("zoominfo")
+        # Enrichment rows by ticker, so repeated calls skip the database.
+        self._rows = ttlcache.row_cache()
+        # Companies sent per /enrich/company request by enrich_companies.
+        self.batch_size = max(
+            1,
+            min(
+                int(os.environ.get("ZOOMINFO_BATCH_SIZE", str(ZOOMINFO_MAX_BATCH_SIZE))),
+                ZOOMINFO_MAX_BATCH_SIZE,
+            ),
+        )
+        self._init_storage()
+        if (
+            os.environ.get("ENABLE_ZOOMINFO_API_CALLS", "True").lower() == "true"
+            and os.environ.get("ZOOMINFO_USERNAME")
+        ):
+            self._token_manager.start()
 
     def _init_logging(self):
         """
@@ -45,84 +119,67 @@ class ZoomInfoTool:
         console_handler.setFormatter(formatter)
         self.logger.addHandler(console_handler)
 
-    def _init_db_pool(self):
-        """
-        Initializes the database connection pool using Cloud SQL Python Connector.
-        """
-        if self.db_pool is None:
-            db_user = os.environ["DB_USER"]
-            db_pass = os.environ["DB_PASS"]
-            db_name = os.environ["DB_NAME"]
-            db_connection_name = os.environ[
-                "DB_CONNECTION_NAME"
-            ]  # e.g., project:region:instance
-
-            from google.cloud.sql.connector import Connector
-
-            def getconn():
-                """Creates a connection to the database using the Cloud SQL Python Connector."""
-                connector = Connector()
-                conn = connector.connect(
-                    db_connection_name,
-                    "pg8000",
-                    user=db_user,
-                    password=db_pass,
-                    db=db_name,
-                    ip_type="PRIVATE"
-                )
-                return conn
-
-            self.db_pool = sqlalchemy.create_engine(
-                "postgresql+pg8000://",  # Use pg8000 in the connection string
-                creator=getconn,
-                pool_size=5,
-                max_overflow=2,
-                pool_timeout=30,
-                pool_recycle=1800,
-            )
-            self.logger.info(
-                "Database connection pool initialized using Cloud SQL Connector."
-            )
+    def _init_storage(self):
+        """
+        Uses the storage shared by all tools.
+        """
+        if self.storage is None:
+            self.storage = storage.get_storage()
 
-    def _get_db_pool(self):
+    def _get_storage(self) -> storage.Storage:
         """
-        Returns the database connection pool.
+        Returns the storage of the cached enrichments.
         """
-        if self.db_pool is None:
-            self._init_db_pool()
-        return self.db_pool
+        if self.storage is None:
+            self._init_storage()
+        return self.storage
 
-    def _get_token(self):
+    def _get_token(self) -> Optional[str]:
+        """Returns a valid ZoomInfo access token, or None if authentication failed."""
+        return self._token_manager.get(
+            timeout=float(os.environ.get("HTTP_READ_TIMEOUT", "60"))
+        )
+
+    def _authenticate(self) -> Optional[str]:
         """Retrieves an access token from ZoomInfo using username and password."""
         username = os.environ.get("ZOOMINFO_USERNAME")
         password = os.environ.get("ZOOMINFO_PASSWORD")
 
-        context = ssl.create_default_context(cafile=certifi.where())
-
-        minutes = (
-            datetime.datetime.now() - self.zoom_token_update_time
-        ).total_seconds() / 60
-        conn = http.client.HTTPSConnection("api.zoominfo.com", context=context)
-
-        if self.zoom_token is None or self.zoom_token == "" or minutes > 55:
-            self.logger.info("Refreshing zoominfo jwt token.")
-            payload = json.dumps({"username": username, "password": password})
-            headers = {"Content-Type": "application/json"}
-            conn.request("POST", "/authenticate", payload, headers)
-            res = conn.getresponse()
-            auth = res.read()
-            # set the token and update time
-            try:
-                self.zoom_token = json.loads(auth)["jwt"]
-                self.zoom_token_update_time = datetime.datetime.now()
-                self.logger.info("Token update was a success. Resetting token and time.")
-            except (json.JSONDecodeError, KeyError) as e:
-                self.logger.error(f"Error decoding JSON or missing key: {e}")
-                self.logger.error(f"Response content: {auth}")
-                self.zoom_token = None  # Reset to none if there's an error
-                return None
-
-        return self.zoom_token
+        self.logger.info("Refreshing zoominfo jwt token.")
+        payload = json.dumps({"username": username, "password": password})
+        headers = {"Content-Type": "application/json"}
+        try:
+            res = httpclient.post(
+                f"{ZOOMINFO_BASE_URL}/authenticate", data=payload, headers=headers
+            )
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error during ZoomInfo authentication: {e}")
+            return None
+        auth = res.content
+        try:
+            token = json.loads(auth)["jwt"]
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            self.logger.error(f"Error decoding JSON or missing key: {e}")
+            self.logger.error(f"Response content: {auth}")
+            return None
+        self.logger.info(f"Token update was a success; token stats {self._token_manager.stats()}.")
+        return token
+
+    @staticmethod
+    def _has_match(company_enrichment_data) -> bool:
+        """
+        Returns True if an enrich response holds at least one company. Depending on
+        the API version the companies are in data or in data.result[].data.
+        """
+        data = (company_enrichment_data or {}).get("data")
+        if isinstance(data, list):
+            return len(data) > 0
+        if isinstance(data, dict):
+            return any(
+                isinstance(result, dict) and result.get("data")
+                for result in data.get("result") or []
+            )
+        return False
 
     def search_companies(self, company_name):
         """Searches for companies by name."""
@@ -132,7 +189,6 @@ class ZoomInfoTool:
             return None
 
         endpoint = "/search/company"
-        base_url = "https://api.zoominfo.com"  # Or your region specific base url
         headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
@@ -140,8 +196,8 @@ class ZoomInfoTool:
         params = {"name": company_name}  # Parameters to pass to the api
 
         try:
-            response = requests.get(
-                f"{base_url}{endpoint}", headers=headers, params=params
+            response = httpclient.get(
+                f"{ZOOMINFO_BASE_URL}{endpoint}", headers=headers, params=params
             )
             response.raise_for_status()
             return response.json()
@@ -150,15 +206,69 @@ class ZoomInfoTool:
             self.logger.error(f"Error during API call: {e}")
             return None
 
-    def enrich_company(self, company_domain: str, ticker: str) -> Optional[str]:
+    def enrich_company(self, company_domain: str, ticker: str, full: bool = False) -> Optional[str]:
         """Enriches company data from ZoomInfo.
 
         Args:
             company_domain: Domain name of the company such as google.com
             ticker: The ticker symbol of the company
+            full: Return the complete ZoomInfo response in JSON format instead of the summary
 
         Returns:
-            Enriched information about the company from ZoomInfo in JSON format as a string or None if an error occurs
+            A summary of the company from ZoomInfo: a line of headline facts and the match status, then the departments table (department, employees, budget) and the locations table (street, city, state, zip code, country) as CSV rows. None or an error message if the company could not be enriched.
+        """
+        result = self._enrich_fields(company_domain, ticker)
+        if full and self._is_fields(result):
+            cache = self._get_storage()
+            with cache.connect() as db_conn:
+                stored = cache.get_enrichment(db_conn, "zoominfo", ticker)
+            return self._render(result, ticker, stored[0] if stored else None)
+        return self._render(result, ticker)
+
+    async def enrich_company_async(
+        self, company_domain: str, ticker: str, full: bool = False
+    ) -> Optional[str]:
+        """
+        Async variant of enrich_company for the agent's event loop. The stored row is
+        read and written through the async storage; only the ZoomInfo calls, which use
+        blocking HTTP, run in a worker thread.
+        """
+        result = await self._enrich_fields_async(company_domain, ticker)
+        if full and self._is_fields(result):
+            cache = storage.get_async_storage()
+            async with cache.connect() as db_conn:
+                stored = await cache.get_enrichment(db_conn, "zoominfo", ticker)
+            return self._render(result, ticker, stored[0] if stored else None)
+        return self._render(result, ticker)
+
+    @staticmethod
+    def _is_fields(result: Optional[str]) -> bool:
+        # Report fields are a JSON object; anything else is None or an error message.
+        return bool(result) and result.startswith("{")
+
+    def _render(self, result: Optional[str], ticker: str, document: Any = None) -> Optional[str]:
+        """
+        Returns the tool output for the report fields in JSON format: the stored
+        document if one is given, otherwise the summary. Error messages are returned
+        as they are. The size of the output is logged.
+        """
+        if not self._is_fields(result):
+            return result
+        if document is not None:
+            output = document if isinstance(document, str) else json.dumps(document)
+        else:
+            output = zoominfosummary.summarize(json.loads(result))
+        self.logger.info(
+            f"ZoomInfo output for ticker '{ticker}': {len(output.encode('utf-8'))} bytes, "
+            f"~{zoominfosummary.estimate_tokens(output)} tokens ({'full' if document is not None else 'summary'}; "
+            f"report fields are {len(result.encode('utf-8'))} bytes)."
+        )
+        return output
+
+    def _enrich_fields(self, company_domain: str, ticker: str) -> Optional[str]:
+        """
+        Returns the report fields of a company in JSON format, from the database if
+        possible, otherwise from ZoomInfo; None or an error message on failure.
         """
         # Check if ZoomInfo API calls are enabled
         if os.environ.get("ENABLE_ZOOMINFO_API_CALLS", "True").lower() != "true":
@@ -167,163 +277,480 @@ class ZoomInfoTool:
         self.logger.debug(
             f"enrich_company called with company_domain: {company_domain}, ticker: {ticker}"
         )
-        db_pool = self._get_db_pool()
-        with db_pool.connect() as db_conn:
-            # Check if the report already exists in the database
-            result = db_conn.execute(
-                sqlalchemy.text(
-                    "SELECT company_enrichment_data, last_update_date FROM zoominfo_enrichments WHERE ticker = :ticker"
-                ),
-                {"ticker": ticker},
-            ).fetchone()
+        # Repeat lookups are answered from memory without a database round trip.
+        result = self._rows.get(ticker)
+        if result is None:
+            cache = self._get_storage()
+            with cache.connect() as db_conn:
+                # Check if the report already exists in the database, reading only
+                # the fields the report uses.
+                result = cache.get_enrichment_projection(
+                    db_conn, "zoominfo", ticker, REPORT_PROJECTION
+                )
+            if result:
+                result = tuple(result)
+                self._rows.set(ticker, result)
+        else:
+            self.logger.debug(f"Enrichment row for ticker '{ticker}' served from memory; row cache {self._rows.stats()}.")
+
+        if result:
+            return self._serve_enrichment(result, company_domain, ticker)
+
+        # If not in the database, download and process the report
+        # Check if ZoomInfo API calls are enabled
+        if os.environ.get("ENABLE_ZOOMINFO_API_CALLS", "True").lower() != "true":
+            return None
+
+        with self._get_storage().connect() as db_conn:
+            return self._refresh_enrichment(db_conn, company_domain, ticker)
 
+    async def _enrich_fields_async(self, company_domain: str, ticker: str) -> Optional[str]:
+        """
+        Async variant of _enrich_fields.
+        """
+        result = self._rows.get(ticker)
+        if result is None:
+            cache = storage.get_async_storage()
+            async with cache.connect() as db_conn:
+                result = await cache.get_enrichment_projection(
+                    db_conn, "zoominfo", ticker, REPORT_PROJECTION
+                )
             if result:
-                company_enrichment_data, last_update_date = result
-                if (
-                    last_update_date
-                    and datetime.date.today() - last_update_date
-                    < datetime.timedelta(days=30)
-                ):
-                    self.logger.info(
-                        f"Enrichment data for company ticker '{ticker}' found in the database and is recent."
-                    )
-                    return company_enrichment_data  # Return the company_enrichment_data from the database
-                elif os.environ.get("ENABLE_ZOOMINFO_API_CALLS", "True").lower() != "true":
-                    self.logger.info(
-                        f"Enrichment data for company ticker '{ticker}' found in the database but ZoomInfo API calls are disabled."
-                    )
-                    return company_enrichment_data
+                result = tuple(result)
+                self._rows.set(ticker, result)
+
+        if result:
+            return self._serve_enrichment(result, company_domain, ticker)
+
+        if os.environ.get("ENABLE_ZOOMINFO_API_CALLS", "True").lower() != "true":
+            return None
+
+        # A domain that is not sent to ZoomInfo needs no token.
+        rejected, result = self._reject_domain(company_domain)
+        if rejected:
+            return result
+        # Wait for a token, if there is none yet, on the loop rather than in the worker thread.
+        access_token = await self._token_manager.get_async(
+            timeout=float(os.environ.get("HTTP_READ_TIMEOUT", "60"))
+        )
+        company_enrichment_data = await asyncio.to_thread(
+            self._fetch_enrichment, company_domain, access_token
+        )
+        if not isinstance(company_enrichment_data, dict):
+            return company_enrichment_data
+        async with storage.get_async_storage().connect() as db_conn:
+            return await db_conn.run_sync(
+                self._store_enrichment, company_domain, ticker, company_enrichment_data
+            )
+
+    def _serve_enrichment(self, result: tuple, company_domain: str, ticker: str) -> str:
+        """
+        Returns the report fields of a stored enrichment in JSON format, scheduling a
+        background refresh if it is stale.
+
+        Args:
+            result: The (fields, last_update_date, last_verified) row of the ticker.
+            company_domain: Domain name of the company such as google.com
+            ticker: The ticker symbol of the company
+        """
+        report_fields, last_update_date, last_verified = result
+        if self._is_recent(last_update_date, last_verified):
+            self.logger.info(
+                f"Enrichment data for company ticker '{ticker}' found in the database and is recent."
+            )
+            return json.dumps(report_fields)  # Return the report fields from the database
+        elif os.environ.get("ENABLE_ZOOMINFO_API_CALLS", "True").lower() != "true":
+            self.logger.info(
+                f"Enrichment data for company ticker '{ticker}' found in the database but ZoomInfo API calls are disabled."
+            )
+            return json.dumps(report_fields)
+        else:
+            self.logger.info(
+                f"Enrichment data for company ticker '{ticker}' found in the database but is older than 30 days. Refreshing in the background."
+            )
+            self._revalidator.submit(
+                ticker, lambda: self._revalidate_enrichment(company_domain, ticker)
+            )
+            return json.dumps(report_fields)
+
+    @staticmethod
+    def _is_recent(last_update_date: Optional[datetime.date], last_verified: Optional[datetime.datetime]) -> bool:
+        """
+        Returns True if a stored enrichment was fetched or verified in the last 30 days.
+        """
+        if last_verified:
+            last_update_date = last_verified.date()
+        return bool(
+            last_update_date
+            and datetime.date.today() - last_update_date < datetime.timedelta(days=30)
+        )
+
+    def enrich_companies(
+        self, companies: List[Tuple[str, str]], refresh: bool = False
+    ) -> Dict[str, Enrichment]:
+        """
+        Enriches many companies with as few ZoomInfo requests as possible, e.g. to warm
+        the cache.
+
+        Companies whose stored enrichment is recent are answered from the database. The
+        others are sent to ZoomInfo batch_size per request, and the enrichments from each
+        request are stored in one transaction.
+
+        Args:
+            companies: (company_domain, ticker) pairs.
+            refresh: Fetch every company, even those with a recent enrichment.
+
+        Returns:
+            The Enrichment of each company, by ticker: whether it succeeded, and the
+            report fields in JSON format or why it failed.
+        """
+        api_enabled = os.environ.get("ENABLE_ZOOMINFO_API_CALLS", "True").lower() == "true"
+        cache = self._get_storage()
+        with cache.connect() as db_conn:
+            stored = cache.get_enrichments(db_conn, "zoominfo", [ticker for _, ticker in companies])
+
+        results = {}
+        to_fetch = []  # (company_domain, ticker, stored_data)
+        for company_domain, ticker in companies:
+            row = stored.get(ticker)
+            if row and (not api_enabled or (not refresh and self._is_recent(row[1], row[2]))):
+                results[ticker] = Enrichment(True, json.dumps(storage.project_json(row[0], REPORT_PROJECTION)))
+                continue
+            if not api_enabled:
+                results[ticker] = Enrichment(False, None)
+                continue
+            rejected, result = self._reject_domain(company_domain)
+            if rejected:
+                results[ticker] = Enrichment(False, result)
+                continue
+            to_fetch.append((company_domain, ticker, row[0] if row else None))
+
+        for start in range(0, len(to_fetch), self.batch_size):
+            batch = to_fetch[start:start + self.batch_size]
+            fetched = self._fetch_enrichments([company_domain for company_domain, _, _ in batch])
+            matched = []
+            for (company_domain, ticker, stored_data), company_enrichment_data in zip(batch, fetched):
+                if isinstance(company_enrichment_data, dict):
+                    matched.append((company_domain, ticker, company_enrichment_data, stored_data))
                 else:
-                    self.logger.info(
-                        f"Enrichment data for company ticker '{ticker}' found in the database but is older than 30 days. Refreshing..."
-                    )
-                    # Delete the old record
-                    db_conn.execute(
-                        sqlalchemy.text(
-                            "DELETE FROM zoominfo_enrichments WHERE ticker = :ticker"
-                        ),
-                        {"ticker": ticker},
-                    )
-                    db_conn.commit()
-
-            # If not in the database or the report is too old, download and process the report
+                    results[ticker] = Enrichment(False, company_enrichment_data)
+            if matched:
+                with cache.connect() as db_conn:
+                    ok, stored_results = self._store_enrichments(db_conn, matched)
+                for (_, ticker, _, _), result in zip(matched, stored_results):
+                    results[ticker] = Enrichment(ok, result)
+        self.logger.info(
+            f"Enriched {len(companies)} companies; {len(to_fetch)} fetched from ZoomInfo in batches of up to {self.batch_size}."
+        )
+        return results
+
+    def _revalidate_enrichment(self, company_domain: str, ticker: str):
+        """
+        Refreshes a stale enrichment in the background, comparing the response with
+        the whole stored document.
+        """
+        cache = self._get_storage()
+        with cache.connect() as db_conn:
+            stored = cache.get_enrichment(db_conn, "zoominfo", ticker)
+            self._refresh_enrichment(
+                db_conn, company_domain, ticker, stored[0] if stored else None
+            )
+
+    def _refresh_enrichment(
+        self, db_conn, company_domain: str, ticker: str, stored_data: Any = None
+    ) -> Optional[str]:
+        """
+        Fetches the enrichment of a company from ZoomInfo and stores it.
+
+        Args:
+            db_conn: An open database connection.
+            company_domain: Domain name of the company such as google.com
+            ticker: The ticker symbol of the company
+            stored_data: The enrichment currently stored for the ticker, if any. When the
+                response is the same only last_verified is updated.
+
+        Returns:
+            The report fields in JSON format as a string, an error message, or None.
+        """
+        company_enrichment_data = self._fetch_enrichment(company_domain)
+        if not isinstance(company_enrichment_data, dict):
+            return company_enrichment_data
+        return self._store_enrichment(db_conn, company_domain, ticker, company_enrichment_data, stored_data)
+
+    def _fetch_enrichment(
+        self, company_domain: str, access_token: Optional[str] = None
+    ) -> Union[Dict[str, Any], str, None]:
+        """
+        Calls ZoomInfo for the company behind a domain, with access_token if given.
+
+        Returns:
+            The decoded response if ZoomInfo matched a company, otherwise an error
+            message or None.
+        """
+        rejected, result = self._reject_domain(company_domain)
+        if rejected:
+            return result
+        response = self._post_enrich([company_domain], access_token)
+        if not isinstance(response, dict):
+            return response
+        return self._matched_enrichment(company_domain, response)
+
+    def _fetch_enrichments(
+        self, company_domains: List[str], access_token: Optional[str] = None
+    ) -> List[Union[Dict[str, Any], str, None]]:
+        """
+        Calls ZoomInfo once for the companies behind several domains (at most
+        batch_size of them) and splits the response into one per domain, shaped as if
+        the domain had been enriched on its own.
+
+        Returns:
+            The result of _fetch_enrichment for each domain, in order.
+        """
+        response = self._post_enrich(company_domains, access_token)
+        if not isinstance(response, dict):
+            return [response] * len(company_domains)
+        documents = zoominfobatch.split_enrich_response(response, company_domains)
+        unmatched = [domain for domain, document in zip(company_domains, documents) if document is None]
+        if unmatched:
+            # Requesting them again one at a time would cost a request each; ZoomInfo
+            # returned nothing attributable to them, so they count as not found.
+            self.logger.warning(
+                f"ZoomInfo batch response has no result for {', '.join(unmatched)}; treating them as not found."
+            )
+        return [
+            self._matched_enrichment(domain, document or {})
+            for domain, document in zip(company_domains, documents)
+        ]
+
+    def _reject_domain(self, company_domain: str) -> Tuple[bool, Optional[str]]:
+        """
+        Returns (True, result) for a domain that is not sent to ZoomInfo: None if it is
+        not a domain, a message if ZoomInfo recently had no company for it.
+        """
+        if not companylist.is_plausible_domain(company_domain):
+            self.logger.error(f"Must provide a valid company_domain, got '{company_domain}'")
+            return True, None
+        if company_domain.lower() in self._negative_cache:
+            self.logger.info(f"ZoomInfo has no company for domain '{company_domain}' (cached).")
+            return True, f"ZoomInfo has no company matching the domain {company_domain}."
+        return False, None
+
+    def _matched_enrichment(
+        self, company_domain: str, company_enrichment_data: Dict[str, Any]
+    ) -> Union[Dict[str, Any], str]:
+        """
+        Returns the response for a domain if it holds a company, otherwise remembers
+        that ZoomInfo has none and returns a message.
+        """
+        if not self._has_match(company_enrichment_data):
+            self._negative_cache.set(company_domain.lower())
+            self.logger.info(f"ZoomInfo has no company for domain '{company_domain}'.")
+            return f"ZoomInfo has no company matching the domain {company_domain}."
+        return company_enrichment_data
+
+    def _post_enrich(
+        self, company_domains: List[str], access_token: Optional[str] = None
+    ) -> Union[Dict[str, Any], str, None]:
+        """
+        Sends one /enrich/company request for the given domains.
+
+        Returns:
+            The decoded response, an error message, or None without an access token.
+        """
+        if access_token is None:
             access_token = self._get_token()
+        if access_token is None:
+            self.logger.error("Could not get access token")
+            return None
 
-            # Check if ZoomInfo API calls are enabled
-            if os.environ.get("ENABLE_ZOOMINFO_API_CALLS", "True").lower() != "true":
-                return None
-
-            if access_token is None:
-                self.logger.error("Could not get access token")
-                return None
-            context = ssl.create_default_context(cafile=certifi.where())
-            conn = http.client.HTTPSConnection("api.zoominfo.com", context=context)
-            if company_domain and len(company_domain) > 3:
-                company_filter = {"companyWebsite": f"http://www.{company_domain}"}
-            else:
-                self.logger.error("Must provide either company_domain")
-                return None
-
-            payload = json.dumps({
-                "matchCompanyInput": [company_filter],
-                "outputFields": [
-                    "id",
-                    "ticker",
-                    "name",
-                    "website",
-                    "logo",
-                    "parentId",
-                    "parentName",
-                    "SocialMediaUrls",
-                    "revenue",
-                    "employeeCount",
-                    "phone",
-                    "street",
-                    "city",
-                    "state",
-                    "zipCode",
-                    "country",
-                    "metroArea",
-                    "companyStatus",
-                    "companyStatusDate",
-                    "descriptionList",
-                    "sicCodes",
-                    "naicsCodes",
-                    "competitors",
-                    "ultimateParentId",
-                    "ultimateParentName",
-                    "ultimateParentRevenue",
-                    "ultimateParentEmployees",
-                    "subUnitCodes",
-                    "subUnitType",
-                    "subUnitIndustries",
-                    "primaryIndustry",
-                    "industries",
-                    "alexaRank",
-                    "metroArea",
-                    "revenueRange",
-                    "employeeRange",
-                    "companyFunding",
-                    "recentFundingAmount",
-                    "recentFundingDate",
-                    "totalFundingAmount",
-                    "businessModel",
-                    "departmentBudgets",
-                    "employeeCountByDepartment",
-                ],
-            })
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": "Bearer " + access_token,
-            }
-            conn.request("POST", "/enrich/company", payload, headers)
-            res = conn.getresponse()
-            data = res.read()
-            try:
-                company_enrichment_data = json.loads(data.decode("utf-8"))
-                # Log the response for debugging
-                self.logger.debug(f"ZoomInfo API Response: {company_enrichment_data}")
-
-                # Safely extract ticker
-                api_ticker = None
-                if company_enrichment_data and "data" in company_enrichment_data and isinstance(company_enrichment_data["data"], list):
-                    if len(company_enrichment_data["data"]) > 0:
-                        first_data_item = company_enrichment_data["data"][0]
-                        if isinstance(first_data_item, dict) and "ticker" in first_data_item:
-                            api_ticker = first_data_item["ticker"]
-                    else:
-                        self.logger.warning("Warning: 'data' list is empty in ZoomInfo response.")
-                elif company_enrichment_data and "data" in company_enrichment_data and not isinstance(company_enrichment_data["data"], list):
-                    self.logger.warning("Warning: 'data' is not a list in ZoomInfo response.")
-                elif company_enrichment_data and "data" not in company_enrichment_data:
-                    self.logger.warning("Warning: 'data' key is missing in ZoomInfo response.")
-                else:
-                    self.logger.warning("Warning: Unexpected ZoomInfo response format.")
-                
-                # Use the ticker passed as parameter if the api_ticker is not available
-                if not api_ticker:
-                    api_ticker = ticker
-
-                last_update_date = datetime.date.today()
-                db_conn.execute(
-                    sqlalchemy.text(
-                        "INSERT INTO zoominfo_enrichments (ticker, company_domain, company_enrichment_data, last_update_date) VALUES (:ticker, :company_domain, :company_enrichment_data, :last_update_date) ON CONFLICT (ticker) DO UPDATE SET company_enrichment_data = :company_enrichment_data, company_domain = :company_domain, last_update_date = :last_update_date"
-                    ),
-                    {
-                        "ticker": api_ticker,
-                        "company_domain": company_domain,
-                        "company_enrichment_data": json.dumps(company_enrichment_data),
-                        "last_update_date": last_update_date,
-                    },
+        payload = json.dumps({
+            "matchCompanyInput": [
+                {"companyWebsite": f"http://www.{company_domain}"}
+                for company_domain in company_domains
+            ],
+            "outputFields": [
+                "id",
+                "ticker",
+                "name",
+                "website",
+                "logo",
+                "parentId",
+                "parentName",
+                "SocialMediaUrls",
+                "revenue",
+                "employeeCount",
+                "phone",
+                "street",
+                "city",
+                "state",
+                "zipCode",
+                "country",
+                "metroArea",
+                "companyStatus",
+                "companyStatusDate",
+                "descriptionList",
+                "sicCodes",
+                "naicsCodes",
+                "competitors",
+                "ultimateParentId",
+                "ultimateParentName",
+                "ultimateParentRevenue",
+                "ultimateParentEmployees",
+                "subUnitCodes",
+                "subUnitType",
+                "subUnitIndustries",
+                "primaryIndustry",
+                "industries",
+                "alexaRank",
+                "metroArea",
+                "revenueRange",
+                "employeeRange",
+                "companyFunding",
+                "recentFundingAmount",
+                "recentFundingDate",
+                "totalFundingAmount",
+                "businessModel",
+                "departmentBudgets",
+                "employeeCountByDepartment",
+            ],
+        })
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": "Bearer " + access_token,
+        }
+        try:
+            res = httpclient.post(
+                f"{ZOOMINFO_BASE_URL}/enrich/company", data=payload, headers=headers
+            )
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error during ZoomInfo API call: {e}")
+            return f"Error during ZoomInfo API call: {e}"
+        data = res.content
+        try:
+            company_enrichment_data = json.loads(data.decode("utf-8"))
+            # Log the response for debugging
+            self.logger.debug(f"ZoomInfo API Response: {company_enrichment_data}")
+            if not isinstance(company_enrichment_data, dict):
+                return f"An unexpected error occurred: ZoomInfo returned {type(company_enrichment_data).__name__}"
+            return company_enrichment_data
+        except json.JSONDecodeError:
+            self.logger.error("Error: could not convert json from ZoomInfo")
+            return "Error: could not convert json from ZoomInfo"
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred: {e}")
+            return f"An unexpected error occurred: {e}"
+
+    def _store_enrichment(
+        self,
+        db_conn,
+        company_domain: str,
+        ticker: str,
+        company_enrichment_data: Dict[str, Any],
+        stored_data: Any = None,
+    ) -> str:
+        """
+        Stores an enrichment fetched from ZoomInfo and commits. When it equals
+        stored_data only last_verified is updated. The whole response is stored; the
+        report fields are returned and kept in the row cache.
+
+        Returns:
+            The report fields in JSON format as a string, or an error message.
+        """
+        _, results = self._store_enrichments(
+            db_conn, [(company_domain, ticker, company_enrichment_data, stored_data)]
+        )
+        return results[0]
+
+    def _store_enrichments(
+        self, db_conn, enrichments: List[Tuple[str, str, Dict[str, Any], Any]]
+    ) -> Tuple[bool, List[str]]:
+        """
+        Stores (company_domain, ticker, company_enrichment_data, stored_data)
+        enrichments like _store_enrichment, in one transaction.
+
+        Returns:
+            Whether the transaction was committed, and the result of each enrichment,
+            in order.
+        """
+        try:
+            results = []
+            rows = []
+            for company_domain, ticker, company_enrichment_data, stored_data in enrichments:
+                result, row = self._write_enrichment(
+                    db_conn, company_domain, ticker, company_enrichment_data, stored_data
                 )
-                db_conn.commit()
+                results.append(result)
+                rows.append(row)
+            db_conn.commit()
+        except Exception as e:
+            db_conn.rollback()
+            self.logger.error(f"An unexpected error occurred: {e}")
+            return False, [f"An unexpected error occurred: {e}"] * len(enrichments)
+
+        for row_ticker, row in rows:
+            if row is None:
+                self._rows.discard(row_ticker)
+                self.logger.info(f"Enrichment data for company ticker '{row_ticker}' is unchanged.")
+            else:
+                self._rows.set(row_ticker, row)
                 self.logger.info(
-                    f"Enrichment data for company ticker '{api_ticker}' saved to the database."
+                    f"Enrichment data for company ticker '{row_ticker}' saved to the database."
                 )
-                return json.dumps(company_enrichment_data)
-            except json.JSONDecodeError:
-                self.logger.error("Error: could not convert json from ZoomInfo")
-                return "Error: could not convert json from ZoomInfo"
-            except Exception as e:
-                self.logger.error(f"An unexpected error occurred: {e}")
-                return f"An unexpected error occurred: {e}"
+        return True, results
+
+    def _write_enrichment(
+        self,
+        db_conn,
+        company_domain: str,
+        ticker: str,
+        company_enrichment_data: Dict[str, Any],
+        stored_data: Any,
+    ) -> Tuple[str, Tuple[str, Optional[tuple]]]:
+        """
+        Saves or touches the row of an enrichment without committing.
+
+        Returns:
+            The report fields in JSON format, and the ticker of the row with its new
+            row cache entry (None if only last_verified changed).
+        """
+        # Safely extract ticker
+        api_ticker = None
+        if company_enrichment_data and "data" in company_enrichment_data and isinstance(company_enrichment_data["data"], list):
+            if len(company_enrichment_data["data"]) > 0:
+                first_data_item = company_enrichment_data["data"][0]
+                if isinstance(first_data_item, dict) and "ticker" in first_data_item:
+                    api_ticker = first_data_item["ticker"]
+            else:
+                self.logger.warning("Warning: 'data' list is empty in ZoomInfo response.")
+        elif company_enrichment_data and "data" in company_enrichment_data and not isinstance(company_enrichment_data["data"], (list, dict)):
+            self.logger.warning("Warning: 'data' is not a list in ZoomInfo response.")
+        elif company_enrichment_data and "data" not in company_enrichment_data:
+            self.logger.warning("Warning: 'data' key is missing in ZoomInfo response.")
+        elif not company_enrichment_data:
+            self.logger.warning("Warning: Unexpected ZoomInfo response format.")
+
+        report_fields = storage.project_json(company_enrichment_data, REPORT_PROJECTION)
+        if stored_data is not None and company_enrichment_data == (
+            json.loads(stored_data) if isinstance(stored_data, str) else stored_data
+        ):
+            self._get_storage().touch_enrichment(
+                db_conn, "zoominfo", ticker, datetime.datetime.now(datetime.timezone.utc)
+            )
+            return json.dumps(report_fields), (ticker, None)
+
+        # Use the ticker passed as parameter if the api_ticker is not available
+        if not api_ticker:
+            api_ticker = ticker
+
+        last_update_date = datetime.date.today()
+        last_verified = datetime.datetime.now(datetime.timezone.utc)
+        self._get_storage().save_enrichment(
+            db_conn,
+            "zoominfo",
+            api_ticker,
+            company_enrichment_data,
+            last_update_date,
+            last_verified,
+            company_domain=company_domain,
+        )
+        return json.dumps(report_fields), (api_ticker, (report_fields, last_update_date, last_verified))